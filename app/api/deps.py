@@ -1,15 +1,60 @@
 from collections.abc import Generator
 
+from fastapi import Header, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
+from app.services.cache import ReferenceCache, reference_cache
+from app.services.idempotency import IdempotencyStore, idempotency_store
+from app.services.microcache import MicroCache, microcache
+from app.services.profiling import ADMIN_TOKEN, ProfileStore, is_admin, profile_store
+from app.services.read_routing import (
+    READ_YOUR_WRITES_COOKIE,
+    READ_YOUR_WRITES_HEADER,
+    read_router,
+    wants_primary,
+)
 from db import get_sessionmaker
 
-SessionLocal = get_sessionmaker()
-
 
 def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """Read-only session on a replica, or on the primary right after this client wrote."""
+    sticky = wants_primary(
+        request.cookies.get(READ_YOUR_WRITES_COOKIE), request.headers.get(READ_YOUR_WRITES_HEADER)
+    )
+    db = read_router.session(sticky=sticky)
+    request.state.read_target = db.info.get("replica", "primary")
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_reference_cache() -> ReferenceCache:
+    return reference_cache
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    return idempotency_store
+
+
+def get_microcache() -> MicroCache:
+    return microcache
+
+
+def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Admin endpoints are disabled")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Invalid admin token")
+
+
+def get_profile_store() -> ProfileStore:
+    return profile_store
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+
+@dataclass(frozen=True)
+class Projection:
+    """The subset of a read model's fields a request asked for, and how to serialize it."""
+
+    names: tuple[str, ...]
+    adapter: TypeAdapter
+
+    def columns(self, entity) -> list:
+        return [getattr(entity, name) for name in self.names]
+
+    def dump_json(self, rows) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(rows, from_attributes=True))
+
+
+def parse_fields(model: type[BaseModel], fields: str | None) -> Projection:
+    """Resolve a `fields=a,b,c` parameter; `id` is always included. Raises ValueError."""
+    if fields is None:
+        return _projection(model, tuple(model.model_fields))
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - model.model_fields.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(sorted(unknown))}; "
+            f"expected any of {', '.join(model.model_fields)}"
+        )
+    requested.add("id")
+    # Model order keeps the cache key and the JSON key order stable.
+    return _projection(model, tuple(name for name in model.model_fields if name in requested))
+
+
+@lru_cache(maxsize=256)
+def _projection(model: type[BaseModel], names: tuple[str, ...]) -> Projection:
+    if names == tuple(model.model_fields):
+        return Projection(names, TypeAdapter(list[model]))
+    sparse = create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in names},
+    )
+    return Projection(names, TypeAdapter(list[sparse]))
@@ -0,0 +1,324 @@
+import math
+import os
+import random
+import threading
+import time
+import zlib
+
+import anyio
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.admission import AdmissionController, AdmissionRejectedError
+from app.services.profiling import (
+    ADMIN_TOKEN,
+    PROFILE_SAMPLE_RATE,
+    ProfileStore,
+    SamplingProfiler,
+    begin_capture,
+    end_capture,
+    is_admin,
+)
+from app.services.read_routing import (
+    READ_YOUR_WRITES_COOKIE,
+    READ_YOUR_WRITES_HEADER,
+    READ_YOUR_WRITES_SECONDS,
+    ReadRouter,
+)
+from app.services.sql_instrumentation import begin_request, end_request
+
+try:
+    import brotli
+except ImportError:  # optional: pip install "proco[compression]"
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+# Bodies at least this large are compressed on a worker thread instead of the event loop.
+COMPRESSION_THREAD_MIN_BYTES = 128 * 1024
+UNCOMPRESSIBLE_TYPES = ("image/", "audio/", "video/", "application/zip", "application/gzip")
+
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+class SQLInstrumentationMiddleware:
+    """Counts queries and DB time per request and reports them as Server-Timing."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stats, token = begin_request(route_template(scope))
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                stats.route = route_template(scope)
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                    f"app;dur={total_ms:.2f}"
+                )
+                repeated = stats.repeated()
+                if repeated:
+                    timing += f', nplus1;desc="{repeated[0][1]}x repeated statement"'
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stats.route = route_template(scope)
+            end_request(stats, token)
+
+
+class AdmissionControlMiddleware:
+    """Queues POSTs to `paths` behind an AdmissionController and sheds load with 429."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, paths: set[str]) -> None:
+        self.app = app
+        self.controller = controller
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire()
+        except AdmissionRejectedError as exc:
+            response = JSONResponse(
+                {"detail": "Chat is busy, please retry shortly", "reason": exc.reason},
+                status_code=429,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(time.perf_counter() - started)
+
+
+class ReadYourWritesMiddleware:
+    """After a successful write, pins the client's reads to the primary for a short window.
+
+    The pin goes out as a cookie and as an X-Primary-Until header. Over HTTPS the cookie is
+    SameSite=None so cross-site frontends send it too; clients whose browsers block
+    third-party cookies echo the header instead.
+    """
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, app: ASGIApp, router: ReadRouter) -> None:
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in self.SAFE_METHODS
+            or not self.router.names
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        forwarded = Headers(scope=scope).get("x-forwarded-proto", "")
+        secure = scope.get("scheme") == "https" or forwarded.split(",")[0].strip() == "https"
+        # Browsers only send SameSite=None cookies when they are also Secure.
+        same_site = "SameSite=None; Secure" if secure else "SameSite=Lax"
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = f"{time.time() + READ_YOUR_WRITES_SECONDS:.3f}"
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={until}; "
+                    f"Max-Age={math.ceil(READ_YOUR_WRITES_SECONDS)}; Path=/; HttpOnly; {same_site}"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.encode("latin-1")))
+                headers.append((READ_YOUR_WRITES_HEADER.lower().encode(), until.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+class ProfilingMiddleware:
+    """Runs a sampling profiler for requests sent with `X-Profile: 1` and a valid admin token,
+    plus a `sample_rate` fraction of all requests, and stores a speedscope capture.
+
+    Only one request is profiled at a time; others arriving meanwhile run unprofiled.
+    """
+
+    def __init__(
+        self, app: ASGIApp, store: ProfileStore, sample_rate: float = PROFILE_SAMPLE_RATE
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self._busy = threading.Lock()
+
+    def _wanted(self, scope: Scope) -> bool:
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True
+        if not ADMIN_TOKEN:
+            return False
+        headers = Headers(scope=scope)
+        return headers.get("x-profile") == "1" and is_admin(headers.get("x-admin-token"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{route_template(scope)} {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}"
+        profiler = SamplingProfiler(threading.get_ident())
+        started = time.perf_counter()
+        profiler.start()
+        token = begin_capture(profiler)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            end_capture(token)
+            duration_ms = (time.perf_counter() - started) * 1000
+
+            def finish() -> None:
+                profiler.stop()
+                self.store.save(
+                    profiler.speedscope(name), scope["method"], scope["path"], duration_ms
+                )
+
+            # Joining the sampler, serializing and pruning happen off the event loop, after
+            # the response went out.
+            try:
+                with anyio.CancelScope(shield=True):
+                    await anyio.to_thread.run_sync(finish)
+            finally:
+                self._busy.release()
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick "br" or "gzip" from an Accept-Encoding header, honouring q=0 exclusions."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[coding.strip()] = quality
+    available = ("br", "gzip") if brotli is not None else ("gzip",)
+    candidates = [
+        coding for coding in available if offered.get(coding, offered.get("*", 0.0)) > 0
+    ]
+    return max(candidates, key=lambda coding: offered.get(coding, 0.0), default=None)
+
+
+class _Compressor:
+    def __init__(self, encoding: str) -> None:
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._brotli = None
+            self._gzip = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, final: bool) -> bytes:
+        if self._brotli is not None:
+            data = self._brotli.process(body)
+            return data + (self._brotli.finish() if final else self._brotli.flush())
+        data = self._gzip.compress(body)
+        return data + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Brotli/gzip response compression negotiated from Accept-Encoding.
+
+    Bodies under `minimum_size` and already-compressed media types are sent as-is; streamed
+    responses are flushed chunk by chunk so exports still arrive incrementally.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = None
+        if scope["type"] == "http" and scope["method"] != "HEAD":
+            encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: _Compressor | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 206, 304)
+                    or content_type.startswith(UNCOMPRESSIBLE_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                if start is not None:
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if len(body) < self.minimum_size and not more_body:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                del headers["Content-Length"]
+            if len(body) >= COMPRESSION_THREAD_MIN_BYTES:
+                body = await anyio.to_thread.run_sync(compressor.compress, body, not more_body)
+            else:
+                body = compressor.compress(body, not more_body)
+            if start is not None:
+                if not more_body:
+                    MutableHeaders(raw=start["headers"])["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
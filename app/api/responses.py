@@ -0,0 +1,17 @@
+from collections.abc import Callable
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from app.services.microcache import MicroCache
+
+
+def cached_json(
+    cache: MicroCache, request: Request, namespace: str, render: Callable[[], bytes]
+) -> Response:
+    """Serve a JSON body from the micro-cache, keyed by the normalized query string."""
+    # Bodies rendered from a replica are kept apart so read-your-writes requests never see them.
+    target = getattr(request.state, "read_target", "primary")
+    key = f"{target}?{urlencode(sorted(request.query_params.multi_items()))}"
+    body, cache_status = cache.get_or_render(namespace, key, render)
+    return Response(body, media_type="application/json", headers={"X-Cache": cache_status})
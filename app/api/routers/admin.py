@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.api.deps import get_profile_store, require_admin
+from app.api.routing import ProfiledRoute
+from app.services.profiling import ProfileStore
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+    route_class=ProfiledRoute,
+)
+
+
+@router.get("/profiles")
+def list_profiles(store: ProfileStore = Depends(get_profile_store)):
+    return store.captures()
+
+
+@router.get("/profiles/{name}")
+def download_profile(name: str, store: ProfileStore = Depends(get_profile_store)):
+    path = store.path(name)
+    if path is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Profile not found")
+    return FileResponse(path, media_type="application/json", filename=name)
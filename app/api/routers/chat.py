@@ -1,18 +1,190 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from collections.abc import Callable
+import hashlib
+import uuid
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import FileResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_idempotency_store, get_reference_cache
+from app.api.routing import ProfiledRoute
 from app.models import ChatRequest, ChatResponse
-from app.services.ai_agent import run_agent
-from app.services.vision import analyze_image
-from db import ChatMessage, ChatRole, User, UserRole
+from app.services.cache import ReferenceCache
+from app.services.conversations import resolve_conversation
+from app.services.idempotency import (
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+    IdempotencyStore,
+)
+from app.services.image_store import (
+    MAX_CHAT_IMAGE_BYTES,
+    ImageTooLargeError,
+    StoredImage,
+    discard_image,
+    image_mime,
+    image_path,
+    open_image,
+    store_image,
+)
+from app.services.llm_metrics import track_turn
+from db import ChatMessage, ChatRole, Issue, IssueAttachment, UserRole
 
-router = APIRouter(tags=["chat"])
+router = APIRouter(tags=["chat"], route_class=ProfiledRoute)
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest, db: Session = Depends(get_db)) -> ChatResponse:
-    tenant = db.query(User).filter(User.id == request.tenant_id).first()
+def chat(
+    request: ChatRequest,
+    response: Response,
+    idempotency_key: str | None = Header(None),
+    db: Session = Depends(get_db),
+    cache: ReferenceCache = Depends(get_reference_cache),
+    store: IdempotencyStore = Depends(get_idempotency_store),
+) -> ChatResponse:
+    return _idempotent(
+        store, idempotency_key, request, None, response, lambda: _chat_turn(db, cache, request)
+    )
+
+
+@router.post("/chat/upload", response_model=ChatResponse)
+def chat_upload(
+    response: Response,
+    tenant_id: uuid.UUID = Form(...),
+    message: str = Form(...),
+    issue_id: uuid.UUID | None = Form(None),
+    property_id: uuid.UUID | None = Form(None),
+    conversation_id: uuid.UUID | None = Form(None),
+    image: UploadFile | None = File(None),
+    idempotency_key: str | None = Header(None),
+    db: Session = Depends(get_db),
+    cache: ReferenceCache = Depends(get_reference_cache),
+    store: IdempotencyStore = Depends(get_idempotency_store),
+) -> ChatResponse:
+    request = ChatRequest(
+        tenant_id=tenant_id,
+        message=message,
+        issue_id=issue_id,
+        property_id=property_id,
+        conversation_id=conversation_id,
+    )
+    stored = None
+    if image is not None:
+        # Checked before anything is written, so rejected requests leave no file behind.
+        _chat_context(db, cache, request)
+        if image.size is not None and image.size > MAX_CHAT_IMAGE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image exceeds {MAX_CHAT_IMAGE_BYTES} bytes",
+            )
+        try:
+            stored = store_image(image.file, image.content_type or "")
+        except ImageTooLargeError as exc:
+            raise HTTPException(status_code=413, detail=str(exc))
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc)
+            )
+        finally:
+            image.file.close()
+    try:
+        return _idempotent(
+            store,
+            idempotency_key,
+            request,
+            stored,
+            response,
+            lambda: _chat_turn(db, cache, request, stored),
+        )
+    except BaseException:
+        if stored is not None:
+            discard_image(stored)
+        raise
+
+
+@router.get("/chat/images/{key}")
+def get_chat_image(key: str) -> FileResponse:
+    try:
+        path = image_path(key)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    return FileResponse(
+        path,
+        media_type=image_mime(key),
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
+def _idempotent(
+    store: IdempotencyStore,
+    idempotency_key: str | None,
+    request: ChatRequest,
+    image: StoredImage | None,
+    response: Response,
+    turn: Callable[[], ChatResponse],
+) -> ChatResponse:
+    """Run the turn once per (tenant, Idempotency-Key); retries get the stored response."""
+    if idempotency_key is None:
+        return turn()
+    if not 0 < len(idempotency_key) <= 255:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key must be 1-255 characters",
+        )
+    fingerprint = hashlib.sha256(request.model_dump_json().encode())
+    if image is not None:
+        fingerprint.update(image.key.encode())
+    try:
+        result, replayed = store.run(
+            f"chat:{request.tenant_id}:{idempotency_key}",
+            fingerprint.hexdigest(),
+            turn,
+            ChatResponse,
+        )
+    except IdempotencyConflictError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except IdempotencyInProgressError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+
+def _describe_image(request: ChatRequest, image: StoredImage | None) -> str | None:
+    from app.services.vision import analyze_image
+
+    try:
+        if image is not None:
+            # Memory-mapped rather than read into a bytes object; the hosted vision clients
+            # still base64-encode it into the request body.
+            with open_image(image.key) as data:
+                return analyze_image(data, mime_type=image.mime)
+        if request.image_base64:
+            return analyze_image(request.image_base64)
+    except Exception:
+        return None
+    return None
+
+
+def _chat_context(db: Session, cache: ReferenceCache, request: ChatRequest):
+    """The tenant and property a chat message is for; raises for requests that cannot run."""
+    tenant = cache.get_user(db, request.tenant_id)
     if tenant is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tenant not found")
     if tenant.role != UserRole.TENANT:
@@ -26,52 +198,84 @@ def chat(request: ChatRequest, db: Session = Depends(get_db)) -> ChatResponse:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Property ID is required for chat messages",
         )
+    return tenant, property_id
 
-    image_description = None
-    if request.image_base64:
-        try:
-            image_description = analyze_image(request.image_base64)
-        except Exception:
-            image_description = None
 
-    user_message = ChatMessage(
-        issue_id=request.issue_id,
-        property_id=property_id,
-        tenant_id=tenant.id,
-        role=ChatRole.USER,
-        content=request.message,
-        image_base64=request.image_base64,
-    )
-    db.add(user_message)
-    db.flush()
+def _chat_turn(
+    db: Session,
+    cache: ReferenceCache,
+    request: ChatRequest,
+    image: StoredImage | None = None,
+) -> ChatResponse:
+    tenant, property_id = _chat_context(db, cache, request)
+    try:
+        conversation = resolve_conversation(
+            db, tenant.id, property_id, request.conversation_id, request.issue_id
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
 
-    response_text, issue_id = run_agent(
-        db=db,
-        tenant_id=tenant.id,
-        property_id=property_id,
-        message=request.message,
-        image_description=image_description,
-        issue_id=request.issue_id,
-    )
+    # The agent and vision stack (LangChain, provider clients) load on first use so
+    # app startup and /health stay fast.
+    from app.services.ai_agent import run_agent
 
+    with track_turn() as usage:
+        image_description = _describe_image(request, image)
+
+        user_message = ChatMessage(
+            issue_id=request.issue_id,
+            conversation_id=conversation.id,
+            property_id=property_id,
+            tenant_id=tenant.id,
+            role=ChatRole.USER,
+            content=request.message,
+            image_base64=request.image_base64,
+            image_key=image.key if image is not None else None,
+        )
+        db.add(user_message)
+        db.flush()
+
+        response_text, issue_id = run_agent(
+            db=db,
+            tenant_id=tenant.id,
+            property_id=property_id,
+            message=request.message,
+            image_description=image_description,
+            issue_id=request.issue_id,
+            conversation_id=conversation.id,
+        )
+
+    attached = False
     if issue_id and request.issue_id is None:
-        db.query(ChatMessage).filter(
-            ChatMessage.tenant_id == tenant.id,
-            ChatMessage.property_id == property_id,
-            ChatMessage.issue_id.is_(None),
-        ).update({ChatMessage.issue_id: issue_id})
+        # Earlier messages already point at the conversation; closing it is the only write.
+        conversation.closed_at = func.now()
+        # A near-duplicate report joins the open issue that came from another conversation.
+        attached = db.get(Issue, issue_id).conversation_id != conversation.id
+        if attached:
+            # Lets the landlord read this report in the issue's thread, and this tenant
+            # continue the conversation by issue_id.
+            db.add(IssueAttachment(issue_id=issue_id, conversation_id=conversation.id))
 
     user_message.issue_id = issue_id
     assistant_message = ChatMessage(
         issue_id=issue_id,
+        conversation_id=conversation.id,
         property_id=property_id,
         tenant_id=tenant.id,
         role=ChatRole.ASSISTANT,
         content=response_text,
+        llm_latency_ms=usage.latency_ms,
+        llm_prompt_tokens=usage.prompt_tokens,
+        llm_completion_tokens=usage.completion_tokens,
+        llm_usage=usage.as_json(),
     )
     db.add(assistant_message)
     db.commit()
 
     return ChatResponse(
-        response=response_text, issue_created=issue_id is not None, issue_id=issue_id
+        response=response_text,
+        issue_created=issue_id is not None,
+        issue_id=issue_id,
+        conversation_id=conversation.id,
+        attached_to_existing=attached,
     )
@@ -0,0 +1,177 @@
+from collections.abc import Iterator
+import csv
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import enum
+from functools import partial
+import heapq
+import io
+from itertools import chain
+import json
+import os
+from typing import Literal
+import uuid
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, select
+
+from app.api.routing import ProfiledRoute
+from app.services.archival import stream_archived_messages
+from app.services.read_routing import read_router
+from db import ChatMessage, Issue, WalletTransaction, as_utc
+
+router = APIRouter(tags=["export"], route_class=ProfiledRoute)
+
+EXPORT_BATCH_SIZE = 1000
+# Rows newer than this are left for the next pull. created_at is the inserting transaction's
+# start time, so a slow transaction can commit a row older than rows already exported.
+EXPORT_LAG_SECONDS = float(os.getenv("EXPORT_LAG_SECONDS", "60"))
+
+EXPORT_TABLES = {
+    "issues": Issue,
+    "messages": ChatMessage,
+    "wallet-transactions": WalletTransaction,
+}
+IMAGE_COLUMNS = {"image_base64"}
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _encode(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _stream_rows(
+    model, columns, since: datetime | None, after_id: uuid.UUID | None, cutoff: datetime
+) -> Iterator[tuple]:
+    """Rows in (created_at, id) order, after the (since, after_id) cursor."""
+    statement = (
+        select(*columns)
+        .where(model.created_at <= cutoff)
+        .order_by(model.created_at.asc(), model.id.asc())
+    )
+    if since is not None and after_id is not None:
+        statement = statement.where(
+            or_(
+                model.created_at > since,
+                and_(model.created_at == since, model.id > after_id),
+            )
+        )
+    elif since is not None:
+        statement = statement.where(model.created_at >= since)
+    db = read_router.session()
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def _archived_rows(
+    columns, since: datetime | None, after_id: uuid.UUID | None, cutoff: datetime
+) -> Iterator[tuple]:
+    """Messages moved to chat_message_archive, in the same order and cursor as _stream_rows."""
+    db = read_router.session()
+    try:
+        for message in stream_archived_messages(db, since, cutoff):
+            if (
+                since is not None
+                and after_id is not None
+                and as_utc(message.created_at) == as_utc(since)
+                and message.id <= after_id
+            ):
+                continue
+            yield tuple(getattr(message, column.key) for column in columns)
+    finally:
+        db.close()
+
+
+def _stream_messages(
+    columns, since: datetime | None, after_id: uuid.UUID | None, cutoff: datetime
+) -> Iterator[tuple]:
+    """chat_messages and chat_message_archive merged into one (created_at, id) ordered stream."""
+    names = [column.name for column in columns]
+    created_at, message_id = names.index("created_at"), names.index("id")
+
+    def key(row: tuple) -> tuple[datetime, uuid.UUID]:
+        return as_utc(row[created_at]), row[message_id]
+
+    hot = chain.from_iterable(_stream_rows(ChatMessage, columns, since, after_id, cutoff))
+    merged = heapq.merge(hot, _archived_rows(columns, since, after_id, cutoff), key=key)
+    # A thread archived while the export runs can be read from both tables; being ordered
+    # by id, its two copies come out next to each other.
+    previous = None
+    unique = []
+    for row in merged:
+        current = key(row)
+        if current != previous:
+            unique.append(row)
+            previous = current
+        if len(unique) >= EXPORT_BATCH_SIZE:
+            yield unique
+            unique = []
+    if unique:
+        yield unique
+
+
+def _ndjson(names: list[str], partitions: Iterator) -> Iterator[str]:
+    for rows in partitions:
+        yield "".join(
+            json.dumps({name: _encode(value) for name, value in zip(names, row)}) + "\n"
+            for row in rows
+        )
+
+
+def _csv(names: list[str], partitions: Iterator) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for rows in partitions:
+        writer.writerows([_encode(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/export/{table}")
+def export_table(
+    table: str,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    since: datetime | None = None,
+    after_id: uuid.UUID | None = None,
+    include_images: bool = False,
+):
+    model = EXPORT_TABLES.get(table)
+    if model is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export table; expected one of {', '.join(EXPORT_TABLES)}",
+        )
+    if after_id is not None and since is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="after_id needs the since it was read with",
+        )
+    columns = [
+        column
+        for column in model.__table__.columns
+        if include_images or column.name not in IMAGE_COLUMNS
+    ]
+    names = [column.name for column in columns]
+    encoder = _csv if format == "csv" else _ndjson
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=EXPORT_LAG_SECONDS)
+    stream = _stream_messages if model is ChatMessage else partial(_stream_rows, model)
+    return StreamingResponse(
+        encoder(names, stream(columns, since, after_id, cutoff)),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
-router = APIRouter(tags=["health"])
+from app.api.routing import ProfiledRoute
+
+router = APIRouter(tags=["health"], route_class=ProfiledRoute)
 
 
 @router.get("/health")
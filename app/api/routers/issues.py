@@ -1,56 +1,113 @@
-import os
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import desc
+import anyio.to_thread
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from sqlalchemy import desc, or_, select
 from sqlalchemy.orm import Session
 import httpx
 
-from app.api.deps import get_db
-from app.models import ChatMessageCreate, ChatMessageRead, IssueRead, VendorResponseRequest
-from db import ChatMessage, ChatRole, Issue, IssueStatus, Vendor, Property
+from app.api.deps import get_db, get_microcache, get_read_db
+from app.api.fields import Projection, parse_fields
+from app.api.responses import cached_json
+from app.api.routing import ProfiledRoute
+from app.models import (
+    ChatMessageCreate,
+    ChatMessageRead,
+    IssueRead,
+    VendorDispatchRead,
+    VendorDispatchRequest,
+    VendorResponseRequest,
+)
+from app.services.archival import archived_messages
+from app.services.dispatch import (
+    DispatchConflictError,
+    VendorWebhookError,
+    accept_dispatch,
+    decline_dispatch,
+    post_webhook,
+    send_cancellations,
+    send_dispatches,
+    start_dispatch,
+    vendor_notice,
+)
+from app.services.microcache import MicroCache
+from app.services.profiling import profiled
+from db import (
+    ChatMessage,
+    ChatRole,
+    DispatchStatus,
+    Issue,
+    IssueAttachment,
+    IssueStatus,
+    Property,
+    Vendor,
+    VendorDispatch,
+)
 
-router = APIRouter(tags=["issues"])
+router = APIRouter(tags=["issues"], route_class=ProfiledRoute)
+
+
+def _projection(model, fields: str | None) -> Projection:
+    try:
+        return parse_fields(model, fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
 
 @router.get("/issues", response_model=list[IssueRead])
-def list_issues(db: Session = Depends(get_db)):
-    return db.query(Issue).order_by(desc(Issue.created_at)).all()
+def list_issues(
+    request: Request,
+    fields: str | None = None,
+    db: Session = Depends(get_read_db),
+    cache: MicroCache = Depends(get_microcache),
+):
+    projection = _projection(IssueRead, fields)
+
+    def render() -> bytes:
+        statement = select(*projection.columns(Issue)).order_by(desc(Issue.created_at))
+        return projection.dump_json(db.execute(statement).all())
+
+    return cached_json(cache, request, "issues", render)
 
 
 @router.get("/issues/{issue_id}/messages", response_model=list[ChatMessageRead])
-def list_issue_messages(issue_id: uuid.UUID, db: Session = Depends(get_db)):
-    issue = db.query(Issue).filter(Issue.id == issue_id).first()
+def list_issue_messages(
+    issue_id: uuid.UUID,
+    fields: str | None = None,
+    landlord_id: uuid.UUID | None = None,
+    db: Session = Depends(get_read_db),
+):
+    """The issue's own thread. With the landlord_id of the issue's property, also the other
+    tenants' reports attached to it as duplicates, which their tenants must not see."""
+    projection = _projection(ChatMessageRead, fields)
+    issue = db.execute(
+        select(Issue.id, Issue.conversation_id, Property.landlord_id)
+        .join(Property, Property.id == Issue.property_id)
+        .where(Issue.id == issue_id)
+    ).first()
     if issue is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
-    messages = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.issue_id == issue_id)
-        .order_by(ChatMessage.created_at.asc())
-        .all()
-    )
-    if messages:
-        return messages
-
-    # Backfill or return tenant/property messages created before issue_id existed.
-    messages = (
-        db.query(ChatMessage)
-        .filter(
-            ChatMessage.issue_id.is_(None),
-            ChatMessage.tenant_id == issue.tenant_id,
-            ChatMessage.property_id == issue.property_id,
+    if landlord_id is not None and landlord_id != issue.landlord_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not the landlord of this issue"
+        )
+    if issue.conversation_id is not None:
+        belongs = ChatMessage.conversation_id == issue.conversation_id
+    else:
+        belongs = ChatMessage.issue_id == issue.id
+    if landlord_id is not None:
+        attached = select(IssueAttachment.conversation_id).where(
+            IssueAttachment.issue_id == issue.id
         )
+        belongs = or_(belongs, ChatMessage.conversation_id.in_(attached))
+    statement = (
+        select(*projection.columns(ChatMessage))
+        .where(belongs)
         .order_by(ChatMessage.created_at.asc())
-        .all()
     )
-    if messages:
-        db.query(ChatMessage).filter(
-            ChatMessage.issue_id.is_(None),
-            ChatMessage.tenant_id == issue.tenant_id,
-            ChatMessage.property_id == issue.property_id,
-        ).update({ChatMessage.issue_id: issue.id})
-        db.commit()
-    return messages
+    # Threads of long-closed issues live in the archive; later messages are still hot.
+    rows = [*archived_messages(db, issue_id=issue.id), *db.execute(statement).all()]
+    return Response(projection.dump_json(rows), media_type="application/json")
 
 
 @router.post("/issues/{issue_id}/messages", response_model=ChatMessageRead)
@@ -63,6 +120,7 @@ def create_issue_message(
 
     message = ChatMessage(
         issue_id=issue_id,
+        conversation_id=issue.conversation_id,
         property_id=issue.property_id,
         tenant_id=payload.tenant_id,
         role=ChatRole.LANDLORD,
@@ -84,49 +142,129 @@ async def send_vendor_request(issue_id: uuid.UUID, vendor_id: uuid.UUID, db: Ses
     if vendor is None or not vendor.email:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vendor email not found")
 
-    property_ = db.query(Property).filter(Property.id == issue.property_id).first()
-    if property_ is None:
+    payload = vendor_notice(db, issue, vendor, "vendor_request")
+    if payload["property_address"] is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Property not found")
 
-    landlord_name = "Unknown Landlord"
-    if property_.landlord is not None:
-        landlord_name = property_.landlord.name
+    async with httpx.AsyncClient(timeout=10) as client:
+        try:
+            await post_webhook(client, payload)
+        except VendorWebhookError as exc:
+            raise HTTPException(status_code=502, detail=str(exc))
+
+    return {"status": "sent"}
 
-    frontend_base_url = os.getenv("FRONTEND_PUBLIC_URL", "http://localhost:3000")
-    response_url = f"{frontend_base_url.rstrip('/')}/vendor/respond?issue_id={issue_id}"
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.post(
-            "https://meko27.app.n8n.cloud/webhook/74eab492-eeba-48a1-9669-4901608bd2a7",
-            json={
-                "vendor_email": vendor.email,
-                "property_address": property_.address,
-                "landlord_name": landlord_name,
-                "issue_id": str(issue_id),
-                "vendor_response_url": response_url,
-            },
+@router.post("/issues/{issue_id}/dispatch", response_model=list[VendorDispatchRead])
+async def dispatch_vendors(
+    issue_id: uuid.UUID,
+    payload: VendorDispatchRequest | None = None,
+    db: Session = Depends(get_db),
+):
+    """Ask several vendors at once; the first to accept gets the job."""
+    # The ORM work runs on worker threads; only the webhook fan-out awaits on the event loop.
+    started = await anyio.to_thread.run_sync(
+        _start_dispatch, db, issue_id, payload.vendor_ids if payload else None
+    )
+    # Sent before responding so the landlord sees which requests went out.
+    await send_dispatches(issue_id)
+    dispatches = await anyio.to_thread.run_sync(_reload_dispatches, db, issue_id)
+    if all(
+        dispatch.status == DispatchStatus.FAILED
+        for dispatch in dispatches
+        if dispatch.id in started
+    ):
+        raise HTTPException(
+            status_code=502, detail="The vendor webhook refused every request; try again"
         )
-    if response.status_code >= 400:
-        detail = response.text.strip() or "Vendor webhook request failed"
-        raise HTTPException(status_code=502, detail=detail)
+    return dispatches
+
+
+@profiled
+def _start_dispatch(
+    db: Session, issue_id: uuid.UUID, vendor_ids: list[uuid.UUID] | None
+) -> set[uuid.UUID]:
+    issue = db.query(Issue).filter(Issue.id == issue_id).first()
+    if issue is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
+    try:
+        dispatches = start_dispatch(db, issue, vendor_ids)
+    except DispatchConflictError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    started = {dispatch.id for dispatch in dispatches}
+    db.commit()
+    return started
 
-    return {"status": "sent"}
+
+@profiled
+def _reload_dispatches(db: Session, issue_id: uuid.UUID) -> list[VendorDispatch]:
+    db.expire_all()
+    return _dispatches(db, issue_id)
+
+
+@router.get("/issues/{issue_id}/dispatch", response_model=list[VendorDispatchRead])
+def list_dispatches(issue_id: uuid.UUID, db: Session = Depends(get_read_db)):
+    return _dispatches(db, issue_id)
+
+
+def _dispatches(db: Session, issue_id: uuid.UUID) -> list[VendorDispatch]:
+    return db.scalars(
+        select(VendorDispatch)
+        .where(VendorDispatch.issue_id == issue_id)
+        .order_by(VendorDispatch.rank.asc())
+    ).all()
 
 
 @router.post("/issues/{issue_id}/vendor-response", response_model=IssueRead)
 def handle_vendor_response(
-    issue_id: uuid.UUID, payload: VendorResponseRequest, db: Session = Depends(get_db)
+    issue_id: uuid.UUID,
+    payload: VendorResponseRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    cache: MicroCache = Depends(get_microcache),
 ):
     issue = db.query(Issue).filter(Issue.id == issue_id).first()
     if issue is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Issue not found")
+    if payload.accepted and payload.appointment_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="appointment_at is required when accepted is true",
+        )
 
-    if payload.accepted:
-        if payload.appointment_at is None:
+    vendor_name = "Vendor"
+    if payload.dispatch_token is not None:
+        dispatch = db.scalars(
+            select(VendorDispatch).where(
+                VendorDispatch.issue_id == issue_id,
+                VendorDispatch.token == payload.dispatch_token,
+            )
+        ).first()
+        if dispatch is None:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="appointment_at is required when accepted is true",
+                status_code=status.HTTP_404_NOT_FOUND, detail="Vendor request not found"
             )
+        vendor_name = dispatch.vendor.name
+        try:
+            if payload.accepted:
+                cancellations = accept_dispatch(db, dispatch, payload.appointment_at)
+                background_tasks.add_task(send_cancellations, cancellations)
+            else:
+                decline_dispatch(db, dispatch)
+                background_tasks.add_task(send_dispatches, issue_id)
+        except DispatchConflictError as exc:
+            db.commit()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    elif db.scalar(select(VendorDispatch.id).where(VendorDispatch.issue_id == issue_id).limit(1)):
+        # Only the token path claims a dispatched issue with the conditional update; writing
+        # the status here would let a second vendor win too.
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This issue was dispatched; respond with the dispatch_token",
+        )
+    elif payload.accepted:
         issue.status = IssueStatus.IN_PROGRESS
         issue.appointment_at = payload.appointment_at
     else:
@@ -134,9 +272,9 @@ def handle_vendor_response(
         issue.appointment_at = None
 
     message_lines = [
-        "Vendor accepted the request."
+        f"{vendor_name} accepted the request."
         if payload.accepted
-        else "Vendor declined the request."
+        else f"{vendor_name} declined the request."
     ]
     if payload.accepted and payload.appointment_at:
         message_lines.append(f"Appointment: {payload.appointment_at.isoformat()}")
@@ -144,6 +282,7 @@ def handle_vendor_response(
         message_lines.append(f"Notes: {payload.notes}")
     notification = ChatMessage(
         issue_id=issue.id,
+        conversation_id=issue.conversation_id,
         property_id=issue.property_id,
         tenant_id=issue.tenant_id,
         role=ChatRole.LANDLORD,
@@ -151,6 +290,9 @@ def handle_vendor_response(
     )
     db.add(notification)
     db.commit()
+    if payload.dispatch_token is not None and payload.accepted:
+        # The assignment was a bulk conditional UPDATE, which the session hooks do not see.
+        cache.invalidate("issues", "wallets")
     db.refresh(issue)
     return issue
 
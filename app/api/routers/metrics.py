@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_idempotency_store, get_microcache, get_reference_cache
+from app.api.routing import ProfiledRoute
+from app.services.admission import chat_admission
+from app.services.cache import ReferenceCache
+from app.services.idempotency import IdempotencyStore
+from app.services.issue_similarity import issue_index
+from app.services.llm_metrics import llm_stats
+from app.services.microcache import MicroCache
+from app.services.read_routing import read_router
+from app.services.sql_instrumentation import route_stats
+from app.services.summary_worker import summary_worker
+from db import pool_stats
+
+router = APIRouter(tags=["metrics"], route_class=ProfiledRoute)
+
+
+@router.get("/metrics")
+def get_metrics(
+    cache: ReferenceCache = Depends(get_reference_cache),
+    idempotency: IdempotencyStore = Depends(get_idempotency_store),
+    responses: MicroCache = Depends(get_microcache),
+):
+    return {
+        "chat_admission": chat_admission.stats(),
+        "db_pool": pool_stats(),
+        "idempotency": idempotency.stats(),
+        "issue_similarity": issue_index.stats(),
+        "llm": llm_stats(),
+        "microcache": responses.stats(),
+        "read_routing": read_router.stats(),
+        "reference_cache": cache.stats(),
+        "sql_by_route": route_stats(),
+        "summary_worker": summary_worker.stats(),
+    }
@@ -1,21 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.models import PropertyRead
-from db import Property
+from app.api.deps import get_read_db, get_reference_cache
+from app.api.routing import ProfiledRoute
+from app.models import PropertyClusterRead, PropertyRead
+from app.services.cache import ReferenceCache
+from app.services.geo import CLUSTER_MAX_ZOOM, clusters_in_bbox, parse_bbox, properties_in_bbox
 
-router = APIRouter(tags=["properties"])
+router = APIRouter(tags=["properties"], route_class=ProfiledRoute)
 
 
-@router.get("/properties", response_model=list[PropertyRead])
-def list_properties(db: Session = Depends(get_db)):
-    return db.query(Property).all()
+@router.get("/properties", response_model=list[PropertyRead] | list[PropertyClusterRead])
+def list_properties(
+    bbox: str | None = None,
+    zoom: int | None = None,
+    db: Session = Depends(get_read_db),
+    cache: ReferenceCache = Depends(get_reference_cache),
+):
+    if bbox is None:
+        return cache.list_properties(db)
+    try:
+        bounds = parse_bbox(bbox)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if zoom is not None and zoom < CLUSTER_MAX_ZOOM:
+        return [PropertyClusterRead(**cluster) for cluster in clusters_in_bbox(db, bounds, zoom)]
+    return properties_in_bbox(db, bounds)
 
 
 @router.get("/properties/{property_id}", response_model=PropertyRead)
-def get_property(property_id: str, db: Session = Depends(get_db)):
-    property_ = db.get(Property, property_id)
+def get_property(
+    property_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    cache: ReferenceCache = Depends(get_reference_cache),
+):
+    property_ = cache.get_property(db, property_id)
     if not property_:
         raise HTTPException(status_code=404, detail="Property not found")
     return property_
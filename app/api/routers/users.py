@@ -1,24 +1,33 @@
+import uuid
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_read_db, get_reference_cache
+from app.api.routing import ProfiledRoute
 from app.models import UserRead
-from db import User, UserRole
+from app.services.cache import ReferenceCache
+from db import UserRole
 
-router = APIRouter(tags=["users"])
+router = APIRouter(tags=["users"], route_class=ProfiledRoute)
 
 
 @router.get("/users", response_model=list[UserRead])
-def list_users(role: UserRole | None = None, db: Session = Depends(get_db)):
-    query = db.query(User)
-    if role is not None:
-        query = query.filter(User.role == role)
-    return query.all()
+def list_users(
+    role: UserRole | None = None,
+    db: Session = Depends(get_read_db),
+    cache: ReferenceCache = Depends(get_reference_cache),
+):
+    return cache.list_users(db, role)
 
 
 @router.get("/users/{user_id}", response_model=UserRead)
-def get_user(user_id: str, db: Session = Depends(get_db)):
-    user = db.get(User, user_id)
+def get_user(
+    user_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    cache: ReferenceCache = Depends(get_reference_cache),
+):
+    user = cache.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_microcache, get_read_db, get_reference_cache
+from app.api.responses import cached_json
+from app.api.routing import ProfiledRoute
 from app.models import VendorRead
-from db import Vendor
+from app.services.cache import ReferenceCache
+from app.services.microcache import MicroCache
 
-router = APIRouter(tags=["vendors"])
+router = APIRouter(tags=["vendors"], route_class=ProfiledRoute)
+
+_vendor_list = TypeAdapter(list[VendorRead])
 
 
 @router.get("/vendors", response_model=list[VendorRead])
-def list_vendors(db: Session = Depends(get_db)):
-    return db.query(Vendor).all()
+def list_vendors(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    cache: ReferenceCache = Depends(get_reference_cache),
+    responses: MicroCache = Depends(get_microcache),
+):
+    return cached_json(
+        responses, request, "vendors", lambda: _vendor_list.dump_json(cache.list_vendors(db))
+    )
@@ -1,14 +1,20 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import TypeAdapter
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_db, get_microcache, get_read_db
+from app.api.responses import cached_json
+from app.api.routing import ProfiledRoute
 from app.models import WalletBalanceUpdate, WalletSummary, WalletTopupRequest
+from app.services.microcache import MicroCache
 from db import Issue, IssueStatus, Property, PropertyWallet, WalletTransaction
 
-router = APIRouter(tags=["wallets"])
+router = APIRouter(tags=["wallets"], route_class=ProfiledRoute)
+
+_wallet_list = TypeAdapter(list[WalletSummary])
 
 
 def _get_or_create_wallet(db: Session, property_id: uuid.UUID) -> PropertyWallet:
@@ -21,7 +27,17 @@ def _get_or_create_wallet(db: Session, property_id: uuid.UUID) -> PropertyWallet
 
 
 @router.get("/wallets", response_model=list[WalletSummary])
-def list_wallets(db: Session = Depends(get_db)):
+def list_wallets(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    cache: MicroCache = Depends(get_microcache),
+):
+    return cached_json(
+        cache, request, "wallets", lambda: _wallet_list.dump_json(_wallet_summaries(db))
+    )
+
+
+def _wallet_summaries(db: Session) -> list[WalletSummary]:
     wallets = db.query(PropertyWallet).all()
     results: list[WalletSummary] = []
     for wallet in wallets:
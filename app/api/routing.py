@@ -0,0 +1,15 @@
+import inspect
+
+from fastapi.routing import APIRoute
+
+from app.services.profiling import profiled
+
+
+class ProfiledRoute(APIRoute):
+    """Route whose sync endpoint is wrapped in `profiled`, so a profiled request's capture
+    includes the worker thread its endpoint runs on."""
+
+    def __init__(self, path: str, endpoint, **kwargs) -> None:
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
@@ -1,10 +1,69 @@
+import asyncio
+from contextlib import asynccontextmanager
+import os
+
+from anyio.to_thread import current_default_thread_limiter
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.routers import chat, health, issues, properties, users, vendors, wallets
+from db import load_environment
+
+load_environment()
+
+from app.api.middleware import (  # noqa: E402
+    AdmissionControlMiddleware,
+    CompressionMiddleware,
+    ProfilingMiddleware,
+    ReadYourWritesMiddleware,
+    SQLInstrumentationMiddleware,
+)
+from app.api.routers import (  # noqa: E402
+    admin,
+    chat,
+    export,
+    health,
+    issues,
+    metrics,
+    properties,
+    users,
+    vendors,
+    wallets,
+)
+from app.services.admission import chat_admission  # noqa: E402
+from app.services.cache import start_invalidation_listener  # noqa: E402
+from app.services.profiling import profile_store  # noqa: E402
+from app.services.read_routing import read_router  # noqa: E402
+from app.services.summary_worker import summary_worker  # noqa: E402
+from app.services.warmup import warm_up  # noqa: E402
+from db import dispose_engines, get_engine, pool_capacity  # noqa: E402
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_engine()
+    chat_admission.cap(pool_capacity())
+    chat_admission.cap(int(current_default_thread_limiter().total_tokens))
+    start_invalidation_listener(os.getenv("DATABASE_URL", ""))
+    summary_worker.start()
+    # Warm-up runs in the background so /api/health answers immediately.
+    warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    try:
+        yield
+    finally:
+        if not warmup_task.done():
+            warmup_task.cancel()
+        await asyncio.to_thread(summary_worker.stop)
+        dispose_engines()
+
 
-app = FastAPI(title="ProCo API")
+app = FastAPI(title="ProCo API", lifespan=lifespan)
 
+app.add_middleware(ReadYourWritesMiddleware, router=read_router)
+app.add_middleware(
+    AdmissionControlMiddleware,
+    controller=chat_admission,
+    paths={"/api/chat", "/api/chat/upload"},
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -15,7 +74,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Cache", "Retry-After", "X-Primary-Until"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(SQLInstrumentationMiddleware)
+# Outermost, so a capture covers every other middleware as well as the route.
+app.add_middleware(ProfilingMiddleware, store=profile_store)
 
 app.include_router(health.router, prefix="/api")
 app.include_router(issues.router, prefix="/api")
@@ -23,4 +87,7 @@ app.include_router(properties.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(vendors.router, prefix="/api")
 app.include_router(chat.router, prefix="/api")
-app.include_router(wallets.router, prefix="/api")
\ No newline at end of file
+app.include_router(wallets.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
+app.include_router(export.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
@@ -5,7 +5,15 @@ import uuid
 
 from pydantic import BaseModel, ConfigDict
 
-from db import ChatRole, IssueCategory, IssueStatus, UserRole, VendorSpecialty
+from db import (
+    ChatRole,
+    DispatchStatus,
+    IssueCategory,
+    IssueStatus,
+    SummaryStatus,
+    UserRole,
+    VendorSpecialty,
+)
 
 
 class UserRead(BaseModel):
@@ -27,6 +35,9 @@ class VendorRead(BaseModel):
     specialty: VendorSpecialty
     hourly_rate: float
     rating: float | None
+    latitude: float | None
+    longitude: float | None
+    service_radius_km: float | None
 
 
 class PropertyRead(BaseModel):
@@ -39,6 +50,14 @@ class PropertyRead(BaseModel):
     longitude: float | None
 
 
+class PropertyClusterRead(BaseModel):
+    geohash: str
+    count: int
+    latitude: float
+    longitude: float
+    open_issues: int
+
+
 class IssueRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -47,9 +66,11 @@ class IssueRead(BaseModel):
     property_id: uuid.UUID
     category: IssueCategory
     summary: str
+    summary_status: SummaryStatus = SummaryStatus.READY
     description: str
     status: IssueStatus
     vendor_id: uuid.UUID | None
+    conversation_id: uuid.UUID | None = None
     estimated_cost: float | None
     appointment_at: datetime | None
     created_at: datetime
@@ -60,11 +81,13 @@ class ChatMessageRead(BaseModel):
 
     id: uuid.UUID
     issue_id: uuid.UUID | None
+    conversation_id: uuid.UUID | None = None
     property_id: uuid.UUID | None
     tenant_id: uuid.UUID
     role: ChatRole
     content: str
     image_base64: str | None
+    image_key: str | None = None
     created_at: datetime
 
 
@@ -79,12 +102,15 @@ class ChatRequest(BaseModel):
     image_base64: str | None = None
     issue_id: uuid.UUID | None = None
     property_id: uuid.UUID | None = None
+    conversation_id: uuid.UUID | None = None
 
 
 class ChatResponse(BaseModel):
     response: str
     issue_created: bool
     issue_id: uuid.UUID | None = None
+    conversation_id: uuid.UUID | None = None
+    attached_to_existing: bool = False
 
 
 class IssueActionResponse(BaseModel):
@@ -96,6 +122,24 @@ class VendorResponseRequest(BaseModel):
     accepted: bool
     appointment_at: datetime | None = None
     notes: str | None = None
+    # The `dispatch` value from the vendor's response link when the request was dispatched.
+    dispatch_token: str | None = None
+
+
+class VendorDispatchRequest(BaseModel):
+    vendor_ids: list[uuid.UUID] | None = None
+
+
+class VendorDispatchRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    vendor_id: uuid.UUID
+    rank: int
+    status: DispatchStatus
+    sent_at: datetime | None
+    responded_at: datetime | None
+    created_at: datetime
 
 
 class WalletSummary(BaseModel):
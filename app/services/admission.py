@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+from collections import deque
+import math
+import os
+import time
+
+CHAT_MAX_CONCURRENT = int(os.getenv("CHAT_MAX_CONCURRENT", "8"))
+CHAT_QUEUE_SIZE = int(os.getenv("CHAT_QUEUE_SIZE", "32"))
+CHAT_QUEUE_TIMEOUT_SECONDS = float(os.getenv("CHAT_QUEUE_TIMEOUT_SECONDS", "10"))
+# DB connections and worker threads chat turns may never take, so landlord reads keep running.
+CHAT_READ_RESERVE = int(os.getenv("CHAT_READ_RESERVE", "2"))
+
+WAIT_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class AdmissionRejectedError(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit with a bounded FIFO wait queue for one class of expensive requests.
+
+    Runs on the event loop, so queued requests hold no worker thread or DB connection.
+    Arrivals whose expected wait (queue position x average service time / limit) exceeds
+    the queue timeout are rejected immediately rather than after waiting.
+    """
+
+    def __init__(
+        self,
+        limit: int = CHAT_MAX_CONCURRENT,
+        queue_size: int = CHAT_QUEUE_SIZE,
+        timeout: float = CHAT_QUEUE_TIMEOUT_SECONDS,
+    ):
+        self.limit = max(limit, 1)
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self.service_seconds = 1.0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._counts = {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_deadline": 0,
+            "timed_out": 0,
+        }
+        self._wait_ms_sum = 0.0
+        self._wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def cap(self, capacity: int | None) -> None:
+        """Keep CHAT_READ_RESERVE of a shared resource (DB pool, thread pool) free for reads."""
+        if capacity is not None:
+            self.limit = max(min(self.limit, capacity - CHAT_READ_RESERVE), 1)
+
+    def expected_wait(self, position: int) -> float:
+        return (position // self.limit + 1) * self.service_seconds
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._admitted(0.0)
+            return
+        if len(self._waiters) >= self.queue_size:
+            self._counts["rejected_queue_full"] += 1
+            raise AdmissionRejectedError("queue_full", self._retry_after(len(self._waiters)))
+        expected = self.expected_wait(len(self._waiters))
+        if expected > self.timeout:
+            self._counts["rejected_deadline"] += 1
+            raise AdmissionRejectedError("deadline", self._retry_after(len(self._waiters)))
+
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self._counts["timed_out"] += 1
+            raise AdmissionRejectedError("timeout", self._retry_after(len(self._waiters)))
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        self._admitted(time.perf_counter() - started)
+
+    def release(self, service_seconds: float) -> None:
+        # Exponentially weighted average of how long an admitted request holds its slot.
+        self.service_seconds += 0.2 * (service_seconds - self.service_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot passes straight to the next waiter
+                return
+        self.active -= 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # Granted a slot in the same tick it gave up; hand it on.
+            self.release(self.service_seconds)
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _admitted(self, waited: float) -> None:
+        self._counts["admitted"] += 1
+        self._wait_ms_sum += waited * 1000
+        self._wait_buckets[bisect_left(WAIT_BUCKETS_MS, waited * 1000)] += 1
+
+    def _retry_after(self, position: int) -> int:
+        return max(math.ceil(self.expected_wait(position)), 1)
+
+    def stats(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip((*WAIT_BUCKETS_MS, "+Inf"), self._wait_buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queue_depth": len(self._waiters),
+            "queue_size": self.queue_size,
+            "service_seconds_avg": round(self.service_seconds, 3),
+            **self._counts,
+            "wait_ms_sum": round(self._wait_ms_sum, 3),
+            "wait_ms_buckets": buckets,
+        }
+
+
+chat_admission = AdmissionController()
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
 import json
+import logging
+import os
+from typing import Literal
 import uuid
 
 from json import JSONDecodeError
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from app.services.ai_tools import build_summary, classify_issue, estimate_cost, pick_vendor
-from db import ChatMessage, ChatRole, Issue, IssueCategory, IssueStatus, Vendor, VendorSpecialty
+from app.services.ai_tools import (
+    build_summary,
+    classify_issue,
+    cross_check_severity,
+    estimate_cost,
+    rank_vendors,
+)
+from app.services.archival import archived_messages
+from app.services.cache import reference_cache
+from app.services.issue_similarity import issue_index
+from app.services.llm import get_chat_model
+from app.services.llm_metrics import invoke_llm
+from db import ChatMessage, ChatRole, Issue, IssueStatus, SummaryStatus, Vendor
 
 SYSTEM_PROMPT = """You are ProCo, an AI assistant helping tenants report property maintenance issues.
 
@@ -27,6 +41,94 @@ Your workflow:
     6, c. give the tenant an option to escalate the issue to the landlord
 Be conversational and empathetic. Keep replies concise"""
 
+logger = logging.getLogger(__name__)
+
+# "structured": one schema-validated model call per turn (reply, readiness, severity, start
+# time and landlord summary). "legacy": separate vendor-pick, JSON reply and summary calls.
+AGENT_MODE = (os.getenv("AGENT_MODE") or "structured").lower()
+
+DUPLICATE_REPLY = (
+    "Thanks, this has already been reported at your property and is being handled. "
+    "I've added your report to the existing request, so there's no need to file another."
+)
+# Sent when the model returned no usable reply; nothing is escalated on such a turn.
+CLARIFY_REPLY = (
+    "Sorry, I didn't quite get that. Could you describe the problem again, including when it "
+    "started and how serious it is?"
+)
+ESCALATED_REPLY = "Thanks, I've escalated this to your landlord."
+
+
+def has_explicit_permission(text: str) -> bool:
+    normalized = text.strip().lower()
+    confirmations = {
+        "yes",
+        "yes please",
+        "yep",
+        "yeah",
+        "sure",
+        "ok",
+        "okay",
+        "please do",
+        "go ahead",
+        "escalate",
+        "submit",
+        "send it",
+        "please escalate",
+        "yes escalate",
+        "confirm",
+    }
+    if normalized in confirmations:
+        return True
+    return any(
+        phrase in normalized
+        for phrase in (
+            "please escalate",
+            "go ahead and escalate",
+            "yes, escalate",
+            "yes, please",
+            "please submit",
+            "go ahead",
+            "you can escalate",
+            "submit it",
+        )
+    )
+
+
+class AgentTurn(BaseModel):
+    """Everything the model decides in one structured-output call."""
+
+    response: str = Field(description="Reply to the tenant. Never name the vendor.")
+    ready_to_create: bool = Field(
+        description="True only when the problem, start time and severity are known and the "
+        "tenant explicitly agreed to escalate."
+    )
+    severity: Literal["low", "medium", "high", "unknown"]
+    started: str = Field(description="When the problem started, in the tenant's words, or unknown.")
+    landlord_summary: str = Field(
+        description="When ready_to_create: 3-5 sentence landlord-ready summary with what the "
+        "issue is, when it started, what the tenant reports, severity, estimated cost and "
+        "suggested vendor. Otherwise empty."
+    )
+
+
+_structured_models: dict[int, object] = {}
+
+
+def _structured_turn(llm, messages: list) -> AgentTurn | None:
+    """Run the turn call, retrying once on a schema failure. The raw output is never shown
+    to the tenant: with JSON-schema output it is the model's unparsed JSON."""
+    structured = _structured_models.get(id(llm))
+    if structured is None:
+        structured = llm.with_structured_output(AgentTurn, include_raw=True)
+        _structured_models[id(llm)] = structured
+    for _ in range(2):
+        result = invoke_llm(structured, messages, "turn")
+        if result["parsed"] is not None:
+            return result["parsed"]
+        logger.warning("Agent turn failed schema validation: %s", result["parsing_error"])
+    return None
+
 
 def run_agent(
     db: Session,
@@ -35,78 +137,93 @@ def run_agent(
     message: str,
     image_description: str | None = None,
     issue_id: uuid.UUID | None = None,
+    conversation_id: uuid.UUID | None = None,
 ) -> tuple[str, uuid.UUID | None]:
     history: list[ChatMessage] = []
-    if issue_id is not None:
+    if conversation_id is not None:
         history = (
             db.query(ChatMessage)
-            .filter(ChatMessage.issue_id == issue_id)
+            .filter(ChatMessage.conversation_id == conversation_id)
             .order_by(ChatMessage.created_at.asc())
             .all()
         )
+        if issue_id is not None:
+            # Tenants can return to an issue whose earlier messages were archived.
+            history = archived_messages(db, conversation_id=conversation_id) + history
+    # The caller has already stored this turn's message; it is re-sent below with the image
+    # description attached.
+    if history and history[-1].role == ChatRole.USER and history[-1].content == message:
+        history = history[:-1]
 
     message_with_image = message
     if image_description:
         message_with_image = f"{message}\n\nImage description: {image_description}"
+    # Everything the tenant has said so far; the confirming turn alone ("yes please") says
+    # nothing about the problem.
+    tenant_report = "\n".join(
+        [chat.content for chat in history if chat.role == ChatRole.USER] + [message_with_image]
+    )
 
-    category = classify_issue(message_with_image)
+    category = classify_issue(tenant_report)
+    duplicate = None
+    if issue_id is None:
+        duplicate = issue_index.find_duplicate(db, property_id, category, tenant_report)
 
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+    llm = get_chat_model(temperature=0.7)
 
     def pick_vendor_with_llm() -> Vendor | None:
-        specialty_map = {
-            IssueCategory.HEATING: VendorSpecialty.HEATING,
-            IssueCategory.PLUMBING: VendorSpecialty.PLUMBING,
-            IssueCategory.ELECTRICAL: VendorSpecialty.ELECTRICAL,
-            IssueCategory.OTHER: VendorSpecialty.GENERAL,
-        }
-        preferred = specialty_map.get(category, VendorSpecialty.GENERAL)
-        candidates = (
-            db.query(Vendor)
-            .filter(Vendor.specialty == preferred)
-            .order_by(Vendor.rating.desc().nullslast())
-            .all()
-        )
-        if not candidates:
-            candidates = db.query(Vendor).order_by(Vendor.rating.desc().nullslast()).all()
+        property_ = reference_cache.get_property(db, property_id)
+        latitude = longitude = None
+        if property_ is not None and property_.latitude is not None:
+            latitude, longitude = property_.latitude, property_.longitude
+        candidates = rank_vendors(db, category, latitude, longitude)
         if not candidates:
             return None
+        if AGENT_MODE == "structured":
+            # rank_vendors already weighs rating, rate and distance; no model call needed.
+            return db.get(Vendor, candidates[0][0].id)
 
         vendor_list = [
             {
                 "id": str(vendor.id),
                 "name": vendor.name,
-                "hourly_rate": float(vendor.hourly_rate),
-                "rating": float(vendor.rating) if vendor.rating is not None else None,
+                "hourly_rate": vendor.hourly_rate,
+                "rating": vendor.rating,
+                "distance_km": round(distance_km, 1) if distance_km is not None else None,
             }
-            for vendor in candidates
+            for vendor, distance_km in candidates
         ]
         prompt = (
-            "Pick ONE vendor id from the list. Balance highest rating with reasonable cost; "
-            "prefer a slightly lower price if the rating difference is small. "
+            "Pick ONE vendor id from the list. Balance highest rating with reasonable cost "
+            "and travel distance; prefer a slightly lower price or a closer vendor if the "
+            "rating difference is small. "
             "Respond ONLY as JSON: {\"vendor_id\": \"...\"}."
         )
         try:
-            choice = llm.invoke([SystemMessage(content=prompt), HumanMessage(content=json.dumps(vendor_list))])
+            choice = invoke_llm(
+                llm,
+                [SystemMessage(content=prompt), HumanMessage(content=json.dumps(vendor_list))],
+                "vendor_pick",
+            )
             raw_choice = getattr(choice, "content", "") or str(choice)
             parsed_choice = json.loads(raw_choice)
             chosen_id = str(parsed_choice.get("vendor_id", "")).strip()
-            for vendor in candidates:
+            for vendor, _ in candidates:
                 if str(vendor.id) == chosen_id:
-                    return vendor
+                    return db.get(Vendor, vendor.id)
         except Exception:
             pass
 
-        return sorted(
-            candidates,
-            key=lambda vendor: (
-                -(vendor.rating or 0),
-                float(vendor.hourly_rate),
-            ),
-        )[0]
+        return db.get(Vendor, candidates[0][0].id)
 
-    vendor = pick_vendor_with_llm()
-    estimated = estimate_cost(float(vendor.hourly_rate), category) if vendor else None
+    if duplicate is not None:
+        # Already reported at this property: quote the open issue instead of picking a vendor.
+        vendor = duplicate.vendor
+        estimated = duplicate.estimated_cost
+        estimated = float(estimated) if estimated is not None else None
+    else:
+        vendor = pick_vendor_with_llm()
+        estimated = estimate_cost(float(vendor.hourly_rate), category) if vendor else None
     cost_text = f"${estimated:.2f}" if estimated is not None else "TBD"
     context_prompt = (
         "Decide if you have enough info to escalate. Required: "
@@ -114,9 +231,17 @@ def run_agent(
         "Also require explicit tenant permission to escalate. "
         "Ask one concise follow-up question if anything is missing. "
         "Do not reveal vendor identity. "
-        "Respond ONLY as JSON with keys: response (string), ready_to_create (boolean). "
-        f"\nCategory: {category.value}\nEstimated cost: {cost_text}"
     )
+    if AGENT_MODE == "structured":
+        context_prompt += (
+            "Fill every field of the schema; write landlord_summary only when ready_to_create. "
+            f"\nSuggested vendor: {vendor.name if vendor else 'Unassigned'}"
+        )
+    else:
+        context_prompt += (
+            "Respond ONLY as JSON with keys: response (string), ready_to_create (boolean). "
+        )
+    context_prompt += f"\nCategory: {category.value}\nEstimated cost: {cost_text}"
 
     messages = [SystemMessage(content=SYSTEM_PROMPT)]
     for chat in history:
@@ -127,101 +252,96 @@ def run_agent(
         else:
             messages.append(AIMessage(content=chat.content))
     messages.append(SystemMessage(content=context_prompt))
-    if not history or history[-1].role != ChatRole.USER or history[-1].content != message:
-        messages.append(HumanMessage(content=message_with_image))
-
-    response = llm.invoke(messages)
-    raw_text = getattr(response, "content", "") or str(response)
-    try:
-        parsed = json.loads(raw_text)
-        response_text = str(parsed.get("response", "")).strip()
-        ready_to_create = bool(parsed.get("ready_to_create", False))
-    except JSONDecodeError:
-        response_text = raw_text.strip()
-        ready_to_create = False
+    messages.append(HumanMessage(content=message_with_image))
 
-    def has_explicit_permission(text: str) -> bool:
-        normalized = text.strip().lower()
-        confirmations = {
-            "yes",
-            "yes please",
-            "yep",
-            "yeah",
-            "sure",
-            "ok",
-            "okay",
-            "please do",
-            "go ahead",
-            "escalate",
-            "submit",
-            "send it",
-            "please escalate",
-            "yes escalate",
-            "confirm",
-        }
-        if normalized in confirmations:
-            return True
-        return any(
-            phrase in normalized
-            for phrase in (
-                "please escalate",
-                "go ahead and escalate",
-                "yes, escalate",
-                "yes, please",
-                "please submit",
-                "go ahead",
-                "you can escalate",
-                "submit it",
-            )
-        )
+    turn = None
+    if AGENT_MODE == "structured":
+        turn = _structured_turn(llm, messages)
+        response_text = turn.response if turn is not None else CLARIFY_REPLY
+        ready_to_create = turn is not None and turn.ready_to_create
+    else:
+        response = invoke_llm(llm, messages, "reply")
+        raw_text = getattr(response, "content", "") or str(response)
+        try:
+            parsed = json.loads(raw_text)
+            response_text = str(parsed.get("response", "")).strip()
+            ready_to_create = bool(parsed.get("ready_to_create", False))
+        except JSONDecodeError:
+            # Plain prose is a usable reply; truncated or malformed JSON is not.
+            response_text = raw_text.strip()
+            if response_text.startswith(("{", "[", "```")):
+                response_text = CLARIFY_REPLY
+            ready_to_create = False
 
     if ready_to_create and not has_explicit_permission(message):
         ready_to_create = False
 
-    def build_llm_summary() -> str:
-        vendor_name = vendor.name if vendor else "Unassigned"
-        cost_text = f"${estimated:.2f}" if estimated is not None else "TBD"
-        summary_prompt = (
-            "Create a concise landlord-ready summary in 3-5 sentences. "
-            "Include: what the issue is, when it started, what the tenant reports, "
-            "severity, estimated cost, and suggested vendor. "
-            "If any detail is unknown, say it's unknown. "
-            f"\nCategory: {category.value}"
-            f"\nEstimated cost: {cost_text}"
-            f"\nSuggested vendor: {vendor_name}"
-        )
-        summary_messages = [SystemMessage(content=summary_prompt)]
-        issue_history = history
-        for chat in issue_history:
-            if chat.role == ChatRole.USER:
-                summary_messages.append(HumanMessage(content=chat.content))
-            elif chat.role == ChatRole.ASSISTANT:
-                summary_messages.append(AIMessage(content=chat.content))
-            else:
-                summary_messages.append(AIMessage(content=chat.content))
-        summary_messages.append(HumanMessage(content=message_with_image))
-        summary_response = llm.invoke(summary_messages)
-        summary_text = getattr(summary_response, "content", "") or str(summary_response)
-        return summary_text.strip()
-
-    summary = build_summary(message_with_image, category)
+    if issue_id is None and ready_to_create and duplicate is not None:
+        # Joining the open issue means no second summary, vendor request or wallet spend.
+        return DUPLICATE_REPLY, duplicate.id
+
     if issue_id is None and ready_to_create:
-        try:
-            summary = build_llm_summary()
-        except Exception:
-            summary = build_summary(message_with_image, category)
+        summary_status = SummaryStatus.PENDING
+        if turn is not None and turn.landlord_summary.strip():
+            summary = turn.landlord_summary.strip()
+            summary_status = SummaryStatus.READY
+        else:
+            # The landlord-ready LLM summary is written later by the summary worker so the
+            # confirming turn costs no extra model call.
+            started = turn.started if turn is not None and turn.started != "unknown" else None
+            summary = build_summary(
+                tenant_report,
+                category,
+                severity=cross_check_severity(turn.severity if turn else None, tenant_report),
+                started=started,
+            )
         issue = Issue(
             tenant_id=tenant_id,
             property_id=property_id,
             category=category,
             summary=summary,
-            description=message_with_image,
+            summary_status=summary_status,
+            description=tenant_report,
             status=IssueStatus.PENDING,
             vendor_id=vendor.id if vendor else None,
+            conversation_id=conversation_id,
             estimated_cost=estimated,
         )
         db.add(issue)
         db.flush()
         issue_id = issue.id
 
-    return response_text.strip() or "Thanks! I've logged your issue.", issue_id
+    created = ready_to_create and issue_id is not None
+    return response_text.strip() or (ESCALATED_REPLY if created else CLARIFY_REPLY), issue_id
+
+
+def build_llm_summary(db: Session, issue: Issue) -> str:
+    vendor = db.get(Vendor, issue.vendor_id) if issue.vendor_id else None
+    vendor_name = vendor.name if vendor else "Unassigned"
+    cost_text = f"${float(issue.estimated_cost):.2f}" if issue.estimated_cost is not None else "TBD"
+    summary_prompt = (
+        "Create a concise landlord-ready summary in 3-5 sentences. "
+        "Include: what the issue is, when it started, what the tenant reports, "
+        "severity, estimated cost, and suggested vendor. "
+        "If any detail is unknown, say it's unknown. "
+        f"\nCategory: {issue.category.value}"
+        f"\nEstimated cost: {cost_text}"
+        f"\nSuggested vendor: {vendor_name}"
+    )
+    if issue.conversation_id is not None:
+        history_filter = ChatMessage.conversation_id == issue.conversation_id
+    else:
+        history_filter = ChatMessage.issue_id == issue.id
+    history = db.query(ChatMessage).filter(history_filter).order_by(ChatMessage.created_at.asc()).all()
+    summary_messages = [SystemMessage(content=summary_prompt)]
+    for chat in history:
+        if chat.role == ChatRole.USER:
+            # Sent last instead, as part of the description (the tenant's report).
+            if chat.content not in issue.description:
+                summary_messages.append(HumanMessage(content=chat.content))
+        else:
+            summary_messages.append(AIMessage(content=chat.content))
+    summary_messages.append(HumanMessage(content=issue.description))
+    summary_response = invoke_llm(get_chat_model(temperature=0.7), summary_messages, "summary")
+    summary_text = getattr(summary_response, "content", "") or str(summary_response)
+    return summary_text.strip()
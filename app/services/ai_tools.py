@@ -4,6 +4,7 @@ from collections.abc import Sequence
 
 from sqlalchemy.orm import Session
 
+from app.services.vendor_index import VendorEntry, get_vendor_index
 from db import IssueCategory, Vendor, VendorSpecialty
 
 
@@ -22,23 +23,45 @@ def classify_issue(message: str) -> IssueCategory:
     return IssueCategory.OTHER
 
 
-def pick_vendor(db: Session, category: IssueCategory) -> Vendor | None:
-    specialty_map = {
-        IssueCategory.HEATING: VendorSpecialty.HEATING,
-        IssueCategory.PLUMBING: VendorSpecialty.PLUMBING,
-        IssueCategory.ELECTRICAL: VendorSpecialty.ELECTRICAL,
-        IssueCategory.OTHER: VendorSpecialty.GENERAL,
-    }
-    preferred = specialty_map.get(category, VendorSpecialty.GENERAL)
-    vendor = (
-        db.query(Vendor)
-        .filter(Vendor.specialty == preferred)
-        .order_by(Vendor.rating.desc().nullslast())
-        .first()
-    )
-    if vendor is None:
-        vendor = db.query(Vendor).order_by(Vendor.rating.desc().nullslast()).first()
-    return vendor
+SPECIALTY_MAP: dict[IssueCategory, VendorSpecialty] = {
+    IssueCategory.HEATING: VendorSpecialty.HEATING,
+    IssueCategory.PLUMBING: VendorSpecialty.PLUMBING,
+    IssueCategory.ELECTRICAL: VendorSpecialty.ELECTRICAL,
+    IssueCategory.OTHER: VendorSpecialty.GENERAL,
+}
+
+
+def rank_vendors(
+    db: Session,
+    category: IssueCategory,
+    latitude: float | None = None,
+    longitude: float | None = None,
+    k: int = 5,
+) -> list[tuple[VendorEntry, float | None]]:
+    index = get_vendor_index(db)
+    preferred = SPECIALTY_MAP.get(category, VendorSpecialty.GENERAL)
+    ranked = index.candidates(preferred, latitude, longitude, k)
+    if not ranked and latitude is not None:
+        # No specialist covers this location; the right trade further away beats the wrong one
+        # nearby.
+        ranked = index.candidates(preferred, k=k)
+    if not ranked:
+        ranked = index.any_specialty(latitude, longitude, k)
+    if not ranked and latitude is not None:
+        ranked = index.any_specialty(k=k)
+    return ranked
+
+
+def pick_vendor(
+    db: Session,
+    category: IssueCategory,
+    latitude: float | None = None,
+    longitude: float | None = None,
+) -> Vendor | None:
+    ranked = rank_vendors(db, category, latitude, longitude, k=1)
+    if not ranked:
+        return None
+    return db.get(Vendor, ranked[0][0].id)
 
 
 def estimate_cost(hourly_rate: float, category: IssueCategory) -> float:
@@ -74,10 +97,27 @@ def _extract_started(message: str) -> str:
     return "Unknown"
 
 
-def build_summary(message: str, category: IssueCategory) -> str:
+SEVERITY_RANK = {"Low": 0, "Medium": 1, "High": 2}
+
+
+def cross_check_severity(reported: str | None, message: str) -> str:
+    """The model's severity, raised to the keyword heuristic's if that finds it more urgent."""
+    heuristic = _extract_severity(message)
+    reported = (reported or "").title()
+    if reported not in SEVERITY_RANK:
+        return heuristic
+    return max(reported, heuristic, key=SEVERITY_RANK.__getitem__)
+
+
+def build_summary(
+    message: str,
+    category: IssueCategory,
+    severity: str | None = None,
+    started: str | None = None,
+) -> str:
     truncated = (message[:180] + "...") if len(message) > 180 else message
-    severity = _extract_severity(message)
-    started = _extract_started(message)
+    severity = severity or _extract_severity(message)
+    started = started or _extract_started(message)
     return (
         f"{category.value.title()} issue. "
         f"Tenant report: {truncated} "
@@ -0,0 +1,251 @@
+"""Move chat threads of issues closed more than ARCHIVE_AFTER_DAYS ago into chat_message_archive.
+
+Usage: DATABASE_URL=... python -m app.services.archival [--max-batches N]
+"""
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+import enum
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+import uuid
+import zlib
+
+from sqlalchemy import DateTime, and_, delete, exists, or_, select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+from db import (
+    CLOSED_ISSUE_STATUSES,
+    ChatMessage,
+    ChatMessageArchive,
+    ChatRole,
+    Issue,
+    as_utc,
+    get_sessionmaker,
+)
+
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+# Issues moved per transaction, and the pause between batches that keeps the job from
+# competing with request traffic for I/O and locks.
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "100"))
+ARCHIVE_BATCH_PAUSE_SECONDS = float(os.getenv("ARCHIVE_BATCH_PAUSE_SECONDS", "0.5"))
+
+_COLUMNS = tuple(ChatMessage.__table__.columns)
+
+
+def _thread(issue_id: uuid.UUID, conversation_id: uuid.UUID | None):
+    """The messages list_issue_messages shows for an issue."""
+    if conversation_id is not None:
+        return ChatMessage.conversation_id == conversation_id
+    return ChatMessage.issue_id == issue_id
+
+
+# _thread for every issue at once, correlated with the issues row.
+_ISSUE_THREAD = or_(
+    ChatMessage.conversation_id == Issue.conversation_id,
+    and_(Issue.conversation_id.is_(None), ChatMessage.issue_id == Issue.id),
+)
+
+
+def _encode(message: ChatMessage) -> dict:
+    row = {}
+    for column in _COLUMNS:
+        value = getattr(message, column.key)
+        if isinstance(value, enum.Enum):
+            value = value.value
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        row[column.key] = value
+    return row
+
+
+def _decode(row: dict) -> ChatMessage:
+    values = {}
+    for column in _COLUMNS:
+        value = row.get(column.key)
+        if value is not None:
+            if column.key == "role":
+                value = ChatRole(value)
+            elif isinstance(column.type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column.type, UUID):
+                value = uuid.UUID(value)
+        values[column.key] = value
+    return ChatMessage(**values)
+
+
+def _pack(rows: list[dict]) -> tuple[bytes, int]:
+    raw = json.dumps(rows, separators=(",", ":")).encode()
+    return zlib.compress(raw, 9), len(raw)
+
+
+def _unpack(payload: bytes) -> list[dict]:
+    return json.loads(zlib.decompress(payload))
+
+
+def archived_messages(
+    db: Session, issue_id: uuid.UUID | None = None, conversation_id: uuid.UUID | None = None
+) -> list[ChatMessage]:
+    """Archived messages of an issue's thread, oldest first, as detached ChatMessage objects."""
+    statement = select(ChatMessageArchive.payload)
+    if issue_id is not None:
+        statement = statement.where(ChatMessageArchive.issue_id == issue_id)
+    else:
+        statement = statement.where(ChatMessageArchive.conversation_id == conversation_id)
+    return [_decode(row) for payload in db.scalars(statement) for row in _unpack(payload)]
+
+
+def stream_archived_messages(
+    db: Session, since: datetime | None, until: datetime, batch_size: int = 100
+) -> Iterator[ChatMessage]:
+    """Archived messages of every thread created in [since, until], in (created_at, id) order.
+
+    Archive rows are read by their first message; a message is released once no later row
+    can hold an earlier one, so only the threads overlapping in time are held in memory.
+    """
+    statement = (
+        select(ChatMessageArchive.first_message_at, ChatMessageArchive.payload)
+        .where(ChatMessageArchive.first_message_at <= until)
+        .order_by(ChatMessageArchive.first_message_at.asc(), ChatMessageArchive.issue_id.asc())
+    )
+    if since is not None:
+        statement = statement.where(ChatMessageArchive.last_message_at >= since)
+    since = as_utc(since) if since is not None else None
+    until = as_utc(until)
+    # The sequence number breaks ties, so equal keys never compare the messages themselves.
+    pending: list[tuple[datetime, uuid.UUID, int, ChatMessage]] = []
+    sequence = itertools.count()
+    result = db.execute(statement.execution_options(yield_per=batch_size))
+    for first_message_at, payload in result:
+        while pending and pending[0][0] < as_utc(first_message_at):
+            yield heapq.heappop(pending)[3]
+        for row in _unpack(payload):
+            message = _decode(row)
+            created_at = as_utc(message.created_at)
+            if (since is None or created_at >= since) and created_at <= until:
+                heapq.heappush(pending, (created_at, message.id, next(sequence), message))
+    while pending:
+        yield heapq.heappop(pending)[3]
+
+
+class ArchiveJob:
+    """Resumable, throttled mover of cold threads from chat_messages to chat_message_archive.
+
+    A batch's threads are written to the archive in the same transaction that deletes them
+    from chat_messages, so an interrupted run leaves every thread either hot or archived and
+    the next run picks up the rest. Messages added to a thread after it was archived are
+    merged into its archive row by a later run.
+    """
+
+    def __init__(
+        self,
+        after_days: float = ARCHIVE_AFTER_DAYS,
+        batch_size: int = ARCHIVE_BATCH_SIZE,
+        pause: float = ARCHIVE_BATCH_PAUSE_SECONDS,
+    ):
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.pause = pause
+        self.issues = 0
+        self.messages = 0
+        self.raw_bytes = 0
+        self.archived_bytes = 0
+
+    def run(self, max_batches: int | None = None) -> int:
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = self.run_once()
+            batches += 1
+            if moved < self.batch_size:
+                break
+            time.sleep(self.pause)
+        return self.issues
+
+    def run_once(self) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.after_days)
+        with get_sessionmaker()() as db:
+            candidates = db.execute(self._candidates(cutoff)).all()
+            for issue_id, conversation_id in candidates:
+                self._archive(db, issue_id, conversation_id)
+            db.commit()
+        return len(candidates)
+
+    def _candidates(self, cutoff: datetime):
+        return (
+            select(Issue.id, Issue.conversation_id)
+            .where(
+                Issue.status.in_(CLOSED_ISSUE_STATUSES),
+                Issue.closed_at < cutoff,
+                exists().where(_ISSUE_THREAD),
+                # A thread someone wrote to recently is still in use.
+                ~exists().where(and_(_ISSUE_THREAD, ChatMessage.created_at >= cutoff)),
+            )
+            .order_by(Issue.closed_at.asc(), Issue.id.asc())
+            .limit(self.batch_size)
+        )
+
+    def _archive(
+        self, db: Session, issue_id: uuid.UUID, conversation_id: uuid.UUID | None
+    ) -> None:
+        messages = db.scalars(
+            select(ChatMessage)
+            .where(_thread(issue_id, conversation_id))
+            .order_by(ChatMessage.created_at.asc())
+        ).all()
+        rows = [_encode(message) for message in messages]
+        archive = db.get(ChatMessageArchive, issue_id)
+        if archive is None:
+            archive = ChatMessageArchive(issue_id=issue_id, conversation_id=conversation_id)
+            db.add(archive)
+        else:
+            rows = _unpack(archive.payload) + rows
+        archive.payload, raw_bytes = _pack(rows)
+        archive.message_count = len(rows)
+        archive.first_message_at = datetime.fromisoformat(rows[0]["created_at"])
+        archive.last_message_at = datetime.fromisoformat(rows[-1]["created_at"])
+        db.execute(
+            delete(ChatMessage)
+            .where(ChatMessage.id.in_([message.id for message in messages]))
+            .execution_options(synchronize_session=False)
+        )
+        for message in messages:
+            db.expunge(message)
+        self.issues += 1
+        self.messages += len(messages)
+        self.raw_bytes += raw_bytes
+        self.archived_bytes += len(archive.payload)
+
+    def stats(self) -> dict:
+        return {
+            "issues": self.issues,
+            "messages": self.messages,
+            "raw_bytes": self.raw_bytes,
+            "archived_bytes": self.archived_bytes,
+        }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.services.archival", description=__doc__)
+    parser.add_argument("--after-days", type=float, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=ARCHIVE_BATCH_PAUSE_SECONDS)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    job = ArchiveJob(args.after_days, args.batch_size, args.pause)
+    job.run(args.max_batches)
+    print(json.dumps(job.stats()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+import logging
+import os
+import threading
+import time
+from typing import Any
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models import PropertyRead, UserRead, VendorRead
+from app.services.read_routing import READ_REPLICA_MAX_LAG_SECONDS
+from db import Property, User, UserRole, Vendor, run_on_commit
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "60"))
+CACHE_MAXSIZE = int(os.getenv("REFERENCE_CACHE_MAXSIZE", "1024"))
+# Postgres LISTEN/NOTIFY channel used to fan invalidations out to other workers.
+CACHE_NOTIFY_CHANNEL = os.getenv("REFERENCE_CACHE_NOTIFY_CHANNEL")
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU cache with per-entry expiry. clear() bumps a generation so a load that started
+    before it is returned to its caller but never stored."""
+
+    def __init__(self, maxsize: int = CACHE_MAXSIZE, ttl: float = CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Any, value: Any, generation: int | None = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key: Any, loader: Callable[[], Any], store: bool = True) -> Any:
+        value = self.get(key)
+        if value is _MISSING:
+            with self._lock:
+                generation = self._generation
+            value = loader()
+            if value is not None and store:
+                self.set(key, value, generation)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+    def stats(self) -> dict[str, float | int]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class ReferenceCache:
+    """Read-through cache of rarely-changing rows, stored as detached read models."""
+
+    NAMESPACES = {User: "users", Property: "properties", Vendor: "vendors"}
+
+    def __init__(self) -> None:
+        self._caches = {name: TTLCache() for name in self.NAMESPACES.values()}
+        self._invalidated_at: dict[str, float] = {}
+
+    def _may_store(self, name: str, db: Session) -> bool:
+        # A replica can still be missing the write that just cleared this namespace.
+        if "replica" not in db.info:
+            return True
+        invalidated_at = self._invalidated_at.get(name, float("-inf"))
+        return time.monotonic() - invalidated_at > READ_REPLICA_MAX_LAG_SECONDS
+
+    def get_user(self, db: Session, user_id: uuid.UUID) -> UserRead | None:
+        def load() -> UserRead | None:
+            user = db.get(User, user_id)
+            return UserRead.model_validate(user) if user is not None else None
+
+        return self._caches["users"].get_or_load(
+            ("id", user_id), load, self._may_store("users", db)
+        )
+
+    def list_users(self, db: Session, role: UserRole | None = None) -> list[UserRead]:
+        def load() -> list[UserRead]:
+            query = db.query(User)
+            if role is not None:
+                query = query.filter(User.role == role)
+            return [UserRead.model_validate(user) for user in query.all()]
+
+        return self._caches["users"].get_or_load(
+            ("list", role), load, self._may_store("users", db)
+        )
+
+    def get_property(self, db: Session, property_id: uuid.UUID) -> PropertyRead | None:
+        def load() -> PropertyRead | None:
+            property_ = db.get(Property, property_id)
+            return PropertyRead.model_validate(property_) if property_ is not None else None
+
+        return self._caches["properties"].get_or_load(
+            ("id", property_id), load, self._may_store("properties", db)
+        )
+
+    def list_properties(self, db: Session) -> list[PropertyRead]:
+        return self._caches["properties"].get_or_load(
+            ("list",),
+            lambda: [PropertyRead.model_validate(p) for p in db.query(Property).all()],
+            self._may_store("properties", db),
+        )
+
+    def list_vendors(self, db: Session) -> list[VendorRead]:
+        return self._caches["vendors"].get_or_load(
+            ("list",),
+            lambda: [VendorRead.model_validate(v) for v in db.query(Vendor).all()],
+            self._may_store("vendors", db),
+        )
+
+    def invalidate(self, *namespaces: str) -> None:
+        for name in namespaces or self._caches:
+            cache = self._caches.get(name)
+            if cache is not None:
+                cache.clear()
+                self._invalidated_at[name] = time.monotonic()
+
+    def stats(self) -> dict[str, dict[str, float | int]]:
+        return {name: cache.stats() for name, cache in self._caches.items()}
+
+
+reference_cache = ReferenceCache()
+
+
+def _collect_invalidations(session: Session) -> set[str]:
+    touched = {
+        ReferenceCache.NAMESPACES[type(obj)]
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if type(obj) in ReferenceCache.NAMESPACES
+    }
+    if touched and CACHE_NOTIFY_CHANNEL and session.get_bind().dialect.name == "postgresql":
+        # Delivered to listeners only if the transaction commits.
+        session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CACHE_NOTIFY_CHANNEL, "payload": ",".join(sorted(touched))},
+        )
+    return touched
+
+
+run_on_commit(
+    "reference_cache",
+    _collect_invalidations,
+    lambda changes: reference_cache.invalidate(*set().union(*changes)),
+)
+
+
+_listener_started = False
+
+
+def start_invalidation_listener(database_url: str) -> None:
+    """Invalidate this worker's cache when another worker commits a reference-data write."""
+    global _listener_started
+    if _listener_started or not CACHE_NOTIFY_CHANNEL or not database_url.startswith("postgresql"):
+        return
+    _listener_started = True
+
+    def listen() -> None:
+        import psycopg
+
+        dsn = database_url.replace("postgresql+psycopg://", "postgresql://", 1)
+        while True:
+            try:
+                with psycopg.connect(dsn, autocommit=True) as conn:
+                    conn.execute(f'LISTEN "{CACHE_NOTIFY_CHANNEL}"')
+                    reference_cache.invalidate()
+                    for notify in conn.notifies():
+                        reference_cache.invalidate(*notify.payload.split(","))
+            except Exception:
+                logger.exception("Reference cache listener disconnected; retrying")
+                reference_cache.invalidate()
+                time.sleep(5)
+
+    threading.Thread(target=listen, name="reference-cache-listener", daemon=True).start()
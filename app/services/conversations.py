@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from db import Conversation, Issue, IssueAttachment
+
+
+def resolve_conversation(
+    db: Session,
+    tenant_id: uuid.UUID,
+    property_id: uuid.UUID,
+    conversation_id: uuid.UUID | None = None,
+    issue_id: uuid.UUID | None = None,
+) -> Conversation:
+    """Conversation a new chat message belongs to; creates one on the tenant's first message.
+
+    Clients that do not send conversation_id continue the tenant's open conversation for the
+    property, which is what messages with no issue yet used to be grouped by. A named
+    conversation that was closed by escalation is continued through its issue_id; without one the
+    message starts a new conversation, so one conversation never yields two issues.
+    """
+    if conversation_id is not None:
+        conversation = db.get(Conversation, conversation_id)
+        if (
+            conversation is None
+            or conversation.tenant_id != tenant_id
+            or conversation.property_id != property_id
+        ):
+            raise ValueError("Conversation not found")
+        if conversation.closed_at is None:
+            return conversation
+
+    if issue_id is not None:
+        issue = db.get(Issue, issue_id)
+        if issue is None:
+            raise ValueError("Issue not found")
+        if issue.tenant_id != tenant_id:
+            # Tenants attached to another tenant's issue as a duplicate keep their own
+            # conversation.
+            attached = db.scalars(
+                select(Conversation)
+                .join(IssueAttachment, IssueAttachment.conversation_id == Conversation.id)
+                .where(IssueAttachment.issue_id == issue_id, Conversation.tenant_id == tenant_id)
+                .order_by(Conversation.created_at.desc())
+            ).first()
+            if attached is None:
+                raise ValueError("Issue not found")
+            return attached
+        if issue.conversation is not None:
+            return issue.conversation
+        conversation = Conversation(
+            tenant_id=issue.tenant_id, property_id=issue.property_id, closed_at=func.now()
+        )
+        issue.conversation = conversation
+        db.flush()
+        return conversation
+
+    conversation = (
+        db.query(Conversation)
+        .filter(
+            Conversation.tenant_id == tenant_id,
+            Conversation.property_id == property_id,
+            Conversation.closed_at.is_(None),
+        )
+        .order_by(Conversation.created_at.desc())
+        .first()
+    )
+    if conversation is None:
+        conversation = Conversation(tenant_id=tenant_id, property_id=property_id)
+        db.add(conversation)
+        db.flush()
+    return conversation
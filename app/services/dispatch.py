@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+import logging
+import os
+import secrets
+import uuid
+
+import anyio.to_thread
+import httpx
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.services.ai_tools import rank_vendors
+from app.services.profiling import profiled
+from db import (
+    ChatMessage,
+    ChatRole,
+    DispatchStatus,
+    Issue,
+    IssueStatus,
+    Property,
+    Vendor,
+    VendorDispatch,
+    get_sessionmaker,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VENDOR_WEBHOOK_URL = (
+    "https://meko27.app.n8n.cloud/webhook/74eab492-eeba-48a1-9669-4901608bd2a7"
+)
+# An empty value (e.g. copied from .env.example) means the default too.
+VENDOR_WEBHOOK_URL = os.getenv("VENDOR_WEBHOOK_URL") or DEFAULT_VENDOR_WEBHOOK_URL
+# Vendors asked at once; the other candidates wait in rank order for a decline or failed send.
+DISPATCH_FANOUT = int(os.getenv("DISPATCH_FANOUT", "3"))
+DISPATCH_CANDIDATES = int(os.getenv("DISPATCH_CANDIDATES", "6"))
+
+# Issues a vendor can still be assigned to.
+DISPATCHABLE_STATUSES = (IssueStatus.PENDING, IssueStatus.APPROVED)
+OUTSTANDING_STATUSES = (DispatchStatus.QUEUED, DispatchStatus.SENT)
+
+
+class DispatchConflictError(Exception):
+    pass
+
+
+class VendorWebhookError(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def vendor_notice(
+    db: Session, issue: Issue, vendor: Vendor, event: str, token: str | None = None
+) -> dict:
+    """Webhook payload for a vendor request ("vendor_request") or its cancellation."""
+    property_ = db.get(Property, issue.property_id)
+    landlord = property_.landlord if property_ is not None else None
+    payload = {
+        "event": event,
+        "vendor_email": vendor.email,
+        "property_address": property_.address if property_ is not None else None,
+        "landlord_name": landlord.name if landlord is not None else "Unknown Landlord",
+        "issue_id": str(issue.id),
+    }
+    if event == "vendor_request":
+        frontend_base_url = os.getenv("FRONTEND_PUBLIC_URL", "http://localhost:3000")
+        response_url = f"{frontend_base_url.rstrip('/')}/vendor/respond?issue_id={issue.id}"
+        if token is not None:
+            response_url += f"&dispatch={token}"
+        payload["vendor_response_url"] = response_url
+    return payload
+
+
+async def post_webhook(client: httpx.AsyncClient, payload: dict) -> None:
+    response = await client.post(VENDOR_WEBHOOK_URL, json=payload)
+    if response.status_code >= 400:
+        raise VendorWebhookError(response.text.strip() or "Vendor webhook request failed")
+
+
+def start_dispatch(
+    db: Session, issue: Issue, vendor_ids: list[uuid.UUID] | None = None
+) -> list[VendorDispatch]:
+    """Queue vendors for an issue: `vendor_ids` in that order, or the top-ranked ones.
+
+    Vendors already asked about this issue are skipped, except those whose request failed to
+    send, which are asked again. Raises DispatchConflictError when the issue cannot take a
+    vendor or a dispatch is still running, ValueError when nobody is left.
+    """
+    if issue.status not in DISPATCHABLE_STATUSES:
+        raise DispatchConflictError(f"Issue is {issue.status.value}; it is not awaiting a vendor")
+    previous = db.execute(
+        select(VendorDispatch.vendor_id, VendorDispatch.status).where(
+            VendorDispatch.issue_id == issue.id
+        )
+    ).all()
+    if any(row.status in OUTSTANDING_STATUSES for row in previous):
+        raise DispatchConflictError("A vendor dispatch for this issue is already in progress")
+    asked = {row.vendor_id for row in previous if row.status != DispatchStatus.FAILED}
+
+    if vendor_ids is None:
+        property_ = db.get(Property, issue.property_id)
+        ranked = rank_vendors(
+            db,
+            issue.category,
+            float(property_.latitude) if property_ and property_.latitude is not None else None,
+            float(property_.longitude) if property_ and property_.longitude is not None else None,
+            k=DISPATCH_CANDIDATES + len(asked),
+        )
+        vendor_ids = [entry.id for entry, _ in ranked]
+    candidates = [vendor_id for vendor_id in dict.fromkeys(vendor_ids) if vendor_id not in asked]
+    reachable = set(
+        db.scalars(
+            select(Vendor.id).where(Vendor.id.in_(candidates), Vendor.email.is_not(None))
+        )
+    )
+    candidates = [vendor_id for vendor_id in candidates if vendor_id in reachable]
+    if not candidates:
+        raise ValueError("No vendors with an email address are left to ask")
+
+    dispatches = [
+        VendorDispatch(
+            issue_id=issue.id,
+            vendor_id=vendor_id,
+            rank=len(previous) + rank,
+            status=DispatchStatus.QUEUED,
+            token=secrets.token_urlsafe(24),
+        )
+        for rank, vendor_id in enumerate(candidates)
+    ]
+    db.add_all(dispatches)
+    db.flush()
+    return dispatches
+
+
+def _claim(db: Session, issue: Issue) -> list[VendorDispatch]:
+    """Move queued candidates to SENT, in rank order, until DISPATCH_FANOUT are awaiting an
+    answer. Each claim is a conditional update, so concurrent cascades never send twice."""
+    if issue.status not in DISPATCHABLE_STATUSES:
+        return []
+    sent = db.scalar(
+        select(func.count()).where(
+            VendorDispatch.issue_id == issue.id, VendorDispatch.status == DispatchStatus.SENT
+        )
+    )
+    queued = db.scalars(
+        select(VendorDispatch)
+        .where(VendorDispatch.issue_id == issue.id, VendorDispatch.status == DispatchStatus.QUEUED)
+        .order_by(VendorDispatch.rank.asc())
+        .limit(max(DISPATCH_FANOUT - sent, 0))
+    ).all()
+    claimed = []
+    for dispatch in queued:
+        result = db.execute(
+            update(VendorDispatch)
+            .where(VendorDispatch.id == dispatch.id, VendorDispatch.status == DispatchStatus.QUEUED)
+            .values(status=DispatchStatus.SENT, sent_at=_now())
+        )
+        if result.rowcount:
+            claimed.append(dispatch)
+    return claimed
+
+
+def _reject_if_exhausted(db: Session, issue: Issue) -> None:
+    if issue.status not in DISPATCHABLE_STATUSES:
+        return
+    statuses = set(
+        db.scalars(select(VendorDispatch.status).where(VendorDispatch.issue_id == issue.id))
+    )
+    # Only vendors' answers reject the issue. A send that failed says nothing about the
+    # vendor, so the issue stays open for the landlord to dispatch again.
+    if statuses != {DispatchStatus.DECLINED}:
+        return
+    # Same outcome as a declined single-vendor request: the landlord starts over.
+    issue.status = IssueStatus.REJECTED
+    issue.appointment_at = None
+    db.add(
+        ChatMessage(
+            issue_id=issue.id,
+            conversation_id=issue.conversation_id,
+            property_id=issue.property_id,
+            tenant_id=issue.tenant_id,
+            role=ChatRole.LANDLORD,
+            content="No vendor accepted the request.",
+        )
+    )
+
+
+@profiled
+def _claim_notices(issue_id: uuid.UUID) -> list[tuple[uuid.UUID, dict]]:
+    with get_sessionmaker()() as db:
+        issue = db.get(Issue, issue_id)
+        if issue is None:
+            return []
+        claimed = _claim(db, issue)
+        if not claimed:
+            _reject_if_exhausted(db, issue)
+        notices = [
+            (
+                dispatch.id,
+                vendor_notice(db, issue, dispatch.vendor, "vendor_request", dispatch.token),
+            )
+            for dispatch in claimed
+        ]
+        db.commit()
+        return notices
+
+
+@profiled
+def _mark_failed(dispatch_ids: list[uuid.UUID]) -> None:
+    with get_sessionmaker()() as db:
+        db.execute(
+            update(VendorDispatch)
+            .where(
+                VendorDispatch.id.in_(dispatch_ids), VendorDispatch.status == DispatchStatus.SENT
+            )
+            .values(status=DispatchStatus.FAILED)
+        )
+        db.commit()
+
+
+async def send_dispatches(issue_id: uuid.UUID) -> None:
+    """Send every request that is due, concurrently; failed sends cascade to the next
+    candidates, and an issue whose candidates have all declined is rejected."""
+    async with httpx.AsyncClient(timeout=10) as client:
+        while True:
+            notices = await anyio.to_thread.run_sync(_claim_notices, issue_id)
+            if not notices:
+                return
+            results = await asyncio.gather(
+                *(post_webhook(client, payload) for _, payload in notices), return_exceptions=True
+            )
+            failed = [
+                dispatch_id
+                for (dispatch_id, _), result in zip(notices, results)
+                if isinstance(result, Exception)
+            ]
+            if not failed:
+                return
+            logger.warning(
+                "Vendor request for issue %s failed for %d vendors", issue_id, len(failed)
+            )
+            await anyio.to_thread.run_sync(_mark_failed, failed)
+
+
+async def send_cancellations(notices: list[dict]) -> None:
+    async with httpx.AsyncClient(timeout=10) as client:
+        results = await asyncio.gather(
+            *(post_webhook(client, payload) for payload in notices), return_exceptions=True
+        )
+    for payload, result in zip(notices, results):
+        if isinstance(result, Exception):
+            logger.warning("Cancellation notice to %s failed: %s", payload["vendor_email"], result)
+
+
+def accept_dispatch(
+    db: Session, dispatch: VendorDispatch, appointment_at: datetime
+) -> list[dict]:
+    """Assign the issue to this vendor if nobody accepted first; returns the cancellation
+    notices for the other vendors that were asked.
+
+    The issue is claimed with a conditional update, so of several simultaneous acceptances
+    exactly one matches. Raises DispatchConflictError for the others (their dispatch is
+    cancelled; commit before surfacing the error) and for requests no longer open.
+    """
+    opened = db.execute(
+        update(VendorDispatch)
+        .where(VendorDispatch.id == dispatch.id, VendorDispatch.status == DispatchStatus.SENT)
+        .values(status=DispatchStatus.ACCEPTED, responded_at=_now())
+    )
+    if not opened.rowcount:
+        raise DispatchConflictError("This vendor request is no longer open")
+    won = db.execute(
+        update(Issue)
+        .where(Issue.id == dispatch.issue_id, Issue.status.in_(DISPATCHABLE_STATUSES))
+        .values(
+            status=IssueStatus.IN_PROGRESS,
+            vendor_id=dispatch.vendor_id,
+            appointment_at=appointment_at,
+        )
+    )
+    if not won.rowcount:
+        dispatch.status = DispatchStatus.CANCELLED
+        raise DispatchConflictError("Another vendor has already accepted this job")
+
+    others = db.scalars(
+        select(VendorDispatch).where(
+            VendorDispatch.issue_id == dispatch.issue_id,
+            VendorDispatch.id != dispatch.id,
+            VendorDispatch.status.in_(OUTSTANDING_STATUSES),
+        )
+    ).all()
+    issue = db.get(Issue, dispatch.issue_id)
+    notices = [
+        vendor_notice(db, issue, other.vendor, "vendor_request_cancelled")
+        for other in others
+        if other.status == DispatchStatus.SENT
+    ]
+    for other in others:
+        other.status = DispatchStatus.CANCELLED
+    return notices
+
+
+def decline_dispatch(db: Session, dispatch: VendorDispatch) -> None:
+    """Record a decline; send_dispatches then asks the next candidate."""
+    declined = db.execute(
+        update(VendorDispatch)
+        .where(VendorDispatch.id == dispatch.id, VendorDispatch.status == DispatchStatus.SENT)
+        .values(status=DispatchStatus.DECLINED, responded_at=_now())
+    )
+    if not declined.rowcount:
+        raise DispatchConflictError("This vendor request is no longer open")
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import math
+import os
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from db import GEOHASH_PRECISION, OPEN_ISSUE_STATUSES, Issue, Property, encode_geohash
+
+BBox = tuple[float, float, float, float]
+
+MAX_COVER_CELLS = 32
+CLUSTER_MAX_ZOOM = int(os.getenv("MAP_CLUSTER_MAX_ZOOM", "11"))
+
+
+def parse_bbox(raw: str) -> BBox:
+    parts = [part.strip() for part in raw.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+    min_lng, min_lat, max_lng, max_lat = (float(part) for part in parts)
+    if not (-180 <= min_lng <= 180 and -180 <= max_lng <= 180):
+        raise ValueError("bbox longitudes must be within [-180, 180]")
+    if not (-90 <= min_lat <= max_lat <= 90):
+        raise ValueError("bbox latitudes must be within [-90, 90] and min <= max")
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def _split_antimeridian(bbox: BBox) -> list[BBox]:
+    min_lng, min_lat, max_lng, max_lat = bbox
+    if min_lng <= max_lng:
+        return [bbox]
+    return [(min_lng, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lng, max_lat)]
+
+
+def _cell_size(precision: int) -> tuple[float, float]:
+    bits = precision * 5
+    lng_bits = math.ceil(bits / 2)
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def _cover(bbox: BBox, precision: int) -> set[str] | None:
+    min_lng, min_lat, max_lng, max_lat = bbox
+    lat_step, lng_step = _cell_size(precision)
+    rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+    cols = math.floor(max_lng / lng_step) - math.floor(min_lng / lng_step) + 1
+    if rows * cols > MAX_COVER_CELLS:
+        return None
+    prefixes: set[str] = set()
+    lat_start = math.floor(min_lat / lat_step) * lat_step
+    lng_start = math.floor(min_lng / lng_step) * lng_step
+    for row in range(rows):
+        lat = min(lat_start + (row + 0.5) * lat_step, 90.0)
+        for col in range(cols):
+            lng = min(lng_start + (col + 0.5) * lng_step, 180.0)
+            prefixes.add(encode_geohash(lat, lng, precision))
+    return prefixes
+
+
+def covering_prefixes(bbox: BBox) -> set[str]:
+    """Smallest set of geohash prefixes (at most MAX_COVER_CELLS per box) covering bbox."""
+    prefixes: set[str] = set()
+    for box in _split_antimeridian(bbox):
+        best: set[str] = {""}
+        for precision in range(1, GEOHASH_PRECISION + 1):
+            cover = _cover(box, precision)
+            if cover is None:
+                break
+            best = cover
+        prefixes |= best
+    return prefixes
+
+
+def _bbox_filter(bbox: BBox):
+    prefix_clauses = [
+        and_(Property.geohash >= prefix, Property.geohash < prefix + "{")
+        for prefix in sorted(covering_prefixes(bbox))
+        if prefix
+    ]
+    bounds = []
+    for min_lng, min_lat, max_lng, max_lat in _split_antimeridian(bbox):
+        bounds.append(
+            and_(
+                Property.latitude.between(min_lat, max_lat),
+                Property.longitude.between(min_lng, max_lng),
+            )
+        )
+    clauses = [Property.geohash.is_not(None), or_(*bounds)]
+    if prefix_clauses:
+        clauses.append(or_(*prefix_clauses))
+    return and_(*clauses)
+
+
+def cluster_precision(zoom: int) -> int:
+    return min(6, max(1, (zoom + 1) // 2))
+
+
+def properties_in_bbox(db: Session, bbox: BBox) -> list[Property]:
+    return list(db.scalars(select(Property).where(_bbox_filter(bbox))))
+
+
+def clusters_in_bbox(db: Session, bbox: BBox, zoom: int) -> list[dict]:
+    precision = cluster_precision(zoom)
+    open_issues = (
+        select(Issue.property_id, func.count(Issue.id).label("open_issues"))
+        .where(Issue.status.in_(OPEN_ISSUE_STATUSES))
+        .group_by(Issue.property_id)
+        .subquery()
+    )
+    cell = func.substr(Property.geohash, 1, precision).label("cell")
+    rows = db.execute(
+        select(
+            cell,
+            func.count(Property.id),
+            func.avg(Property.latitude),
+            func.avg(Property.longitude),
+            func.coalesce(func.sum(open_issues.c.open_issues), 0),
+        )
+        .outerjoin(open_issues, open_issues.c.property_id == Property.id)
+        .where(_bbox_filter(bbox))
+        .group_by(cell)
+    ).all()
+    return [
+        {
+            "geohash": geohash,
+            "count": count,
+            "latitude": float(latitude),
+            "longitude": float(longitude),
+            "open_issues": int(open_total or 0),
+        }
+        for geohash, count, latitude, longitude, open_total in rows
+    ]
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+import math
+import os
+import threading
+import time
+from typing import TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+
+from db import IdempotencyKey, as_utc, get_sessionmaker
+
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# A key whose request is still running after this long (e.g. the process died) can be retried.
+IDEMPOTENCY_LEASE_SECONDS = float(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "120"))
+# How long a retry waits for the original request to finish before getting a 409.
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+IDEMPOTENCY_POLL_SECONDS = (0.05, 0.5)
+# How often each process deletes expired keys.
+IDEMPOTENCY_PURGE_SECONDS = 60.0
+
+Result = TypeVar("Result", bound=BaseModel)
+
+
+class IdempotencyConflictError(ValueError):
+    """The key was already used for a request with a different payload."""
+
+
+class IdempotencyInProgressError(RuntimeError):
+    """The original request with this key is still running."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class IdempotencyStore:
+    """Key -> response store in the database, so retries that reach another worker or
+    instance are recognised too. The primary key on the key lets exactly one request claim
+    it; the others wait for its response and replay it, or get IdempotencyInProgressError
+    if it is still running after `wait` seconds."""
+
+    def __init__(
+        self,
+        ttl: float = IDEMPOTENCY_TTL_SECONDS,
+        lease: float = IDEMPOTENCY_LEASE_SECONDS,
+        wait: float = IDEMPOTENCY_WAIT_SECONDS,
+    ):
+        self.ttl = ttl
+        self.lease = lease
+        self.wait = wait
+        self.executions = 0
+        self.replays = 0
+        self.waits = 0
+        self.in_progress = 0
+        self.conflicts = 0
+        self._purged_at = 0.0
+        self._lock = threading.Lock()
+
+    def run(
+        self, key: str, fingerprint: str, work: Callable[[], Result], model: type[Result]
+    ) -> tuple[Result, bool]:
+        """Return (result, replayed). Failed executions are forgotten so the client can retry."""
+        self._purge()
+        replay = self._claim_or_wait(key, fingerprint)
+        if replay is not None:
+            return model.model_validate_json(replay), True
+        try:
+            result = work()
+        except BaseException:
+            with get_sessionmaker()() as db:
+                db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+                db.commit()
+            raise
+        with get_sessionmaker()() as db:
+            db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(
+                    response=result.model_dump_json(),
+                    expires_at=_now() + timedelta(seconds=self.ttl),
+                )
+            )
+            db.commit()
+        return result, False
+
+    def _claim_or_wait(self, key: str, fingerprint: str) -> str | None:
+        """_claim, polling with backoff while the original request is still running."""
+        deadline = time.monotonic() + self.wait
+        delay, max_delay = IDEMPOTENCY_POLL_SECONDS
+        waited = False
+        while True:
+            try:
+                replay = self._claim(key, fingerprint)
+            except IdempotencyInProgressError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._count("in_progress")
+                    raise
+                if not waited:
+                    waited = True
+                    self._count("waits")
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, max_delay)
+                continue
+            return replay
+
+    def _claim(self, key: str, fingerprint: str) -> str | None:
+        """Take the key for this request, or return the stored response to replay."""
+        with get_sessionmaker()() as db:
+            now = _now()
+            db.add(
+                IdempotencyKey(
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=self.lease),
+                )
+            )
+            try:
+                db.commit()
+                self._count("executions")
+                return None
+            except IntegrityError:
+                db.rollback()
+
+            entry = db.get(IdempotencyKey, key)
+            if entry is None:
+                # Released by a failed request between our insert and read.
+                return self._claim(key, fingerprint)
+            expires_at = as_utc(entry.expires_at)
+            if expires_at < now:
+                # Expired response or abandoned lease: take the key over, unless someone else
+                # just did.
+                taken = db.execute(
+                    update(IdempotencyKey)
+                    .where(
+                        IdempotencyKey.key == key, IdempotencyKey.expires_at == entry.expires_at
+                    )
+                    .values(
+                        fingerprint=fingerprint,
+                        response=None,
+                        expires_at=now + timedelta(seconds=self.lease),
+                    )
+                )
+                db.commit()
+                if taken.rowcount:
+                    self._count("executions")
+                    return None
+                return self._claim(key, fingerprint)
+            if entry.fingerprint != fingerprint:
+                self._count("conflicts")
+                raise IdempotencyConflictError(
+                    "Idempotency-Key was already used with a different request"
+                )
+            if entry.response is not None:
+                self._count("replays")
+                return entry.response
+            raise IdempotencyInProgressError(
+                "A request with this Idempotency-Key is still in progress",
+                # Turns usually finish in seconds; the lease is only the worst case.
+                retry_after=min(max(math.ceil((expires_at - now).total_seconds()), 1), 5),
+            )
+
+    def _purge(self) -> None:
+        with self._lock:
+            if time.monotonic() - self._purged_at < IDEMPOTENCY_PURGE_SECONDS:
+                return
+            self._purged_at = time.monotonic()
+        with get_sessionmaker()() as db:
+            db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.expires_at < _now(), IdempotencyKey.response.is_not(None)
+                )
+            )
+            db.commit()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "replays": self.replays,
+                "waits": self.waits,
+                "in_progress": self.in_progress,
+                "conflicts": self.conflicts,
+            }
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import hashlib
+import mmap
+import os
+from pathlib import Path
+import re
+import tempfile
+from typing import BinaryIO
+
+CHAT_IMAGE_DIR = Path(os.getenv("CHAT_IMAGE_DIR") or "data/chat-images")
+MAX_CHAT_IMAGE_BYTES = int(os.getenv("MAX_CHAT_IMAGE_BYTES", str(10 * 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/heic": ".heic",
+}
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}\.[a-z]+$")
+
+
+class ImageTooLargeError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredImage:
+    key: str
+    mime: str
+    size: int
+    # False when an identical photo was already stored, possibly for another message.
+    created: bool = True
+
+    @property
+    def path(self) -> Path:
+        return CHAT_IMAGE_DIR / self.key
+
+
+def image_mime(key: str) -> str:
+    extension = Path(key).suffix
+    return next((mime for mime, ext in IMAGE_EXTENSIONS.items() if ext == extension), "image/jpeg")
+
+
+def image_path(key: str) -> Path:
+    if not _KEY_PATTERN.match(key):
+        raise ValueError("Invalid image key")
+    return CHAT_IMAGE_DIR / key
+
+
+def store_image(source: BinaryIO, mime: str) -> StoredImage:
+    """Copy an upload into the content-addressed image directory CHUNK_SIZE bytes at a time."""
+    extension = IMAGE_EXTENSIONS.get(mime)
+    if extension is None:
+        raise ValueError(f"Unsupported image type; expected one of {', '.join(IMAGE_EXTENSIONS)}")
+    CHAT_IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=CHAT_IMAGE_DIR, suffix=".part", delete=False) as target:
+        try:
+            while chunk := source.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_CHAT_IMAGE_BYTES:
+                    raise ImageTooLargeError(f"Image exceeds {MAX_CHAT_IMAGE_BYTES} bytes")
+                digest.update(chunk)
+                target.write(chunk)
+        except BaseException:
+            target.close()
+            os.unlink(target.name)
+            raise
+    if size == 0:
+        os.unlink(target.name)
+        raise ValueError("Image upload is empty")
+    key = digest.hexdigest() + extension
+    stored = StoredImage(key=key, mime=mime, size=size, created=not image_path(key).exists())
+    # Identical photos resolve to the same key, so a re-upload just replaces the file.
+    os.replace(target.name, stored.path)
+    return stored
+
+
+def discard_image(image: StoredImage) -> None:
+    """Remove an upload whose message was never saved, unless the file predates it."""
+    if image.created:
+        image.path.unlink(missing_ok=True)
+
+
+@contextmanager
+def open_image(key: str) -> Iterator[mmap.mmap]:
+    """Read-only memory map of a stored image; pass it anywhere a bytes-like object is accepted."""
+    with open(image_path(key), "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
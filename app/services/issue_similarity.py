@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db import OPEN_ISSUE_STATUSES, Issue, IssueCategory, run_on_commit
+
+# Jaccard similarity of two tenant reports' word sets at which the later one is a duplicate.
+DUPLICATE_ISSUE_THRESHOLD = float(os.getenv("DUPLICATE_ISSUE_THRESHOLD", "0.5"))
+# Full reload interval, which also picks up issues other processes created or closed.
+ISSUE_INDEX_TTL_SECONDS = float(os.getenv("ISSUE_INDEX_TTL_SECONDS", "300"))
+MINHASH_PERMUTATIONS = 64
+# 32 bands of 2 rows: pairs at Jaccard 0.5 collide in some band with probability ~1.
+LSH_BANDS = 32
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    """
+    a about after again all also am an and any are as at be been before but by can could did do
+    does doing don for from get got had has have having hello her here hey hi him his how i i'm
+    if im in into is it its just know like me more my no not now of off on once only or our out
+    over please really since so some still than thank thanks that the their them then there these
+    they this those to too up us very was we were what when where which while who why will with
+    would yeah yes yet you your
+    """.split()
+)
+
+
+def _stem(word: str) -> str:
+    for suffix in ("ing", "ed", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def report_tokens(text: str) -> frozenset[str]:
+    words = _WORD.findall(text.lower())
+    return frozenset(_stem(word) for word in words if len(word) > 2 and word not in STOPWORDS)
+
+
+def jaccard(left: frozenset[str], right: frozenset[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    partition: tuple[uuid.UUID, IssueCategory]
+    tokens: frozenset[str]
+    bands: tuple[int, ...]
+
+
+class IssueSimilarityIndex:
+    """MinHash/LSH index of open issues' tenant reports, partitioned by property and category.
+
+    Band hashes of a report's MinHash signature select candidate issues in the same partition;
+    candidates are confirmed with exact Jaccard similarity on their word sets.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DUPLICATE_ISSUE_THRESHOLD,
+        permutations: int = MINHASH_PERMUTATIONS,
+        bands: int = LSH_BANDS,
+    ):
+        if permutations % bands:
+            raise ValueError("permutations must be a multiple of bands")
+        self.threshold = threshold
+        self.rows = permutations // bands
+        rng = random.Random(0x15_5E)
+        self._coefficients = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(permutations)
+        ]
+        self._entries: dict[uuid.UUID, _Entry] = {}
+        self._buckets: dict[tuple, set[uuid.UUID]] = defaultdict(set)
+        self._loaded_at: float | None = None
+        self._counts = {"lookups": 0, "candidates": 0, "duplicates": 0}
+        self._lock = threading.Lock()
+
+    def _bands(self, tokens: frozenset[str]) -> tuple[int, ...]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+            for token in tokens
+        ]
+        signature = [
+            min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+            for a, b in self._coefficients
+        ]
+        return tuple(
+            hash(tuple(signature[start : start + self.rows]))
+            for start in range(0, len(signature), self.rows)
+        )
+
+    def add(
+        self, issue_id: uuid.UUID, property_id: uuid.UUID, category: IssueCategory, text: str
+    ) -> None:
+        tokens = report_tokens(text)
+        entry = _Entry((property_id, category), tokens, self._bands(tokens) if tokens else ())
+        with self._lock:
+            self._discard(issue_id)
+            self._entries[issue_id] = entry
+            for band, value in enumerate(entry.bands):
+                self._buckets[(entry.partition, band, value)].add(issue_id)
+
+    def remove(self, issue_id: uuid.UUID) -> None:
+        with self._lock:
+            self._discard(issue_id)
+
+    def _discard(self, issue_id: uuid.UUID) -> None:
+        entry = self._entries.pop(issue_id, None)
+        if entry is None:
+            return
+        for band, value in enumerate(entry.bands):
+            key = (entry.partition, band, value)
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(issue_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def find_duplicate(
+        self, db: Session, property_id: uuid.UUID, category: IssueCategory, text: str
+    ) -> Issue | None:
+        """Most similar open issue at the property in the same category, if above threshold."""
+        self._ensure_loaded(db)
+        tokens = report_tokens(text)
+        if not tokens:
+            return None
+        partition = (property_id, category)
+        bands = self._bands(tokens)
+        with self._lock:
+            self._counts["lookups"] += 1
+            candidates = set().union(
+                *(
+                    self._buckets.get((partition, band, value), ())
+                    for band, value in enumerate(bands)
+                )
+            )
+            self._counts["candidates"] += len(candidates)
+            scored = sorted(
+                (
+                    (jaccard(tokens, self._entries[issue_id].tokens), issue_id)
+                    for issue_id in candidates
+                ),
+                reverse=True,
+            )
+        for score, issue_id in scored:
+            if score < self.threshold:
+                break
+            # Another process may have closed it since the last reload.
+            issue = db.get(Issue, issue_id)
+            if issue is not None and issue.status in OPEN_ISSUE_STATUSES:
+                with self._lock:
+                    self._counts["duplicates"] += 1
+                return issue
+            self.remove(issue_id)
+        return None
+
+    def _ensure_loaded(self, db: Session) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < ISSUE_INDEX_TTL_SECONDS:
+            return
+        rows = db.execute(
+            select(Issue.id, Issue.property_id, Issue.category, Issue.description).where(
+                Issue.status.in_(OPEN_ISSUE_STATUSES)
+            )
+        ).all()
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self._loaded_at = time.monotonic()
+        for row in rows:
+            self.add(row.id, row.property_id, row.category, row.description)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"open_issues": len(self._entries), **self._counts}
+
+
+issue_index = IssueSimilarityIndex()
+
+
+def _collect_issue_changes(session: Session) -> dict:
+    changes = {}
+    for obj in (*session.new, *session.dirty):
+        # Only loaded attributes are read; a flush hook must not trigger lazy loads.
+        loaded = obj.__dict__ if isinstance(obj, Issue) else {}
+        if "status" not in loaded:
+            continue
+        if loaded["status"] not in OPEN_ISSUE_STATUSES:
+            changes[obj.id] = None
+        elif all(name in loaded for name in ("property_id", "category", "description")):
+            changes[obj.id] = (loaded["property_id"], loaded["category"], loaded["description"])
+    for obj in session.deleted:
+        if isinstance(obj, Issue):
+            changes[obj.id] = None
+    return changes
+
+
+def _apply_issue_changes(changes: list[dict]) -> None:
+    # Later flushes win for an issue changed more than once in the transaction.
+    for issue_id, change in {k: v for flush in changes for k, v in flush.items()}.items():
+        if change is None:
+            issue_index.remove(issue_id)
+        else:
+            issue_index.add(issue_id, *change)
+
+
+run_on_commit("issue_index", _collect_issue_changes, _apply_issue_changes)
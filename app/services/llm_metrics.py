@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+import threading
+import time
+
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+@dataclass
+class LLMCall:
+    stage: str
+    latency_ms: int
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    error: bool = False
+
+    @property
+    def cache(self) -> str:
+        return "hit" if self.cached_tokens else "miss"
+
+
+@dataclass
+class TurnUsage:
+    calls: list[LLMCall] = field(default_factory=list)
+
+    @property
+    def latency_ms(self) -> int:
+        return sum(call.latency_ms for call in self.calls)
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(call.prompt_tokens for call in self.calls)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(call.completion_tokens for call in self.calls)
+
+    def as_json(self) -> list[dict]:
+        return [{**asdict(call), "cache": call.cache} for call in self.calls]
+
+
+class _StageMetrics:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_ms_sum = 0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, call: LLMCall) -> None:
+        self.calls += 1
+        self.errors += int(call.error)
+        self.cache_hits += int(call.cached_tokens > 0)
+        self.prompt_tokens += call.prompt_tokens
+        self.completion_tokens += call.completion_tokens
+        self.latency_ms_sum += call.latency_ms
+        self.latency_buckets[bisect_left(LATENCY_BUCKETS_MS, call.latency_ms)] += 1
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip((*LATENCY_BUCKETS_MS, "+Inf"), self.latency_buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_ms_sum": self.latency_ms_sum,
+            "latency_ms_buckets": buckets,
+        }
+
+
+_stages: dict[str, _StageMetrics] = {}
+_stages_lock = threading.Lock()
+_current_turn: ContextVar[TurnUsage | None] = ContextVar("llm_turn_usage", default=None)
+
+
+def record_llm_call(call: LLMCall) -> None:
+    with _stages_lock:
+        _stages.setdefault(call.stage, _StageMetrics()).observe(call)
+    turn = _current_turn.get()
+    if turn is not None:
+        turn.calls.append(call)
+
+
+def llm_stats() -> dict[str, dict]:
+    with _stages_lock:
+        return {stage: metrics.snapshot() for stage, metrics in _stages.items()}
+
+
+@contextmanager
+def track_turn() -> Iterator[TurnUsage]:
+    usage = TurnUsage()
+    token = _current_turn.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_turn.reset(token)
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.perf_counter() - started) * 1000)
+
+
+def invoke_llm(llm, messages, stage: str):
+    """Call a LangChain chat model and record latency and token usage under stage."""
+    started = time.perf_counter()
+    try:
+        response = llm.invoke(messages)
+    except Exception:
+        record_llm_call(LLMCall(stage=stage, latency_ms=_elapsed_ms(started), error=True))
+        raise
+    # Structured-output runnables with include_raw=True return {"raw", "parsed", "parsing_error"}.
+    message = response.get("raw") if isinstance(response, dict) else response
+    usage = getattr(message, "usage_metadata", None) or {}
+    record_llm_call(
+        LLMCall(
+            stage=stage,
+            latency_ms=_elapsed_ms(started),
+            prompt_tokens=usage.get("input_tokens", 0),
+            completion_tokens=usage.get("output_tokens", 0),
+            cached_tokens=(usage.get("input_token_details") or {}).get("cache_read", 0) or 0,
+        )
+    )
+    return response
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import os
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from db import Issue, PropertyWallet, Vendor, run_on_commit
+
+# 0 disables storing rendered bodies; identical concurrent requests are still coalesced.
+MICROCACHE_TTL_SECONDS = float(os.getenv("MICROCACHE_TTL_SECONDS", "1"))
+
+# Which cached namespaces a committed write to each model makes stale.
+INVALIDATES = {
+    Issue: ("issues", "wallets"),
+    PropertyWallet: ("wallets",),
+    Vendor: ("vendors",),
+}
+
+
+@dataclass
+class _Flight:
+    generation: int
+    finished: threading.Event = field(default_factory=threading.Event)
+    body: bytes | None = None
+    error: BaseException | None = None
+
+
+class MicroCache:
+    """Short-lived cache of serialized response bodies with single-flight rendering.
+
+    Concurrent misses for the same key wait for one render instead of each querying the
+    database. A write bumps the namespace generation so a render that started before it is
+    handed to its waiters but never stored.
+    """
+
+    def __init__(self, ttl: float = MICROCACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries: dict[tuple[str, str], tuple[float, bytes]] = {}
+        self._flights: dict[tuple[str, str], _Flight] = {}
+        self._generations: dict[str, int] = {}
+        self._counts = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+
+    def get_or_render(self, namespace: str, key: str, render: Callable[[], bytes]) -> tuple[bytes, str]:
+        """Return (body, "hit" | "coalesced" | "miss")."""
+        cache_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._counts["hits"] += 1
+                return entry[1], "hit"
+            flight = self._flights.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = _Flight(generation=self._generations.get(namespace, 0))
+                self._flights[cache_key] = flight
+                self._counts["misses"] += 1
+            else:
+                self._counts["coalesced"] += 1
+
+        if not leader:
+            flight.finished.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.body, "coalesced"
+
+        try:
+            flight.body = render()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[cache_key]
+                if (
+                    flight.body is not None
+                    and self.ttl > 0
+                    and flight.generation == self._generations.get(namespace, 0)
+                ):
+                    self._entries[cache_key] = (time.monotonic() + self.ttl, flight.body)
+            flight.finished.set()
+        return flight.body, "miss"
+
+    def invalidate(self, *namespaces: str) -> None:
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+                self._counts["invalidations"] += 1
+            for cache_key in [k for k in self._entries if k[0] in namespaces]:
+                del self._entries[cache_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "in_flight": len(self._flights), **self._counts}
+
+
+microcache = MicroCache()
+
+
+def _collect_invalidations(session: Session) -> set[str]:
+    return {
+        namespace
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        for namespace in INVALIDATES.get(type(obj), ())
+    }
+
+
+run_on_commit(
+    "microcache",
+    _collect_invalidations,
+    lambda changes: microcache.invalidate(*set().union(*changes)),
+)
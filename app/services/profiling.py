@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import functools
+import hmac
+import json
+import os
+from pathlib import Path
+import re
+import secrets
+import sys
+import threading
+import time
+from typing import ParamSpec, TypeVar
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Fraction of requests profiled without the admin header (0 = only on request).
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "data/profiles"))
+# Oldest captures are deleted once either limit is exceeded.
+PROFILE_MAX_BYTES = int(os.getenv("PROFILE_MAX_BYTES", str(50 * 1024 * 1024)))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "100"))
+
+PROFILE_SUFFIX = ".speedscope.json"
+PROFILE_NAME = re.compile(r"^[A-Za-z0-9_.-]+\.speedscope\.json$")
+
+Params = ParamSpec("Params")
+Result = TypeVar("Result")
+
+
+def is_admin(token: str | None) -> bool:
+    return bool(ADMIN_TOKEN) and hmac.compare_digest((token or "").encode(), ADMIN_TOKEN.encode())
+
+
+class SamplingProfiler:
+    """Samples thread stacks every `interval` seconds from a background thread.
+
+    Recorded are the event loop thread, plus worker threads while they run work for the
+    profiled request, which `profiled` attaches through the capture the copied request
+    context carries. Worker threads serving other requests or background jobs are left out.
+    The event loop is sampled whole: other async requests and middleware running on it
+    meanwhile appear in the capture too. Output is one speedscope profile per thread.
+    """
+
+    def __init__(self, main_thread_id: int, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.main_thread_id = main_thread_id
+        self.interval = interval
+        self._frames: dict[tuple[str, str, int], int] = {}
+        self._samples: dict[int, tuple[list[list[int]], list[float]]] = {}
+        self._attached: Counter[int] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling. Joins the sampler thread, so call it off the event loop."""
+        self._stop.set()
+        self._thread.join()
+
+    def attach(self, thread_id: int) -> None:
+        with self._lock:
+            self._attached[thread_id] += 1
+
+    def detach(self, thread_id: int) -> None:
+        with self._lock:
+            self._attached[thread_id] -= 1
+            if not self._attached[thread_id]:
+                del self._attached[thread_id]
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = (now - last) * 1000, now
+            with self._lock:
+                threads = {self.main_thread_id, *self._attached}
+            frames = sys._current_frames()
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self._record(thread_id, frame, weight)
+
+    def _record(self, thread_id: int, frame, weight: float) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_qualname, code.co_filename, frame.f_lineno)
+            index = self._frames.get(key)
+            if index is None:
+                index = self._frames[key] = len(self._frames)
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        samples, weights = self._samples.setdefault(thread_id, ([], []))
+        samples.append(stack)
+        weights.append(round(weight, 3))
+
+    def speedscope(self, name: str) -> dict:
+        threads = {thread.ident: thread.name for thread in threading.enumerate()}
+        profiles = []
+        for thread_id, (samples, weights) in sorted(
+            self._samples.items(), key=lambda item: item[0] != self.main_thread_id
+        ):
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": threads.get(thread_id, str(thread_id)),
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 3),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            )
+        frames = [
+            {"name": qualname, "file": filename, "line": line}
+            for qualname, filename, line in self._frames
+        ]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "proco",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+
+_capture: ContextVar[SamplingProfiler | None] = ContextVar("profile_capture", default=None)
+
+
+def begin_capture(profiler: SamplingProfiler):
+    """Make `profiler` the capture of the current request's context."""
+    return _capture.set(profiler)
+
+
+def end_capture(token) -> None:
+    _capture.reset(token)
+
+
+def profiled(func: Callable[Params, Result]) -> Callable[Params, Result]:
+    """Wrap a sync function run on a worker thread so that, while it runs for a profiled
+    request, its thread is sampled into that request's capture."""
+
+    @functools.wraps(func)
+    def wrapper(*args: Params.args, **kwargs: Params.kwargs) -> Result:
+        profiler = _capture.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        thread_id = threading.get_ident()
+        profiler.attach(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.detach(thread_id)
+
+    return wrapper
+
+
+class ProfileStore:
+    """Directory of speedscope captures, pruned oldest-first to stay under the size caps."""
+
+    def __init__(
+        self,
+        directory: Path = PROFILE_DIR,
+        max_bytes: int = PROFILE_MAX_BYTES,
+        max_files: int = PROFILE_MAX_FILES,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def save(self, profile: dict, method: str, path: str, duration_ms: float) -> str:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-")[:60] or "root"
+        name = f"{stamp}_{method}_{slug}_{round(duration_ms)}ms_{secrets.token_hex(3)}"
+        name += PROFILE_SUFFIX
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / name).write_text(json.dumps(profile, separators=(",", ":")))
+            self._prune()
+        return name
+
+    def _prune(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime, reverse=True)
+        total = 0
+        for count, entry in enumerate(entries, start=1):
+            total += entry.stat().st_size
+            if count > self.max_files or total > self.max_bytes:
+                Path(entry.path).unlink(missing_ok=True)
+
+    def _entries(self) -> list[os.DirEntry]:
+        if not self.directory.is_dir():
+            return []
+        return [
+            entry for entry in os.scandir(self.directory) if entry.name.endswith(PROFILE_SUFFIX)
+        ]
+
+    def captures(self) -> list[dict]:
+        captures = []
+        for entry in self._entries():
+            stat = entry.stat()
+            captures.append(
+                {
+                    "name": entry.name,
+                    "bytes": stat.st_size,
+                    "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+                }
+            )
+        return sorted(captures, key=lambda capture: capture["created_at"], reverse=True)
+
+    def path(self, name: str) -> Path | None:
+        if not PROFILE_NAME.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+
+profile_store = ProfileStore()
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from db import get_engine, get_sessionmaker, replica_names
+
+logger = logging.getLogger(__name__)
+
+READ_REPLICA_MAX_LAG_SECONDS = float(os.getenv("READ_REPLICA_MAX_LAG_SECONDS", "5"))
+READ_REPLICA_CHECK_SECONDS = float(os.getenv("READ_REPLICA_CHECK_SECONDS", "5"))
+# How long a client that just wrote keeps reading from the primary.
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+READ_YOUR_WRITES_COOKIE = "proco_primary_until"
+# Same value as the cookie, for cross-site clients whose browsers drop it; they echo it back.
+READ_YOUR_WRITES_HEADER = "X-Primary-Until"
+
+# Zero when the replica has replayed everything it received (an idle primary is not lag).
+_POSTGRES_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class ReadOnlySessionError(RuntimeError):
+    pass
+
+
+@dataclass
+class _ReplicaState:
+    usable: bool = True
+    lag_seconds: float | None = None
+    error: str | None = None
+    checked_at: float = float("-inf")
+    checking: bool = False
+
+
+class ReadRouter:
+    """Hands out read-only sessions on a healthy replica, falling back to the primary.
+
+    Each replica's lag is re-checked at most every `check_interval` seconds, by whichever
+    request finds the last check stale; a replica that lags more than `max_lag` or fails to
+    connect is skipped until a later check passes.
+    """
+
+    def __init__(
+        self,
+        names: list[str] | None = None,
+        max_lag: float = READ_REPLICA_MAX_LAG_SECONDS,
+        check_interval: float = READ_REPLICA_CHECK_SECONDS,
+    ):
+        self._names = names
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._states: dict[str, _ReplicaState] = {}
+        self._next = 0
+        self._counts = {"replica": 0, "primary": 0, "sticky": 0, "fallbacks": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> list[str]:
+        if self._names is None:
+            self._names = replica_names()
+        return self._names
+
+    def session(self, sticky: bool = False) -> Session:
+        """Read-only session; `sticky` pins it to the primary for read-your-writes."""
+        if sticky:
+            self._count("sticky")
+            return self._open("primary")
+        for name in self._candidates():
+            db = self._open(name)
+            try:
+                db.connection()  # check out now so a dead replica falls back before the query
+            except DBAPIError as exc:
+                db.close()
+                logger.warning("Read replica %s unavailable; falling back", name)
+                self._set_state(name, usable=False, error=type(exc.orig).__name__)
+                continue
+            self._count("replica")
+            return db
+        if self.names:
+            self._count("fallbacks")
+        self._count("primary")
+        return self._open("primary")
+
+    def _candidates(self) -> list[str]:
+        names = self.names
+        if not names:
+            return []
+        with self._lock:
+            start = self._next % len(names)
+            self._next += 1
+        rotated = names[start:] + names[:start]
+        return [name for name in rotated if self._usable(name)]
+
+    def _usable(self, name: str) -> bool:
+        with self._lock:
+            state = self._states.setdefault(name, _ReplicaState())
+            stale = time.monotonic() - state.checked_at >= self.check_interval
+            due = stale and not state.checking
+            if due:
+                state.checking = True
+        if due:
+            self._check(name)
+        return state.usable
+
+    def _check(self, name: str) -> None:
+        try:
+            engine = get_engine(name)
+            with engine.connect() as conn:
+                lag = 0.0
+                if engine.dialect.name == "postgresql":
+                    lag = float(conn.execute(_POSTGRES_LAG).scalar() or 0)
+        except Exception as exc:
+            logger.warning("Read replica %s health check failed: %s", name, exc)
+            self._set_state(name, usable=False, error=type(exc).__name__)
+            return
+        if lag > self.max_lag:
+            logger.warning("Read replica %s is %.1fs behind; reading from primary", name, lag)
+        self._set_state(name, usable=lag <= self.max_lag, lag_seconds=round(lag, 3))
+
+    def _set_state(
+        self, name: str, usable: bool, lag_seconds: float | None = None, error: str | None = None
+    ) -> None:
+        with self._lock:
+            state = self._states.setdefault(name, _ReplicaState())
+            state.usable = usable
+            state.lag_seconds = lag_seconds
+            state.error = error
+            state.checked_at = time.monotonic()
+            state.checking = False
+
+    def _open(self, name: str) -> Session:
+        db = get_sessionmaker(name)()
+        db.info["read_only"] = True
+        if name != "primary":
+            db.info["replica"] = name
+        return db
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            replicas = {
+                name: {
+                    "usable": state.usable,
+                    "lag_seconds": state.lag_seconds,
+                    "error": state.error,
+                }
+                for name, state in self._states.items()
+            }
+            return {"replicas": replicas, **self._counts}
+
+
+read_router = ReadRouter()
+
+
+def wants_primary(*pins: str | None) -> bool:
+    """True while the read-your-writes pin (cookie or header) from a client's last write is live."""
+    try:
+        return any(float(pin or 0) > time.time() for pin in pins)
+    except ValueError:
+        return False
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_writes(session: Session, flush_context, instances) -> None:
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise ReadOnlySessionError("Read sessions cannot write; depend on get_db instead")
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("proco.sql")
+
+SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+REPEATED_STATEMENT_THRESHOLD = int(os.getenv("SQL_REPEATED_STATEMENT_THRESHOLD", "10"))
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAM_LISTS = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+))*\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    return _PARAM_LISTS.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+@dataclass
+class RequestSQLStats:
+    route: str = ""
+    queries: int = 0
+    db_seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def repeated(self) -> list[tuple[str, int]]:
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count > REPEATED_STATEMENT_THRESHOLD
+        ]
+
+
+_current: ContextVar[RequestSQLStats | None] = ContextVar("request_sql_stats", default=None)
+_route_totals: dict[str, dict[str, float]] = {}
+_totals_lock = threading.Lock()
+
+
+def begin_request(route: str) -> tuple[RequestSQLStats, object]:
+    stats = RequestSQLStats(route=route)
+    return stats, _current.set(stats)
+
+
+def end_request(stats: RequestSQLStats, token) -> None:
+    _current.reset(token)
+    repeated = stats.repeated()
+    for shape, count in repeated:
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "repeated_statement",
+                    "route": stats.route,
+                    "count": count,
+                    "statement": shape,
+                }
+            )
+        )
+    with _totals_lock:
+        totals = _route_totals.setdefault(
+            stats.route, {"requests": 0, "queries": 0, "db_seconds": 0.0, "repeated_flags": 0}
+        )
+        totals["requests"] += 1
+        totals["queries"] += stats.queries
+        totals["db_seconds"] += stats.db_seconds
+        totals["repeated_flags"] += len(repeated)
+
+
+def route_stats() -> dict[str, dict[str, float]]:
+    with _totals_lock:
+        return {route: dict(values) for route, values in _route_totals.items()}
+
+
+def _truncate_parameters(parameters) -> str:
+    text = repr(parameters)
+    return text if len(text) <= 500 else text[:500] + "..."
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        stats.shapes[statement_shape(statement)] += 1
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "slow_query",
+                    "route": stats.route if stats is not None else None,
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "statement": statement_shape(statement),
+                    "parameters": _truncate_parameters(parameters),
+                }
+            )
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+import threading
+import uuid
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from db import Issue, SummaryStatus, get_sessionmaker, run_on_commit
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MAX_ATTEMPTS = int(os.getenv("SUMMARY_MAX_ATTEMPTS", "5"))
+SUMMARY_RETRY_BASE_SECONDS = float(os.getenv("SUMMARY_RETRY_BASE_SECONDS", "10"))
+# A claimed issue is retried by any worker once its lease runs out (e.g. the process died).
+SUMMARY_LEASE_SECONDS = float(os.getenv("SUMMARY_LEASE_SECONDS", "120"))
+SUMMARY_POLL_SECONDS = float(os.getenv("SUMMARY_POLL_SECONDS", "30"))
+SUMMARY_BATCH_SIZE = 10
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SummaryWorker:
+    """Background thread that replaces heuristic issue summaries with LLM-written ones."""
+
+    def __init__(self) -> None:
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="summary-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.run_once()
+            except Exception:
+                logger.exception("Summary worker pass failed")
+                processed = 0
+            if processed < SUMMARY_BATCH_SIZE:
+                self._wake.wait(SUMMARY_POLL_SECONDS)
+                self._wake.clear()
+
+    def run_once(self) -> int:
+        issue_ids = self._claim()
+        for issue_id in issue_ids:
+            self._summarize(issue_id)
+        return len(issue_ids)
+
+    def _claim(self) -> list[uuid.UUID]:
+        now = _now()
+        with get_sessionmaker()() as db:
+            statement = (
+                select(Issue)
+                .where(
+                    Issue.summary_status == SummaryStatus.PENDING,
+                    or_(
+                        Issue.summary_next_attempt_at.is_(None),
+                        Issue.summary_next_attempt_at <= now,
+                    ),
+                )
+                .order_by(Issue.created_at.asc())
+                .limit(SUMMARY_BATCH_SIZE)
+            )
+            if db.get_bind().dialect.name == "postgresql":
+                statement = statement.with_for_update(skip_locked=True)
+            issues = db.scalars(statement).all()
+            for issue in issues:
+                issue.summary_attempts += 1
+                issue.summary_next_attempt_at = now + timedelta(seconds=SUMMARY_LEASE_SECONDS)
+            db.commit()
+            return [issue.id for issue in issues]
+
+    def _summarize(self, issue_id: uuid.UUID) -> None:
+        from app.services.ai_agent import build_llm_summary
+
+        with get_sessionmaker()() as db:
+            issue = db.get(Issue, issue_id)
+            if issue is None or issue.summary_status != SummaryStatus.PENDING:
+                return
+            try:
+                summary = build_llm_summary(db, issue)
+                if not summary:
+                    raise ValueError("Model returned an empty summary")
+            except Exception:
+                db.rollback()
+                issue = db.get(Issue, issue_id)
+                if issue is None:
+                    return
+                if issue.summary_attempts >= SUMMARY_MAX_ATTEMPTS:
+                    # Keep the heuristic summary; the dashboard stops waiting for a better one.
+                    logger.exception("Giving up on LLM summary for issue %s", issue_id)
+                    issue.summary_status = SummaryStatus.FAILED
+                    issue.summary_next_attempt_at = None
+                    self.failed += 1
+                else:
+                    logger.warning("LLM summary for issue %s failed; will retry", issue_id, exc_info=True)
+                    delay = SUMMARY_RETRY_BASE_SECONDS * 2 ** (issue.summary_attempts - 1)
+                    issue.summary_next_attempt_at = _now() + timedelta(seconds=delay)
+                    self.retried += 1
+                db.commit()
+                return
+            issue.summary = summary
+            issue.summary_status = SummaryStatus.READY
+            issue.summary_next_attempt_at = None
+            db.commit()
+            self.completed += 1
+
+    def stats(self) -> dict[str, int]:
+        return {"completed": self.completed, "retried": self.retried, "failed": self.failed}
+
+
+summary_worker = SummaryWorker()
+
+
+def _collect_pending_summaries(session: Session) -> bool:
+    return any(
+        isinstance(obj, Issue) and obj.summary_status == SummaryStatus.PENDING
+        for obj in session.new
+    )
+
+
+run_on_commit("summary_worker", _collect_pending_summaries, lambda changes: summary_worker.wake())
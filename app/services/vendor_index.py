@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import heapq
+import math
+import os
+import threading
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from db import Vendor, VendorSpecialty, run_on_commit
+
+EARTH_RADIUS_KM = 6371.0
+INDEX_TTL_SECONDS = float(os.getenv("VENDOR_INDEX_TTL_SECONDS", "300"))
+DISTANCE_WEIGHT = float(os.getenv("VENDOR_DISTANCE_WEIGHT", "0.02"))
+RATE_WEIGHT = float(os.getenv("VENDOR_RATE_WEIGHT", "0.002"))
+
+
+@dataclass(frozen=True, slots=True)
+class VendorEntry:
+    id: uuid.UUID
+    name: str
+    specialty: VendorSpecialty
+    hourly_rate: float
+    rating: float | None
+    latitude: float | None
+    longitude: float | None
+    service_radius_km: float | None
+
+
+def _to_xyz(latitude: float, longitude: float) -> tuple[float, float, float]:
+    lat = math.radians(latitude)
+    lng = math.radians(longitude)
+    return (math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat))
+
+
+def _chord_sq(a: tuple[float, float, float], b: tuple[float, float, float]) -> float:
+    dx, dy, dz = a[0] - b[0], a[1] - b[1], a[2] - b[2]
+    return dx * dx + dy * dy + dz * dz
+
+
+def _chord_to_km(chord_sq: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(chord_sq) / 2))
+
+
+def _km_to_chord(km: float) -> float:
+    return 2 * math.sin(min(km / (2 * EARTH_RADIUS_KM), math.pi / 2))
+
+
+class KDTree:
+    """Static 3-d tree over unit-sphere points; nodes are (point, entry, left, right)."""
+
+    def __init__(self, items: list[tuple[tuple[float, float, float], VendorEntry]]):
+        self._root = self._build(items, 0)
+
+    def _build(self, items, depth):
+        if not items:
+            return None
+        axis = depth % 3
+        items.sort(key=lambda item: item[0][axis])
+        mid = len(items) // 2
+        return (
+            items[mid][0],
+            items[mid][1],
+            self._build(items[:mid], depth + 1),
+            self._build(items[mid + 1 :], depth + 1),
+        )
+
+    def within(
+        self, point: tuple[float, float, float], radius_km: float
+    ) -> list[tuple[float, VendorEntry]]:
+        """Every entry within `radius_km` of `point`, with its distance."""
+        limit = _km_to_chord(radius_km) ** 2
+        found: list[tuple[float, VendorEntry]] = []
+
+        def visit(node, depth):
+            if node is None:
+                return
+            node_point, entry, left, right = node
+            dist_sq = _chord_sq(point, node_point)
+            if dist_sq <= limit:
+                found.append((_chord_to_km(dist_sq), entry))
+            diff = point[depth % 3] - node_point[depth % 3]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near, depth + 1)
+            if diff * diff <= limit:
+                visit(far, depth + 1)
+
+        visit(self._root, 0)
+        return found
+
+
+def _rank_key(entry: VendorEntry, distance_km: float | None = None) -> float:
+    score = (entry.rating or 0) - RATE_WEIGHT * entry.hourly_rate
+    if distance_km is not None:
+        score -= DISTANCE_WEIGHT * distance_km
+    return -score
+
+
+class VendorIndex:
+    def __init__(self, entries: list[VendorEntry]):
+        self.built_at = time.monotonic()
+        # Located vendors with a service radius go in a tree searched out to the largest
+        # radius; those without one serve everywhere and are always considered.
+        self._trees: dict[VendorSpecialty, KDTree] = {}
+        self._max_radius: dict[VendorSpecialty, float] = {}
+        self._unbounded: dict[VendorSpecialty, list] = {}
+        self._unlocated: dict[VendorSpecialty, list[VendorEntry]] = {}
+        self._all: dict[VendorSpecialty, list[VendorEntry]] = {}
+        grouped: dict[VendorSpecialty, list] = {}
+        for entry in entries:
+            self._all.setdefault(entry.specialty, []).append(entry)
+            if entry.latitude is None or entry.longitude is None:
+                self._unlocated.setdefault(entry.specialty, []).append(entry)
+                continue
+            item = (_to_xyz(entry.latitude, entry.longitude), entry)
+            if entry.service_radius_km is None:
+                self._unbounded.setdefault(entry.specialty, []).append(item)
+            else:
+                grouped.setdefault(entry.specialty, []).append(item)
+                self._max_radius[entry.specialty] = max(
+                    self._max_radius.get(entry.specialty, 0.0), entry.service_radius_km
+                )
+        for specialty, items in grouped.items():
+            self._trees[specialty] = KDTree(items)
+        for bucket in (*self._unlocated.values(), *self._all.values()):
+            bucket.sort(key=_rank_key)
+
+    def candidates(
+        self,
+        specialty: VendorSpecialty,
+        latitude: float | None = None,
+        longitude: float | None = None,
+        k: int = 5,
+    ) -> list[tuple[VendorEntry, float | None]]:
+        """Top-k vendors for specialty; with a location, in-range vendors by blended score come first."""
+        if latitude is None or longitude is None:
+            return [(entry, None) for entry in self._all.get(specialty, [])[:k]]
+
+        point = _to_xyz(latitude, longitude)
+        ranked: list[tuple[VendorEntry, float | None]] = [
+            (entry, _chord_to_km(_chord_sq(point, entry_point)))
+            for entry_point, entry in self._unbounded.get(specialty, [])
+        ]
+        tree = self._trees.get(specialty)
+        if tree is not None:
+            for distance_km, entry in tree.within(point, self._max_radius[specialty]):
+                if distance_km <= entry.service_radius_km:
+                    ranked.append((entry, distance_km))
+        ranked.sort(key=lambda item: _rank_key(item[0], item[1]))
+        ranked.extend((entry, None) for entry in self._unlocated.get(specialty, [])[:k])
+        return ranked[:k]
+
+    def any_specialty(
+        self, latitude: float | None = None, longitude: float | None = None, k: int = 5
+    ) -> list[tuple[VendorEntry, float | None]]:
+        ranked: list[tuple[VendorEntry, float | None]] = []
+        for specialty in self._all:
+            ranked.extend(self.candidates(specialty, latitude, longitude, k))
+        ranked.sort(key=lambda item: (item[1] is None, _rank_key(item[0], item[1])))
+        return ranked[:k]
+
+
+_index: VendorIndex | None = None
+_dirty = True
+_lock = threading.Lock()
+
+
+def _load_entries(db: Session) -> list[VendorEntry]:
+    rows = db.execute(
+        select(
+            Vendor.id,
+            Vendor.name,
+            Vendor.specialty,
+            Vendor.hourly_rate,
+            Vendor.rating,
+            Vendor.latitude,
+            Vendor.longitude,
+            Vendor.service_radius_km,
+        )
+    ).all()
+    return [
+        VendorEntry(
+            id=row.id,
+            name=row.name,
+            specialty=row.specialty,
+            hourly_rate=float(row.hourly_rate),
+            rating=float(row.rating) if row.rating is not None else None,
+            latitude=float(row.latitude) if row.latitude is not None else None,
+            longitude=float(row.longitude) if row.longitude is not None else None,
+            service_radius_km=(
+                float(row.service_radius_km) if row.service_radius_km is not None else None
+            ),
+        )
+        for row in rows
+    ]
+
+
+def get_vendor_index(db: Session) -> VendorIndex:
+    global _index, _dirty
+    index = _index
+    if index is not None and not _dirty and time.monotonic() - index.built_at < INDEX_TTL_SECONDS:
+        return index
+    with _lock:
+        if _index is None or _dirty or time.monotonic() - _index.built_at >= INDEX_TTL_SECONDS:
+            _dirty = False
+            _index = VendorIndex(_load_entries(db))
+        return _index
+
+
+def invalidate_vendor_index() -> None:
+    global _dirty
+    _dirty = True
+
+
+def _collect_vendor_changes(session: Session) -> bool:
+    return any(isinstance(obj, Vendor) for obj in (*session.new, *session.dirty, *session.deleted))
+
+
+# Invalidating only after the commit keeps a concurrent rebuild from reading the pre-commit
+# state and clearing the flag.
+run_on_commit("vendor_index", _collect_vendor_changes, lambda changes: invalidate_vendor_index())
@@ -1,27 +1,57 @@
 from __future__ import annotations
 
+import base64
 import os
-from typing import Tuple
+import time
+from typing import Tuple, Union
 
 import httpx
 
+from app.services.llm import offline_llm_enabled
+from app.services.llm_metrics import LLMCall, record_llm_call
+
 DEFAULT_PROMPT = (
     "Describe this image in detail. If it shows damage or a maintenance issue, "
     "describe what is damaged, severity, and any visible details that would help "
     "a repair technician."
 )
 
+# A base64 string / data URL from the JSON API, or raw bytes-like (bytes, memoryview, mmap)
+# from a multipart upload, which is only base64-encoded if the provider needs it.
+ImageInput = Union[str, bytes, bytearray, memoryview]
+
 
-def analyze_image(image_base64: str, prompt: str | None = None) -> str:
+def analyze_image(
+    image: ImageInput, prompt: str | None = None, mime_type: str = "image/jpeg"
+) -> str:
     model_choice = (os.getenv("VISION_MODEL") or "gpt4o").lower()
+    if offline_llm_enabled():
+        model_choice = "offline"
     prompt_text = prompt or DEFAULT_PROMPT
 
     if model_choice in {"gpt4o", "openai"}:
-        return _analyze_with_openai(image_base64, prompt_text)
-    if model_choice == "gemini":
-        return _analyze_with_gemini(image_base64, prompt_text)
-
-    raise RuntimeError(f"Unsupported VISION_MODEL: {model_choice}")
+        analyze = _analyze_with_openai
+    elif model_choice == "gemini":
+        analyze = _analyze_with_gemini
+    elif model_choice == "offline":
+        analyze = _analyze_offline
+    else:
+        raise RuntimeError(f"Unsupported VISION_MODEL: {model_choice}")
+
+    started = time.perf_counter()
+    try:
+        if isinstance(image, str):
+            mime_type, image = _split_data_url(image)
+        text, usage = analyze(mime_type, image, prompt_text)
+    except Exception:
+        record_llm_call(
+            LLMCall(stage="vision", latency_ms=int((time.perf_counter() - started) * 1000), error=True)
+        )
+        raise
+    record_llm_call(
+        LLMCall(stage="vision", latency_ms=int((time.perf_counter() - started) * 1000), **usage)
+    )
+    return text
 
 
 def _split_data_url(image_base64: str) -> Tuple[str, str]:
@@ -32,15 +62,26 @@ def _split_data_url(image_base64: str) -> Tuple[str, str]:
     return "image/jpeg", image_base64
 
 
-def _analyze_with_openai(image_base64: str, prompt: str) -> str:
+def _base64(image: ImageInput) -> str:
+    return image if isinstance(image, str) else base64.b64encode(image).decode("ascii")
+
+
+def _analyze_offline(mime: str, image: ImageInput, prompt: str) -> tuple[str, dict[str, int]]:
+    latency_ms = float(os.getenv("OFFLINE_LLM_LATENCY_MS", "0"))
+    if latency_ms:
+        time.sleep(latency_ms / 1000)
+    size = len(image) * 3 // 4 if isinstance(image, str) else len(image)
+    text = f"Photo ({mime}, {size} bytes) showing visible damage near a fixture."
+    return text, {"prompt_tokens": 85, "completion_tokens": len(text) // 4}
+
+
+def _analyze_with_openai(mime: str, image: ImageInput, prompt: str) -> tuple[str, dict[str, int]]:
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not set")
 
     model = os.getenv("OPENAI_VISION_MODEL") or "gpt-4o-mini"
-    data_url = image_base64
-    if not image_base64.startswith("data:"):
-        data_url = f"data:image/jpeg;base64,{image_base64}"
+    data_url = f"data:{mime};base64,{_base64(image)}"
 
     payload = {
         "model": model,
@@ -64,23 +105,27 @@ def _analyze_with_openai(image_base64: str, prompt: str) -> str:
         )
     response.raise_for_status()
     data = response.json()
-    return (data.get("choices", [{}])[0].get("message", {}).get("content") or "").strip()
+    usage = data.get("usage") or {}
+    text = (data.get("choices", [{}])[0].get("message", {}).get("content") or "").strip()
+    return text, {
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0),
+    }
 
 
-def _analyze_with_gemini(image_base64: str, prompt: str) -> str:
+def _analyze_with_gemini(mime: str, image: ImageInput, prompt: str) -> tuple[str, dict[str, int]]:
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         raise RuntimeError("GOOGLE_API_KEY is not set")
 
     model = os.getenv("GEMINI_VISION_MODEL") or "gemini-1.5-flash"
-    mime, data = _split_data_url(image_base64)
-
     payload = {
         "contents": [
             {
                 "parts": [
                     {"text": prompt},
-                    {"inline_data": {"mime_type": mime, "data": data}},
+                    {"inline_data": {"mime_type": mime, "data": _base64(image)}},
                 ]
             }
         ]
@@ -93,9 +138,15 @@ def _analyze_with_gemini(image_base64: str, prompt: str) -> str:
         )
     response.raise_for_status()
     data = response.json()
-    return (
+    usage = data.get("usageMetadata") or {}
+    text = (
         data.get("candidates", [{}])[0]
         .get("content", {})
         .get("parts", [{}])[0]
         .get("text", "")
     ).strip()
+    return text, {
+        "prompt_tokens": usage.get("promptTokenCount", 0),
+        "completion_tokens": usage.get("candidatesTokenCount", 0),
+        "cached_tokens": usage.get("cachedContentTokenCount", 0),
+    }
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+
+from sqlalchemy import text
+
+from db import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+def warm_db_pool(connections: int) -> int:
+    """Open up to `connections` pooled connections at once so first requests skip the handshake."""
+    engine = get_engine()
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            opened.append(conn)
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+def warm_ai_stack() -> None:
+    from app.services import ai_agent, vision  # noqa: F401  (imports LangChain and clients)
+    from app.services.llm import get_chat_model
+
+    get_chat_model()
+
+
+def warm_up() -> None:
+    started = time.perf_counter()
+    connections = int(os.getenv("WARMUP_DB_CONNECTIONS", "0"))
+    try:
+        if connections:
+            warm_db_pool(connections)
+        if os.getenv("WARMUP_AI", "").lower() in {"1", "true", "yes"}:
+            warm_ai_stack()
+    except Exception:
+        logger.exception("Warm-up failed; continuing with a cold instance")
+        return
+    logger.info("Warm-up finished in %.0f ms", (time.perf_counter() - started) * 1000)
@@ -23,7 +23,14 @@ import {
   AlertCircle,
   Calendar
 } from "lucide-react";
-import { fetchIssueMessages, fetchIssues, formatDate, mapIssueStatus, postIssueMessage } from "@/lib/api";
+import {
+  fetchIssueMessages,
+  fetchIssues,
+  formatDate,
+  mapIssueStatus,
+  messageImageSrc,
+  postIssueMessage,
+} from "@/lib/api";
 
 type MessageSender = "tenant" | "ai" | "landlord";
 
@@ -110,7 +117,7 @@ export default function LandlordChatPage({ params }: { params: Promise<{ id: str
       try {
         const [apiIssues, apiMessages] = await Promise.all([
           fetchIssues(),
-          fetchIssueMessages(id),
+          fetchIssueMessages(id, undefined, process.env.NEXT_PUBLIC_DEMO_LANDLORD_ID),
         ]);
         const apiIssue = apiIssues.find((item) => item.id === id);
         if (apiIssue && isMounted) {
@@ -132,7 +139,7 @@ export default function LandlordChatPage({ params }: { params: Promise<{ id: str
           const mappedMessages: ChatMessage[] = apiMessages.map((message) => ({
             id: message.id,
             content: message.content,
-            imageBase64: message.image_base64 ?? null,
+            imageBase64: messageImageSrc(message),
             sender:
               message.role === "assistant"
                 ? "ai"
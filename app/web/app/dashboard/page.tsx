@@ -46,6 +46,7 @@ export default function DashboardPage() {
   const [walletEdits, setWalletEdits] = useState<Record<string, string>>({});
   const [topupEdits, setTopupEdits] = useState<Record<string, string>>({});
   const [issueSearch, setIssueSearch] = useState("");
+  const [pendingSummaryIds, setPendingSummaryIds] = useState<string[]>([]);
 
   useEffect(() => {
     let isMounted = true;
@@ -114,6 +115,9 @@ export default function DashboardPage() {
         }));
         if (isMounted) {
           setIssues(mappedIssues);
+          setPendingSummaryIds(
+            apiIssues.filter((issue) => issue.summary_status === "pending").map((issue) => issue.id)
+          );
           setVendors(apiVendors);
           setWallets(apiWallets);
           setProperties(mappedProperties);
@@ -137,6 +141,26 @@ export default function DashboardPage() {
     };
   }, []);
 
+  // New issues start with a heuristic summary; poll until the AI summary replaces it.
+  useEffect(() => {
+    if (pendingSummaryIds.length === 0) return;
+    const timer = setTimeout(async () => {
+      try {
+        const apiIssues = await fetchIssues();
+        const summaries = new Map(apiIssues.map((issue) => [issue.id, issue.summary]));
+        setIssues((prev) =>
+          prev.map((issue) => ({ ...issue, summary: summaries.get(issue.id) ?? issue.summary }))
+        );
+        setPendingSummaryIds(
+          apiIssues.filter((issue) => issue.summary_status === "pending").map((issue) => issue.id)
+        );
+      } catch (error) {
+        console.error(error);
+      }
+    }, 5000);
+    return () => clearTimeout(timer);
+  }, [pendingSummaryIds]);
+
   const handleStatusChange = async (id: string, status: IssueStatus) => {
     if (status === "Not Enough Budget") {
       return;
@@ -21,7 +21,7 @@ import {
   Menu,
   X
 } from "lucide-react";
-import { fetchIssueMessages, fetchIssues, postChat } from "@/lib/api";
+import { fetchIssueMessages, fetchIssues, messageImageSrc, postChat } from "@/lib/api";
 import { useActiveTenant } from "@/lib/tenant";
 
 interface ChatSession {
@@ -51,6 +51,7 @@ function TenantReportContent() {
   const [isTyping, setIsTyping] = useState(false);
   const [isSubmitted, setIsSubmitted] = useState(false);
   const [issueId, setIssueId] = useState<string | null>(null);
+  const [conversationId, setConversationId] = useState<string | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
   const scrollToBottom = useCallback(() => {
@@ -74,7 +75,7 @@ function TenantReportContent() {
         const mapped = apiMessages.map((message) => ({
           id: message.id,
           content: message.content,
-          imageBase64: message.image_base64 ?? null,
+          imageBase64: messageImageSrc(message),
           role:
             message.role === "user"
               ? "user"
@@ -151,6 +152,7 @@ function TenantReportContent() {
         image_base64: imageBase64 ?? null,
         issue_id: issueId,
         property_id: propertyId ?? null,
+        conversation_id: conversationId,
       });
 
       const aiMessage: Message = {
@@ -166,6 +168,9 @@ function TenantReportContent() {
       if (response.issue_id) {
         setIssueId(response.issue_id);
       }
+      if (response.conversation_id) {
+        setConversationId(response.conversation_id);
+      }
       if (response.issue_created) {
         setIsSubmitted(true);
       }
@@ -196,12 +201,14 @@ function TenantReportContent() {
     ]);
     setIsSubmitted(false);
     setIssueId(null);
+    setConversationId(null);
     setMobileSidebarOpen(false);
   };
 
   const handleSelectChat = (chatId: string) => {
     setActiveChat(chatId);
     setIssueId(chatId);
+    setConversationId(null);
     setIsSubmitted(true);
 
     fetchIssueMessages(chatId)
@@ -209,7 +216,7 @@ function TenantReportContent() {
         const mapped = apiMessages.map((message) => ({
           id: message.id,
           content: message.content,
-          imageBase64: message.image_base64 ?? null,
+          imageBase64: messageImageSrc(message),
           role:
             message.role === "user"
               ? "user"
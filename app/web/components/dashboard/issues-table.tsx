@@ -34,7 +34,7 @@ import {
   DropdownMenuContent,
   DropdownMenuTrigger,
 } from "@/components/ui/dropdown-menu";
-import { sendVendorRequest } from "@/lib/api";
+import { dispatchVendors } from "@/lib/api";
 
 type VendorOption = {
   id: string;
@@ -159,15 +159,22 @@ export function IssuesTable({
       return;
     }
     const confirmed = window.confirm(
-      "Do you want to send a vendor request email for this issue?"
+      "Do you want to send a vendor request email for this issue? The first vendor to accept gets the job."
     );
     if (!confirmed) return;
 
     try {
-      await Promise.all(
-        vendorList.map((vendor) => sendVendorRequest(issueId, vendor.id))
+      const dispatches = await dispatchVendors(
+        issueId,
+        vendorList.map((vendor) => vendor.id)
+      );
+      const sent = dispatches.filter((dispatch) => dispatch.status === "sent").length;
+      const queued = dispatches.filter((dispatch) => dispatch.status === "queued").length;
+      window.alert(
+        queued
+          ? `Vendor request sent to ${sent} vendors; ${queued} more will be asked if they decline.`
+          : `Vendor request sent to ${sent} vendors.`
       );
-      window.alert("Vendor request sent.");
     } catch (error) {
       const message =
         error instanceof Error ? error.message : "Vendor request failed.";
@@ -59,7 +59,7 @@ export function LandlordNavbar() {
     let isMounted = true;
     const loadNotifications = async () => {
       try {
-        const issues = await fetchIssues();
+        const issues = await fetchIssues(["tenant_id", "summary", "created_at"]);
         const sorted = issues.sort(
           (a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime()
         );
@@ -60,7 +60,13 @@ export function TenantNavbar() {
     let isMounted = true;
     const loadNotifications = async () => {
       try {
-        const issues = await fetchIssues();
+        const issues = await fetchIssues([
+          "tenant_id",
+          "property_id",
+          "summary",
+          "status",
+          "created_at",
+        ]);
         const filteredIssues = issues
           .filter((issue) => issue.tenant_id === tenantId)
           .filter((issue) => (!propertyId ? true : issue.property_id === propertyId))
@@ -82,7 +88,7 @@ export function TenantNavbar() {
 
         const messageNotificationsNested = await Promise.all(
           filteredIssues.map(async (issue) => {
-            const messages = await fetchIssueMessages(issue.id);
+            const messages = await fetchIssueMessages(issue.id, ["role", "created_at"]);
             return messages
               .filter((message) => message.role === "landlord")
               .map((message) => {
@@ -7,6 +7,7 @@ export type ApiIssue = {
   property_id: string;
   category: string;
   summary: string;
+  summary_status?: "pending" | "ready" | "failed";
   description: string;
   status: string;
   vendor_id: string | null;
@@ -32,6 +33,14 @@ export type ApiProperty = {
   longitude: number | null;
 };
 
+export type ApiPropertyCluster = {
+  geohash: string;
+  count: number;
+  latitude: number;
+  longitude: number;
+  open_issues: number;
+};
+
 export type ApiUser = {
   id: string;
   email: string;
@@ -51,6 +60,8 @@ export type ChatResponse = {
   response: string;
   issue_created: boolean;
   issue_id: string | null;
+  conversation_id?: string | null;
+  attached_to_existing?: boolean;
 };
 
 export type ApiChatMessage = {
@@ -61,6 +72,7 @@ export type ApiChatMessage = {
   role: string;
   content: string;
   image_base64: string | null;
+  image_key?: string | null;
   created_at: string;
 };
 
@@ -70,22 +82,57 @@ export type ChatRequest = {
   image_base64?: string | null;
   issue_id?: string | null;
   property_id?: string | null;
+  conversation_id?: string | null;
 };
 
+// Read-your-writes pin from the last write's X-Primary-Until header. Echoed on every request
+// because browsers drop the equivalent cookie on cross-site fetches.
+let primaryUntil: string | null = null;
+
+async function apiFetch(path: string, options?: RequestInit): Promise<Response> {
+  const headers = new Headers(options?.headers);
+  if (primaryUntil && Number(primaryUntil) * 1000 > Date.now()) {
+    headers.set("X-Primary-Until", primaryUntil);
+  }
+  const response = await fetch(`${API_BASE_URL}${path}`, {
+    credentials: "include",
+    ...options,
+    headers,
+  });
+  primaryUntil = response.headers.get("X-Primary-Until") ?? primaryUntil;
+  return response;
+}
+
 async function fetchJson<T>(path: string, options?: RequestInit): Promise<T> {
-  const response = await fetch(`${API_BASE_URL}${path}`, options);
+  const response = await apiFetch(path, options);
   if (!response.ok) {
     throw new Error(`API error ${response.status}`);
   }
   return (await response.json()) as T;
 }
 
-export async function fetchIssues(): Promise<ApiIssue[]> {
-  return fetchJson<ApiIssue[]>("/issues");
+// `fields` narrows the response to those columns (plus id), e.g. for notification lists.
+function fieldsQuery(fields?: string[]) {
+  return fields ? `?fields=${fields.join(",")}` : "";
+}
+
+export async function fetchIssues<K extends keyof ApiIssue = keyof ApiIssue>(
+  fields?: K[]
+): Promise<Pick<ApiIssue, K | "id">[]> {
+  return fetchJson(`/issues${fieldsQuery(fields)}`);
 }
 
-export async function fetchIssueMessages(issueId: string): Promise<ApiChatMessage[]> {
-  return fetchJson<ApiChatMessage[]>(`/issues/${issueId}/messages`);
+export async function fetchIssueMessages<K extends keyof ApiChatMessage = keyof ApiChatMessage>(
+  issueId: string,
+  fields?: K[],
+  landlordId?: string
+): Promise<Pick<ApiChatMessage, K | "id">[]> {
+  // Only the property's landlord gets the other tenants' attached duplicate reports.
+  const params = new URLSearchParams();
+  if (fields) params.set("fields", fields.join(","));
+  if (landlordId) params.set("landlord_id", landlordId);
+  const query = params.toString();
+  return fetchJson(`/issues/${issueId}/messages${query ? `?${query}` : ""}`);
 }
 
 export async function postIssueMessage(
@@ -100,8 +147,8 @@ export async function postIssueMessage(
 }
 
 export async function sendVendorRequest(issueId: string, vendorId: string) {
-  const response = await fetch(
-    `${API_BASE_URL}/issues/${issueId}/vendor-request?vendor_id=${vendorId}`,
+  const response = await apiFetch(
+    `/issues/${issueId}/vendor-request?vendor_id=${vendorId}`,
     { method: "POST" }
   );
   if (!response.ok) {
@@ -111,6 +158,29 @@ export async function sendVendorRequest(issueId: string, vendorId: string) {
   return (await response.json()) as { status: string };
 }
 
+export type ApiVendorDispatch = {
+  id: string;
+  vendor_id: string;
+  rank: number;
+  status: "queued" | "sent" | "accepted" | "declined" | "cancelled" | "failed";
+  sent_at?: string | null;
+  responded_at?: string | null;
+  created_at: string;
+};
+
+export async function dispatchVendors(issueId: string, vendorIds?: string[]) {
+  const response = await apiFetch(`/issues/${issueId}/dispatch`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ vendor_ids: vendorIds ?? null }),
+  });
+  if (!response.ok) {
+    const text = await response.text();
+    throw new Error(text || `API error ${response.status}`);
+  }
+  return (await response.json()) as ApiVendorDispatch[];
+}
+
 export async function fetchVendors(): Promise<ApiVendor[]> {
   return fetchJson<ApiVendor[]>("/vendors");
 }
@@ -119,6 +189,14 @@ export async function fetchProperties(): Promise<ApiProperty[]> {
   return fetchJson<ApiProperty[]>("/properties");
 }
 
+export async function fetchPropertiesInView(
+  bbox: [number, number, number, number],
+  zoom: number
+): Promise<ApiProperty[] | ApiPropertyCluster[]> {
+  const query = `?bbox=${bbox.join(",")}&zoom=${zoom}`;
+  return fetchJson<ApiProperty[] | ApiPropertyCluster[]>(`/properties${query}`);
+}
+
 export async function fetchProperty(propertyId: string): Promise<ApiProperty> {
   return fetchJson<ApiProperty>(`/properties/${propertyId}`);
 }
@@ -168,11 +246,27 @@ export async function rejectIssue(issueId: string): Promise<ApiIssue> {
 }
 
 export async function postChat(payload: ChatRequest): Promise<ChatResponse> {
-  return fetchJson<ChatResponse>("/chat", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify(payload),
-  });
+  if (!payload.image_base64) {
+    return fetchJson<ChatResponse>("/chat", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(payload),
+    });
+  }
+  // Send the photo as raw bytes in a multipart body instead of inflating it into JSON.
+  const form = new FormData();
+  form.append("tenant_id", payload.tenant_id);
+  form.append("message", payload.message);
+  if (payload.issue_id) form.append("issue_id", payload.issue_id);
+  if (payload.property_id) form.append("property_id", payload.property_id);
+  if (payload.conversation_id) form.append("conversation_id", payload.conversation_id);
+  form.append("image", await (await fetch(payload.image_base64)).blob());
+  return fetchJson<ChatResponse>("/chat/upload", { method: "POST", body: form });
+}
+
+export function messageImageSrc(message: ApiChatMessage): string | null {
+  if (message.image_key) return `${API_BASE_URL}/chat/images/${message.image_key}`;
+  return message.image_base64;
 }
 
 export function mapIssueStatus(status: string) {
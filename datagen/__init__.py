@@ -0,0 +1,4 @@
+"""Reproducible large-scale synthetic data for benchmarking.
+
+Run with ``python -m datagen --help``.
+"""
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterable, Iterator
+import enum
+import sys
+import time
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection
+
+from datagen.generators import Generator, Scale
+from db import Base, get_engine, run_migrations
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m datagen", description=__doc__)
+    parser.add_argument("--landlords", type=int, default=10_000)
+    parser.add_argument("--properties", type=int, default=200_000)
+    parser.add_argument("--vendors", type=int, default=2_000)
+    parser.add_argument("--issues", type=int, default=1_000_000)
+    parser.add_argument("--messages", type=int, default=20_000_000)
+    parser.add_argument("--image-fraction", type=float, default=0.02)
+    parser.add_argument("--image-kb", type=int, default=64)
+    parser.add_argument("--days", type=int, default=730, help="History window for timestamps.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--migrate", action="store_true", help="Run migrations first.")
+    return parser.parse_args(argv)
+
+
+def _db_value(table: Table, column: str, value):
+    if isinstance(value, enum.Enum):
+        # Enum columns store member names unless declared with values_callable.
+        enums = getattr(table.c[column].type, "enums", ())
+        return value.value if value.value in enums else value.name
+    return value
+
+
+class Loader:
+    """Bulk loads rows with COPY on Postgres and batched executemany elsewhere."""
+
+    def __init__(self, connection: Connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.copy = connection.dialect.name == "postgresql"
+        self.counts: dict[str, int] = {}
+        self._buffers: dict[str, list[dict]] = {}
+
+    def add(self, table_name: str, row: dict) -> None:
+        buffer = self._buffers.setdefault(table_name, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            # Flush every buffer, parents first (insertion order), so child rows never
+            # reach the database before the rows they reference.
+            self.flush()
+
+    def add_all(self, table_name: str, rows: Iterable[dict]) -> None:
+        for row in rows:
+            self.add(table_name, row)
+        self.flush(table_name)
+
+    def flush(self, table_name: str | None = None) -> None:
+        for name in [table_name] if table_name else list(self._buffers):
+            rows = self._buffers.get(name)
+            if not rows:
+                continue
+            table = Base.metadata.tables[name]
+            if self.copy:
+                self._copy(table, rows)
+            else:
+                self.connection.execute(table.insert(), rows)
+            self.counts[name] = self.counts.get(name, 0) + len(rows)
+            self._buffers[name] = []
+        self.connection.commit()
+
+    def _copy(self, table: Table, rows: list[dict]) -> None:
+        columns = list(rows[0])
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        if not self.connection.in_transaction():
+            # COPY goes through the raw driver cursor; make flush()'s commit cover it.
+            self.connection.begin()
+        cursor = self.connection.connection.driver_connection.cursor()
+        with cursor.copy(f'COPY "{table.name}" ({column_list}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row([_db_value(table, column, row[column]) for column in columns])
+
+
+def _route(loader: Loader, rows: Iterator[tuple[str, dict]]) -> None:
+    for table_name, row in rows:
+        loader.add(table_name, row)
+    loader.flush()
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.migrate:
+        run_migrations()
+    scale = Scale(
+        landlords=args.landlords,
+        properties=args.properties,
+        vendors=args.vendors,
+        issues=args.issues,
+        messages=args.messages,
+        image_fraction=args.image_fraction,
+        image_kb=args.image_kb,
+        days=args.days,
+    )
+    generator = Generator(scale, seed=args.seed)
+    started = time.perf_counter()
+    with get_engine().connect() as connection:
+        loader = Loader(connection, args.batch_size)
+        loader.add_all("users", generator.landlords())
+        loader.add_all("properties", generator.properties())
+        loader.add_all("users", generator.tenants())
+        loader.add_all("vendors", generator.vendors())
+        _route(loader, generator.wallets())
+        _route(loader, generator.issues_and_messages())
+    elapsed = time.perf_counter() - started
+    for table_name, count in loader.counts.items():
+        print(f"{table_name:<22} {count:>12,}")
+    print(f"loaded in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import base64
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import random
+import uuid
+
+from db import (
+    CLOSED_ISSUE_STATUSES,
+    ChatRole,
+    IssueCategory,
+    IssueStatus,
+    UserRole,
+    VendorSpecialty,
+    encode_geohash,
+)
+
+# (name, latitude, longitude) of metro areas properties and vendors cluster around.
+METROS = (
+    ("Austin", 30.2672, -97.7431),
+    ("Dallas", 32.7767, -96.7970),
+    ("Houston", 29.7604, -95.3698),
+    ("Phoenix", 33.4484, -112.0740),
+    ("Denver", 39.7392, -104.9903),
+    ("Chicago", 41.8781, -87.6298),
+    ("Atlanta", 33.7490, -84.3880),
+    ("Seattle", 47.6062, -122.3321),
+    ("Boston", 42.3601, -71.0589),
+    ("Miami", 25.7617, -80.1918),
+)
+CATEGORY_WEIGHTS = {
+    IssueCategory.PLUMBING: 40,
+    IssueCategory.HEATING: 25,
+    IssueCategory.ELECTRICAL: 20,
+    IssueCategory.OTHER: 15,
+}
+# Most of a mature portfolio's issues are closed.
+STATUS_WEIGHTS = {
+    IssueStatus.COMPLETED: 60,
+    IssueStatus.REJECTED: 10,
+    IssueStatus.IN_PROGRESS: 10,
+    IssueStatus.APPROVED: 8,
+    IssueStatus.PENDING: 12,
+}
+ISSUE_TEXT = {
+    IssueCategory.PLUMBING: ("leak under the sink", "toilet keeps running", "drain is clogged"),
+    IssueCategory.HEATING: ("heater blows cold air", "furnace won't start", "thermostat is dead"),
+    IssueCategory.ELECTRICAL: ("outlet sparks", "breaker keeps tripping", "lights flicker"),
+    IssueCategory.OTHER: ("door lock is jammed", "window won't close", "ceiling stain"),
+}
+STARTED = ("this morning", "yesterday", "last night", "a few days ago", "last week")
+SEVERITY = ("It's urgent.", "Not an emergency.", "It's getting worse.", "Minor but annoying.")
+ASSISTANT_TEXT = (
+    "Thanks for reporting this. When did it start?",
+    "How severe is it, and is anything else affected?",
+    "Would you like me to escalate this to your landlord?",
+    "I've escalated this to your landlord. Thanks for letting us know.",
+)
+
+
+@dataclass
+class Scale:
+    landlords: int
+    properties: int
+    vendors: int
+    issues: int
+    messages: int
+    image_fraction: float
+    image_kb: int
+    days: int
+
+
+class Generator:
+    def __init__(self, scale: Scale, seed: int):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.domain = f"s{seed}.load.proco.dev"
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.landlord_ids: list[uuid.UUID] = []
+        self.property_ids: list[uuid.UUID] = []
+        self.property_tenants: list[list[uuid.UUID]] = []
+        self.vendor_ids: dict[VendorSpecialty, list[tuple[uuid.UUID, float]]] = {}
+        self._images = [
+            "data:image/jpeg;base64,"
+            + base64.b64encode(self.rng.randbytes(scale.image_kb * 1024)).decode()
+            for _ in range(8)
+        ]
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _skewed_index(self, size: int, skew: float = 2.5) -> int:
+        # Power-law-ish: a few landlords own many properties, most own a handful.
+        return min(size - 1, int(size * self.rng.random() ** skew))
+
+    def _point(self, spread_deg: float) -> tuple[float, float]:
+        _, lat, lng = self.rng.choice(METROS)
+        return (
+            round(lat + self.rng.gauss(0, spread_deg), 6),
+            round(lng + self.rng.gauss(0, spread_deg), 6),
+        )
+
+    def _timestamp(self) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randrange(self.scale.days * 86400))
+
+    def landlords(self) -> Iterator[dict]:
+        for index in range(self.scale.landlords):
+            landlord_id = self._uuid()
+            self.landlord_ids.append(landlord_id)
+            yield {
+                "id": landlord_id,
+                "email": f"landlord{index}@{self.domain}",
+                "role": UserRole.LANDLORD,
+                "name": f"Landlord {index}",
+                "property_id": None,
+            }
+
+    def properties(self) -> Iterator[dict]:
+        for index in range(self.scale.properties):
+            property_id = self._uuid()
+            latitude, longitude = self._point(0.25)
+            self.property_ids.append(property_id)
+            yield {
+                "id": property_id,
+                "address": f"{index + 1} Synthetic Ave",
+                "latitude": latitude,
+                "longitude": longitude,
+                "geohash": encode_geohash(latitude, longitude),
+                "landlord_id": self.landlord_ids[self._skewed_index(len(self.landlord_ids))],
+            }
+
+    def tenants(self) -> Iterator[dict]:
+        counter = 0
+        for property_id in self.property_ids:
+            tenant_ids = []
+            for _ in range(self.rng.choice((1, 1, 2, 2, 3))):
+                tenant_id = self._uuid()
+                tenant_ids.append(tenant_id)
+                yield {
+                    "id": tenant_id,
+                    "email": f"tenant{counter}@{self.domain}",
+                    "role": UserRole.TENANT,
+                    "name": f"Tenant {counter}",
+                    "property_id": property_id,
+                }
+                counter += 1
+            self.property_tenants.append(tenant_ids)
+
+    def vendors(self) -> Iterator[dict]:
+        specialties = list(VendorSpecialty)
+        for index in range(self.scale.vendors):
+            specialty = specialties[index % len(specialties)]
+            vendor_id = self._uuid()
+            hourly_rate = round(self.rng.uniform(60, 200), 2)
+            self.vendor_ids.setdefault(specialty, []).append((vendor_id, hourly_rate))
+            latitude, longitude = self._point(0.4)
+            yield {
+                "id": vendor_id,
+                "name": f"Vendor {index}",
+                "email": f"vendor{index}@{self.domain}",
+                "specialty": specialty,
+                "hourly_rate": hourly_rate,
+                "rating": round(min(5.0, max(1.0, self.rng.gauss(4.3, 0.4))), 2),
+                "latitude": latitude,
+                "longitude": longitude,
+                "service_radius_km": self.rng.choice((15, 25, 40, 60)),
+            }
+
+    def issues_and_messages(self) -> Iterator[tuple[str, dict]]:
+        """Yield each issue's ("conversations", row), ("issues", row) and ("chat_messages", row)s.
+
+        Conversations reuse their issue's id, like migration 0006 does for existing issues.
+        """
+        categories, category_weights = zip(*CATEGORY_WEIGHTS.items())
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items())
+        specialty_for = {
+            IssueCategory.HEATING: VendorSpecialty.HEATING,
+            IssueCategory.PLUMBING: VendorSpecialty.PLUMBING,
+            IssueCategory.ELECTRICAL: VendorSpecialty.ELECTRICAL,
+            IssueCategory.OTHER: VendorSpecialty.GENERAL,
+        }
+        mean_messages = self.scale.messages / max(self.scale.issues, 1)
+        remaining_messages = self.scale.messages
+        for index in range(self.scale.issues):
+            property_index = self._skewed_index(len(self.property_ids), skew=1.5)
+            property_id = self.property_ids[property_index]
+            tenant_id = self.rng.choice(self.property_tenants[property_index])
+            category = self.rng.choices(categories, category_weights)[0]
+            status = self.rng.choices(statuses, status_weights)[0]
+            vendors = self.vendor_ids.get(specialty_for[category]) or [(None, 100.0)]
+            vendor_id, hourly_rate = self.rng.choice(vendors)
+            created_at = self._timestamp()
+            problem = self.rng.choice(ISSUE_TEXT[category])
+            description = (
+                f"The {problem}. Started {self.rng.choice(STARTED)}. {self.rng.choice(SEVERITY)}"
+            )
+            issue_id = self._uuid()
+            appointment_at = (
+                created_at + timedelta(days=self.rng.randint(1, 7))
+                if status in (IssueStatus.IN_PROGRESS, IssueStatus.COMPLETED)
+                else None
+            )
+            yield "conversations", {
+                "id": issue_id,
+                "tenant_id": tenant_id,
+                "property_id": property_id,
+                "created_at": created_at,
+                "closed_at": created_at,
+            }
+            yield "issues", {
+                "id": issue_id,
+                "tenant_id": tenant_id,
+                "property_id": property_id,
+                "conversation_id": issue_id,
+                "category": category,
+                "summary": f"{category.value.title()} issue: {problem}",
+                "description": description,
+                "status": status,
+                "vendor_id": vendor_id,
+                "estimated_cost": round(hourly_rate * self.rng.choice((1, 1.5, 2, 2.5)), 2),
+                "appointment_at": appointment_at,
+                "closed_at": (
+                    (appointment_at or created_at) + timedelta(days=1)
+                    if status in CLOSED_ISSUE_STATUSES
+                    else None
+                ),
+                "created_at": created_at,
+            }
+
+            issues_left = self.scale.issues - index
+            target = remaining_messages if issues_left == 1 else self.rng.expovariate(1 / mean_messages)
+            count = min(max(2, int(round(target))), remaining_messages)
+            remaining_messages -= count
+            for position in range(count):
+                role = ChatRole.USER if position % 2 == 0 else ChatRole.ASSISTANT
+                if role == ChatRole.USER:
+                    content = description if position == 0 else self.rng.choice(SEVERITY)
+                else:
+                    content = ASSISTANT_TEXT[min(position // 2, len(ASSISTANT_TEXT) - 1)]
+                with_image = (
+                    role == ChatRole.USER and self.rng.random() < self.scale.image_fraction
+                )
+                yield "chat_messages", {
+                    "id": self._uuid(),
+                    "issue_id": issue_id,
+                    "conversation_id": issue_id,
+                    "property_id": property_id,
+                    "tenant_id": tenant_id,
+                    "role": role,
+                    "content": content,
+                    "image_base64": self.rng.choice(self._images) if with_image else None,
+                    "created_at": created_at + timedelta(minutes=position),
+                }
+
+    def wallets(self) -> Iterator[tuple[str, dict]]:
+        for property_id in self.property_ids:
+            balance = round(self.rng.uniform(500, 20000), 2)
+            created_at = self._timestamp()
+            yield "property_wallets", {
+                "id": self._uuid(),
+                "property_id": property_id,
+                "balance": balance,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+            yield "wallet_transactions", {
+                "id": self._uuid(),
+                "property_id": property_id,
+                "amount": balance,
+                "note": "Initial funding",
+                "created_at": created_at,
+            }
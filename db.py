@@ -1,15 +1,50 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from datetime import datetime, timezone
 import enum
 import os
+import threading
+import time
 import uuid
 
 from dotenv import load_dotenv
-from sqlalchemy import DateTime, Enum, ForeignKey, Numeric, String, Text, create_engine, func
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    Numeric,
+    String,
+    Text,
+    create_engine,
+    event,
+    func,
+)
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    Session,
+    mapped_column,
+    relationship,
+    sessionmaker,
+)
 
-load_dotenv()
+_env_loaded = False
+
+
+def load_environment() -> None:
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
 
 
 class Base(DeclarativeBase):
@@ -36,6 +71,25 @@ class IssueStatus(enum.Enum):
     REJECTED = "rejected"
 
 
+OPEN_ISSUE_STATUSES = (IssueStatus.PENDING, IssueStatus.APPROVED, IssueStatus.IN_PROGRESS)
+CLOSED_ISSUE_STATUSES = (IssueStatus.COMPLETED, IssueStatus.REJECTED)
+
+
+class DispatchStatus(enum.Enum):
+    QUEUED = "queued"
+    SENT = "sent"
+    ACCEPTED = "accepted"
+    DECLINED = "declined"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class SummaryStatus(enum.Enum):
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
+
 class VendorSpecialty(enum.Enum):
     HEATING = "heating"
     PLUMBING = "plumbing"
@@ -77,6 +131,7 @@ class Property(Base):
     address: Mapped[str] = mapped_column(String, nullable=False)
     latitude: Mapped[float | None] = mapped_column(Numeric(9, 6), nullable=True)
     longitude: Mapped[float | None] = mapped_column(Numeric(9, 6), nullable=True)
+    geohash: Mapped[str | None] = mapped_column(String(12), nullable=True, index=True)
     landlord_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
     )
@@ -97,6 +152,47 @@ class Property(Base):
     )
 
 
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars: list[str] = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            target, value = lng_range, longitude
+        else:
+            target, value = lat_range, latitude
+        mid = (target[0] + target[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            target[0] = mid
+        else:
+            target[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+@event.listens_for(Property, "before_insert")
+@event.listens_for(Property, "before_update")
+def _sync_property_geohash(mapper, connection, target: Property) -> None:
+    if target.latitude is None or target.longitude is None:
+        target.geohash = None
+    else:
+        target.geohash = encode_geohash(float(target.latitude), float(target.longitude))
+
+
 class Vendor(Base):
     __tablename__ = "vendors"
 
@@ -110,12 +206,23 @@ class Vendor(Base):
     )
     hourly_rate: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
     rating: Mapped[float | None] = mapped_column(Numeric(3, 2), nullable=True)
+    latitude: Mapped[float | None] = mapped_column(Numeric(9, 6), nullable=True)
+    longitude: Mapped[float | None] = mapped_column(Numeric(9, 6), nullable=True)
+    service_radius_km: Mapped[float | None] = mapped_column(Numeric(6, 2), nullable=True)
 
     issues: Mapped[list["Issue"]] = relationship(back_populates="vendor")
 
 
 class Issue(Base):
     __tablename__ = "issues"
+    __table_args__ = (
+        Index("ix_issues_created_at", "created_at"),
+        Index("ix_issues_status", "status"),
+        Index("ix_issues_property_id_status", "property_id", "status"),
+        Index("ix_issues_summary_status_next_attempt", "summary_status", "summary_next_attempt_at"),
+        Index("ix_issues_conversation_id", "conversation_id"),
+        Index("ix_issues_closed_at", "closed_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -130,6 +237,23 @@ class Issue(Base):
         Enum(IssueCategory, name="issue_category"), nullable=False
     )
     summary: Mapped[str] = mapped_column(String, nullable=False)
+    # PENDING while the background worker replaces the heuristic summary with the LLM one.
+    summary_status: Mapped[SummaryStatus] = mapped_column(
+        Enum(
+            SummaryStatus,
+            name="summary_status",
+            values_callable=lambda enum_cls: [item.value for item in enum_cls],
+        ),
+        nullable=False,
+        default=SummaryStatus.READY,
+        server_default=SummaryStatus.READY.value,
+    )
+    summary_attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    summary_next_attempt_at: Mapped[object | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     description: Mapped[str] = mapped_column(Text, nullable=False)
     status: Mapped[IssueStatus] = mapped_column(
         Enum(IssueStatus, name="issue_status"), nullable=False
@@ -137,10 +261,15 @@ class Issue(Base):
     vendor_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("vendors.id"), nullable=True
     )
+    conversation_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("conversations.id"), nullable=True
+    )
     estimated_cost: Mapped[float | None] = mapped_column(Numeric(10, 2), nullable=True)
     appointment_at: Mapped[object | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # When the issue was completed or rejected; drives chat message archival.
+    closed_at: Mapped[object | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[object] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -148,11 +277,61 @@ class Issue(Base):
     tenant: Mapped["User"] = relationship(back_populates="issues")
     property: Mapped["Property"] = relationship(back_populates="issues")
     vendor: Mapped["Vendor | None"] = relationship(back_populates="issues")
+    conversation: Mapped["Conversation | None"] = relationship(back_populates="issue")
     messages: Mapped[list["ChatMessage"]] = relationship(back_populates="issue")
 
 
+class Conversation(Base):
+    """One tenant chat thread; messages join it on insert and it closes when it becomes an issue."""
+
+    __tablename__ = "conversations"
+    __table_args__ = (
+        Index("ix_conversations_tenant_property_closed", "tenant_id", "property_id", "closed_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+    )
+    property_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("properties.id"), nullable=False
+    )
+    created_at: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    closed_at: Mapped[object | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    tenant: Mapped["User"] = relationship(foreign_keys=[tenant_id])
+    property: Mapped["Property"] = relationship()
+    issue: Mapped["Issue | None"] = relationship(back_populates="conversation", uselist=False)
+    messages: Mapped[list["ChatMessage"]] = relationship(back_populates="conversation")
+
+
+class IssueAttachment(Base):
+    """A tenant's conversation attached to another tenant's open issue as a duplicate report."""
+
+    __tablename__ = "issue_attachments"
+    __table_args__ = (Index("ix_issue_attachments_issue_id", "issue_id"),)
+
+    conversation_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("conversations.id"), primary_key=True
+    )
+    issue_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("issues.id"), primary_key=True
+    )
+    created_at: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_issue_id_created_at", "issue_id", "created_at"),
+        Index("ix_chat_messages_conversation_id_created_at", "conversation_id", "created_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -160,6 +339,9 @@ class ChatMessage(Base):
     issue_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("issues.id"), nullable=True
     )
+    conversation_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("conversations.id"), nullable=True
+    )
     property_id: Mapped[uuid.UUID | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("properties.id"), nullable=True
     )
@@ -176,15 +358,89 @@ class ChatMessage(Base):
     )
     content: Mapped[str] = mapped_column(Text, nullable=False)
     image_base64: Mapped[str | None] = mapped_column(Text, nullable=True)
+    image_key: Mapped[str | None] = mapped_column(String(80), nullable=True)
+    llm_latency_ms: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    llm_prompt_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    llm_completion_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    llm_usage: Mapped[list | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[object] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
     issue: Mapped["Issue | None"] = relationship(back_populates="messages")
+    conversation: Mapped["Conversation | None"] = relationship(back_populates="messages")
     tenant: Mapped["User"] = relationship(foreign_keys=[tenant_id])
     property: Mapped["Property | None"] = relationship(back_populates="messages")
 
 
+class VendorDispatch(Base):
+    """One vendor asked (or queued to be asked) to take an issue; the first to accept wins."""
+
+    __tablename__ = "vendor_dispatches"
+    __table_args__ = (
+        Index("ix_vendor_dispatches_issue_id_status", "issue_id", "status"),
+        Index("ix_vendor_dispatches_token", "token", unique=True),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    issue_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("issues.id"), nullable=False
+    )
+    vendor_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("vendors.id"), nullable=False
+    )
+    # Position in the candidate list; declines and failed sends move on in rank order.
+    rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    status: Mapped[DispatchStatus] = mapped_column(
+        Enum(
+            DispatchStatus,
+            name="dispatch_status",
+            values_callable=lambda enum_cls: [item.value for item in enum_cls],
+        ),
+        nullable=False,
+        default=DispatchStatus.QUEUED,
+    )
+    # Secret in the vendor's response link; identifies which vendor answered.
+    token: Mapped[str] = mapped_column(String(64), nullable=False)
+    sent_at: Mapped[object | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    responded_at: Mapped[object | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    vendor: Mapped["Vendor"] = relationship()
+
+
+class ChatMessageArchive(Base):
+    """Messages of a long-closed issue's thread, moved out of chat_messages as compressed JSON."""
+
+    __tablename__ = "chat_message_archive"
+    __table_args__ = (
+        Index("ix_chat_message_archive_conversation_id", "conversation_id"),
+    )
+
+    issue_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("issues.id"), primary_key=True
+    )
+    conversation_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    message_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    first_message_at: Mapped[object] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_message_at: Mapped[object] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+@event.listens_for(Issue.status, "set")
+def _track_closed_at(issue: Issue, value, oldvalue, initiator) -> None:
+    if value == oldvalue:
+        return
+    issue.closed_at = datetime.now(timezone.utc) if value in CLOSED_ISSUE_STATUSES else None
+
+
 class PropertyWallet(Base):
     __tablename__ = "property_wallets"
 
@@ -226,16 +482,223 @@ class WalletTransaction(Base):
     property: Mapped["Property"] = relationship(back_populates="wallet_transactions")
 
 
-def get_engine():
-    database_url = os.getenv("DATABASE_URL")
-    if not database_url:
-        raise RuntimeError("DATABASE_URL is not set")
-    return create_engine(database_url, pool_pre_ping=True)
+class IdempotencyKey(Base):
+    """A client's Idempotency-Key; holds the response once the original request has finished."""
 
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
 
-def get_sessionmaker():
-    engine = get_engine()
-    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    key: Mapped[str] = mapped_column(String(320), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    # None while the original request is running.
+    response: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Running requests: end of the lease; finished ones: when the key may be reused.
+    expires_at: Mapped[object] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[object] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+def as_utc(value: datetime) -> datetime:
+    """Timezone-aware UTC datetime from a DateTime(timezone=True) column; SQLite hands back
+    naive UTC timestamps."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+_commit_hooks: dict[str, tuple[Callable[[Session], object], Callable[[list], None]]] = {}
+
+
+def run_on_commit(
+    name: str, collect: Callable[[Session], object], apply: Callable[[list], None]
+) -> None:
+    """Call `collect(session)` after every flush and, once that transaction commits, `apply`
+    with the truthy values it returned, in flush order. A rollback discards them.
+
+    Applying only once the write is visible keeps in-process caches and indexes from being
+    refreshed from pre-commit state, and ignores writes that roll back.
+    """
+    _commit_hooks[name] = (collect, apply)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_commit_hooks(session: Session, flush_context) -> None:
+    for name, (collect, _) in _commit_hooks.items():
+        change = collect(session)
+        if change:
+            session.info.setdefault("on_commit", {}).setdefault(name, []).append(change)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_commit_hooks(session: Session) -> None:
+    for name, changes in session.info.pop("on_commit", {}).items():
+        _commit_hooks[name][1](changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_commit_hooks(session: Session) -> None:
+    session.info.pop("on_commit", None)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait to check out a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        self._stats_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.wait_count += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _engine_options(database_url: str) -> dict:
+    options: dict = {"pool_pre_ping": True}
+    is_postgres = database_url.startswith("postgresql")
+    if os.getenv("DB_PGBOUNCER", "").lower() in {"1", "true", "yes"}:
+        # PgBouncer does the pooling; keep no idle connections and skip server-side
+        # prepared statements, which break under transaction pooling.
+        options["poolclass"] = NullPool
+        if is_postgres:
+            options["connect_args"] = {"prepare_threshold": None}
+        return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=_env_int("DB_POOL_SIZE", 5),
+        max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+        pool_timeout=_env_int("DB_POOL_TIMEOUT", 30),
+        pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+    )
+    statement_timeout_ms = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if is_postgres and statement_timeout_ms:
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    return options
+
+
+_engines: dict[str, Engine] = {}
+_sessionmakers: dict[str, sessionmaker] = {}
+_registry_lock = threading.Lock()
+
+
+def _create_engine(database_url: str) -> Engine:
+    engine = create_engine(database_url, **_engine_options(database_url))
+    statement_timeout_ms = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if (
+        statement_timeout_ms
+        and engine.dialect.name == "postgresql"
+        and isinstance(engine.pool, NullPool)
+    ):
+
+        @event.listens_for(engine, "begin")
+        def _set_local_statement_timeout(conn) -> None:
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {statement_timeout_ms}")
+
+    return engine
+
+
+def _replica_urls() -> list[str]:
+    urls = (url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(","))
+    return [url for url in urls if url]
+
+
+def replica_names() -> list[str]:
+    """Engine names of the read replicas listed in DATABASE_REPLICA_URLS (comma-separated)."""
+    load_environment()
+    return [f"replica{index}" for index in range(len(_replica_urls()))]
+
+
+def _database_url(name: str) -> str:
+    if name == "primary":
+        database_url = os.getenv("DATABASE_URL")
+        if not database_url:
+            raise RuntimeError("DATABASE_URL is not set")
+        return database_url
+    urls = _replica_urls()
+    index = name.removeprefix("replica")
+    if not index.isdigit() or int(index) >= len(urls):
+        raise RuntimeError(f"Database {name!r} is not configured")
+    return urls[int(index)]
+
+
+def get_engine(name: str = "primary") -> Engine:
+    engine = _engines.get(name)
+    if engine is not None:
+        return engine
+    with _registry_lock:
+        if name not in _engines:
+            load_environment()
+            _engines[name] = _create_engine(_database_url(name))
+        return _engines[name]
+
+
+def get_sessionmaker(name: str = "primary") -> sessionmaker:
+    factory = _sessionmakers.get(name)
+    if factory is None:
+        factory = sessionmaker(bind=get_engine(name), autoflush=False, autocommit=False)
+        _sessionmakers[name] = factory
+    return factory
+
+
+def dispose_engines() -> None:
+    with _registry_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _sessionmakers.clear()
+
+
+def pool_capacity(name: str = "primary") -> int | None:
+    """Most connections the named engine's pool will hand out, or None if unbounded."""
+    pool = get_engine(name).pool
+    if isinstance(pool, QueuePool):
+        return pool.size() + max(pool._max_overflow, 0)
+    return None
+
+
+def pool_stats() -> dict[str, dict]:
+    stats: dict[str, dict] = {}
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            stats[name] = {"pool": type(pool).__name__}
+            continue
+        entry = {
+            "pool": type(pool).__name__,
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        }
+        if isinstance(pool, InstrumentedQueuePool):
+            entry.update(
+                wait_count=pool.wait_count,
+                wait_seconds_total=round(pool.wait_seconds_total, 6),
+                wait_seconds_max=round(pool.wait_seconds_max, 6),
+                timeouts=pool.timeouts,
+            )
+        stats[name] = entry
+    return stats
 
 
 def create_tables():
@@ -243,6 +706,24 @@ def create_tables():
     Base.metadata.create_all(bind=engine)
 
 
+MIGRATIONS_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+BASELINE_REVISION = "0001_baseline"
+
+
+def run_migrations(revision: str = "head"):
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import inspect
+
+    config = Config(MIGRATIONS_CONFIG)
+    config.attributes["configure_logger"] = False
+    tables = set(inspect(get_engine()).get_table_names())
+    if "users" in tables and "alembic_version" not in tables:
+        # Database was created by create_tables before migrations existed.
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, revision)
+
+
 def seed_dummy_data():
     session = get_sessionmaker()()
     try:
@@ -280,6 +761,9 @@ def seed_dummy_data():
                 specialty=VendorSpecialty.HEATING,
                 hourly_rate=125.00,
                 rating=4.7,
+                latitude=30.284918,
+                longitude=-97.734057,
+                service_radius_km=40,
             ),
             Vendor(
                 name="FlowFix Plumbing",
@@ -287,6 +771,9 @@ def seed_dummy_data():
                 specialty=VendorSpecialty.PLUMBING,
                 hourly_rate=110.00,
                 rating=4.5,
+                latitude=30.250000,
+                longitude=-97.750000,
+                service_radius_km=30,
             ),
             Vendor(
                 name="BrightSpark Electric",
@@ -294,6 +781,9 @@ def seed_dummy_data():
                 specialty=VendorSpecialty.ELECTRICAL,
                 hourly_rate=135.00,
                 rating=4.8,
+                latitude=30.400000,
+                longitude=-97.700000,
+                service_radius_km=50,
             ),
             Vendor(
                 name="Handy General Co",
@@ -301,12 +791,17 @@ def seed_dummy_data():
                 specialty=VendorSpecialty.GENERAL,
                 hourly_rate=95.00,
                 rating=4.2,
+                latitude=30.267153,
+                longitude=-97.743057,
+                service_radius_km=25,
             ),
         ]
 
+        conversation = Conversation(tenant=tenant_1, property=property_, closed_at=func.now())
         issue = Issue(
             tenant=tenant_1,
             property=property_,
+            conversation=conversation,
             category=IssueCategory.HEATING,
             summary="Heater not producing warm air",
             description="Tenant reports no warm air since yesterday morning.",
@@ -318,6 +813,7 @@ def seed_dummy_data():
         messages = [
             ChatMessage(
                 issue=issue,
+                conversation=conversation,
                 property=property_,
                 tenant=tenant_1,
                 role=ChatRole.USER,
@@ -325,6 +821,7 @@ def seed_dummy_data():
             ),
             ChatMessage(
                 issue=issue,
+                conversation=conversation,
                 property=property_,
                 tenant=tenant_1,
                 role=ChatRole.ASSISTANT,
@@ -332,6 +829,7 @@ def seed_dummy_data():
             ),
             ChatMessage(
                 issue=issue,
+                conversation=conversation,
                 property=property_,
                 tenant=tenant_1,
                 role=ChatRole.USER,
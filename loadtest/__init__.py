@@ -0,0 +1,4 @@
+"""HTTP load tests for the ProCo API.
+
+Run with ``python -m loadtest --help``.
+"""
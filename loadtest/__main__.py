@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from loadtest.scenarios import Traffic
+from loadtest.stats import StepResult, compare, format_table, load_json
+
+HERE = Path(__file__).resolve().parent
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description=__doc__)
+    parser.add_argument("--base-url", help="Target an already running API (…/api).")
+    parser.add_argument(
+        "--database-url",
+        help="Database for the in-process server (default: a fresh SQLite file).",
+    )
+    parser.add_argument("--concurrency", default="1,4,16,32", help="Comma-separated levels.")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per level.")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--image-kb", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", type=Path, default=HERE / "baseline.json")
+    parser.add_argument("--slos", type=Path, default=HERE / "slos.json")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95/p99 growth.")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here.")
+    parser.add_argument("--update-baseline", action="store_true")
+    return parser.parse_args(argv)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_local_server(args: argparse.Namespace) -> str:
+    database_url = args.database_url or (
+        "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="proco-load-"), "proco.db")
+    )
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["LLM_BACKEND"] = "offline"
+    os.environ["OFFLINE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+
+    import uvicorn
+
+    from db import create_tables, seed_dummy_data
+
+    create_tables()
+    seed_dummy_data()
+
+    from app.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("Local API did not start within 30s")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/api"
+
+
+async def run_step(base_url: str, concurrency: int, args: argparse.Namespace) -> StepResult:
+    result = StepResult(concurrency=concurrency, duration_s=args.duration)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        tenants = (await client.get("/users", params={"role": "tenant"})).json()
+        if not tenants:
+            raise RuntimeError("No tenants found; seed the database first")
+        deadline = time.monotonic() + args.duration
+
+        async def worker(index: int) -> None:
+            traffic = Traffic(client, tenants, args.image_kb, seed=args.seed * 1000 + index)
+            while time.monotonic() < deadline:
+                await traffic.run(traffic.pick_scenario(), result)
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        result.duration_s = time.monotonic() - started
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    base_url = args.base_url or start_local_server(args)
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    results: dict[int, dict] = {}
+    for concurrency in levels:
+        step = asyncio.run(run_step(base_url, concurrency, args))
+        results[concurrency] = step.summary()
+        print(f"finished concurrency={concurrency}", file=sys.stderr)
+
+    print(format_table(results))
+    report = {str(level): routes for level, routes in results.items()}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    failures = compare(results, load_json(args.baseline), load_json(args.slos), args.tolerance)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""Micro-benchmarks for agent helpers and response serialization, with regression gates.
+
+Usage: python -m loadtest.bench [--filter NAME] [--update-baseline]
+"""
+from __future__ import annotations
+
+import argparse
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+import base64
+import json
+import os
+from pathlib import Path
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import timeit
+from types import SimpleNamespace
+import uuid
+
+from loadtest.stats import load_json
+
+HERE = Path(__file__).resolve().parent
+ROOT = HERE.parent
+
+SENTENCES = (
+    "The kitchen sink has been leaking under the cabinet since yesterday",
+    "water is pooling on the floor and the cabinet door is starting to swell",
+    "I turned the valve off but it still drips every few seconds",
+    "the heater stopped working last night and the apartment is really cold",
+    "there is a burning smell near the outlet in the living room",
+    "the breaker trips whenever the microwave and the kettle run together",
+    "my neighbour downstairs mentioned a stain on their ceiling",
+    "it is getting worse and I am worried about mold",
+    "I can be home any weekday after four to let someone in",
+)
+CONFIRMATIONS = ("yes please", "Go ahead and escalate it.", "not yet, one more thing", "ok")
+
+
+def _message(rng: random.Random, sentences: int) -> str:
+    return ". ".join(rng.choice(SENTENCES) for _ in range(sentences)).capitalize() + "."
+
+
+class Corpus:
+    """Seeded inputs shaped like production traffic: chat turns from a few words to several
+    kilobytes, multi-megabyte data-URL photos, and 10k-row list responses."""
+
+    def __init__(self, seed: int = 7, rows: int = 10_000, image_kb: int = 2048):
+        from db import ChatRole, IssueCategory, IssueStatus, SummaryStatus
+
+        rng = random.Random(seed)
+        self.short = _message(rng, 1)
+        self.long = _message(rng, 60)
+        self.messages = [_message(rng, rng.choice((1, 2, 4, 8, 30))) for _ in range(200)]
+        self.confirmations = [*CONFIRMATIONS, *self.messages[:20]]
+        self.image = "data:image/jpeg;base64," + base64.b64encode(
+            rng.randbytes(image_kb * 1024)
+        ).decode("ascii")
+        started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        categories = list(IssueCategory)
+        statuses = list(IssueStatus)
+        self.issues = [
+            SimpleNamespace(
+                id=uuid.UUID(int=rng.getrandbits(128)),
+                tenant_id=uuid.UUID(int=rng.getrandbits(128)),
+                property_id=uuid.UUID(int=rng.getrandbits(128)),
+                category=rng.choice(categories),
+                summary=_message(rng, 3),
+                summary_status=SummaryStatus.READY,
+                description=self.messages[index % len(self.messages)],
+                status=rng.choice(statuses),
+                vendor_id=uuid.UUID(int=rng.getrandbits(128)),
+                conversation_id=uuid.UUID(int=rng.getrandbits(128)),
+                estimated_cost=round(rng.uniform(50, 900), 2),
+                appointment_at=None,
+                created_at=started + timedelta(minutes=index),
+            )
+            for index in range(rows)
+        ]
+        self.chat_messages = [
+            SimpleNamespace(
+                id=uuid.UUID(int=rng.getrandbits(128)),
+                issue_id=None,
+                conversation_id=uuid.UUID(int=rng.getrandbits(128)),
+                property_id=uuid.UUID(int=rng.getrandbits(128)),
+                tenant_id=uuid.UUID(int=rng.getrandbits(128)),
+                role=ChatRole.USER if index % 2 == 0 else ChatRole.ASSISTANT,
+                content=self.messages[index % len(self.messages)],
+                image_base64=None,
+                image_key=None,
+                llm_latency_ms=None,
+                llm_prompt_tokens=None,
+                llm_completion_tokens=None,
+                llm_usage=None,
+                created_at=started + timedelta(seconds=index),
+            )
+            for index in range(rows)
+        ]
+
+
+def benchmarks(corpus: Corpus) -> dict[str, Callable[[], object]]:
+    from app.api.fields import parse_fields
+    from app.models import ChatMessageRead, IssueRead
+    from app.services.ai_agent import has_explicit_permission
+    from app.services.ai_tools import build_summary, classify_issue, estimate_cost
+    from app.services.vision import _split_data_url
+    from db import IssueCategory
+
+    issues = parse_fields(IssueRead, None)
+    issue_fields = parse_fields(IssueRead, "summary,status,created_at")
+    messages = parse_fields(ChatMessageRead, None)
+    categories = list(IssueCategory)
+
+    return {
+        "classify_issue.short": lambda: classify_issue(corpus.short),
+        "classify_issue.long": lambda: classify_issue(corpus.long),
+        "classify_issue.mixed_200": lambda: [classify_issue(m) for m in corpus.messages],
+        "build_summary.short": lambda: build_summary(corpus.short, IssueCategory.PLUMBING),
+        "build_summary.long": lambda: build_summary(corpus.long, IssueCategory.HEATING),
+        "estimate_cost.all_categories": lambda: [
+            estimate_cost(85.0, category) for category in categories
+        ],
+        "has_explicit_permission.mixed": lambda: [
+            has_explicit_permission(text) for text in corpus.confirmations
+        ],
+        "has_explicit_permission.long": lambda: has_explicit_permission(corpus.long),
+        "split_data_url.image": lambda: _split_data_url(corpus.image),
+        "serialize.IssueRead.10k": lambda: issues.dump_json(corpus.issues),
+        "serialize.IssueRead.10k_fields": lambda: issue_fields.dump_json(corpus.issues),
+        "serialize.ChatMessageRead.10k": lambda: messages.dump_json(corpus.chat_messages),
+    }
+
+
+def measure(function: Callable[[], object], repeat: int, min_seconds: float) -> dict[str, float]:
+    """Per-call microseconds over `repeat` timed batches, each running at least `min_seconds`."""
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    if elapsed < min_seconds:
+        number = max(int(number * min_seconds / max(elapsed, 1e-9)), 1)
+    per_call = [total / number * 1e6 for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "min_us": round(min(per_call), 3),
+        "median_us": round(statistics.median(per_call), 3),
+        "loops": number,
+    }
+
+
+def compare(results: dict[str, dict], baseline: dict, tolerance: float) -> list[str]:
+    """Benchmarks whose best time grew more than `tolerance` over the baseline's, or that the
+    baseline has no time for."""
+    failures = []
+    for name, stats in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            failures.append(f"{name}: not in the baseline; record it with --update-baseline")
+            continue
+        allowed = previous["min_us"] * (1 + tolerance)
+        if stats["min_us"] > allowed:
+            failures.append(
+                f"{name}: {stats['min_us']}us regressed from {previous['min_us']}us "
+                f"(allowed {allowed:.3f}us)"
+            )
+    return failures
+
+
+def _revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.bench", description=__doc__)
+    parser.add_argument("--filter", default="", help="Only run benchmarks containing this text.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="Per timed batch.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--image-kb", type=int, default=2048)
+    parser.add_argument("--baseline", type=Path, default=HERE / "bench_baseline.json")
+    parser.add_argument("--history", type=Path, default=HERE / "bench_history.json")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed min-time growth.")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+    baseline = load_json(args.baseline)
+    if not baseline and not args.update_baseline:
+        parser.error(f"no baseline at {args.baseline}; record one with --update-baseline")
+
+    # The helpers import the app's services; keep them off the network and any real database.
+    os.environ.setdefault("LLM_BACKEND", "offline")
+    corpus = Corpus(args.seed, args.rows, args.image_kb)
+    results = {}
+    print(f"{'benchmark':<40} {'min us':>12} {'median us':>12} {'loops':>8}")
+    for name, function in benchmarks(corpus).items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(function, args.repeat, args.min_seconds)
+        stats = results[name]
+        print(f"{name:<40} {stats['min_us']:>12} {stats['median_us']:>12} {stats['loops']:>8}")
+
+    run = {
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    history = load_json(args.history).get("runs", [])
+    args.history.write_text(json.dumps({"runs": [*history, run]}, indent=2) + "\n")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(run, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    failures = compare(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
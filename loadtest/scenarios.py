@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import base64
+import random
+import time
+
+import httpx
+
+from loadtest.stats import StepResult
+
+ISSUE_MESSAGES = (
+    "My heater stopped working yesterday, no heat at all in the bedroom.",
+    "There is a leak under the kitchen sink since this morning, water on the floor.",
+    "The breaker keeps tripping when I turn on the lights, started last night.",
+    "The front door lock is jammed and hard to open since last week.",
+)
+
+# (scenario, weight) — roughly one chat turn per three dashboard polls.
+TRAFFIC_MIX = (
+    ("chat", 20),
+    ("chat_image", 5),
+    ("poll_issues", 35),
+    ("poll_wallets", 25),
+    ("approve", 10),
+    ("vendor_response", 5),
+)
+
+
+class Traffic:
+    def __init__(self, client: httpx.AsyncClient, tenants: list[dict], image_kb: int, seed: int):
+        self.client = client
+        self.tenants = tenants
+        self.rng = random.Random(seed)
+        self.image_base64 = "data:image/jpeg;base64," + base64.b64encode(
+            self.rng.randbytes(image_kb * 1024)
+        ).decode()
+        self.pending_issue_ids: list[str] = []
+        self.approved_issue_ids: list[str] = []
+        self._conversation_step: dict[str, int] = {}
+
+    def pick_scenario(self) -> str:
+        names, weights = zip(*TRAFFIC_MIX)
+        return self.rng.choices(names, weights=weights)[0]
+
+    async def _timed(self, result: StepResult, route: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        result.record(route, (time.perf_counter() - started) * 1000, ok)
+        return response
+
+    async def run(self, scenario: str, result: StepResult) -> None:
+        await getattr(self, scenario)(result)
+
+    async def chat(self, result: StepResult, with_image: bool = False) -> None:
+        tenant = self.rng.choice(self.tenants)
+        step = self._conversation_step.get(tenant["id"], 0)
+        self._conversation_step[tenant["id"]] = step + 1
+        message = self.rng.choice(ISSUE_MESSAGES) if step % 2 == 0 else "Yes please, escalate it."
+        payload = {"tenant_id": tenant["id"], "message": message}
+        if with_image:
+            payload["image_base64"] = self.image_base64
+        route = "POST /chat (image)" if with_image else "POST /chat"
+        response = await self._timed(result, route, "POST", "/chat", json=payload)
+        if response is not None and response.status_code < 400:
+            issue_id = response.json().get("issue_id")
+            if issue_id:
+                self.pending_issue_ids.append(issue_id)
+
+    async def chat_image(self, result: StepResult) -> None:
+        await self.chat(result, with_image=True)
+
+    async def poll_issues(self, result: StepResult) -> None:
+        response = await self._timed(result, "GET /issues", "GET", "/issues")
+        if response is not None and response.status_code < 400:
+            issues = response.json()
+            self.pending_issue_ids = [i["id"] for i in issues if i["status"] == "pending"]
+            self.approved_issue_ids = [i["id"] for i in issues if i["status"] == "approved"]
+
+    async def poll_wallets(self, result: StepResult) -> None:
+        await self._timed(result, "GET /wallets", "GET", "/wallets")
+
+    async def approve(self, result: StepResult) -> None:
+        if not self.pending_issue_ids:
+            await self.poll_issues(result)
+            return
+        issue_id = self.pending_issue_ids.pop(self.rng.randrange(len(self.pending_issue_ids)))
+        response = await self._timed(
+            result, "PATCH /issues/{issue_id}/approve", "PATCH", f"/issues/{issue_id}/approve"
+        )
+        if response is not None and response.status_code < 400:
+            self.approved_issue_ids.append(issue_id)
+
+    async def vendor_response(self, result: StepResult) -> None:
+        if not self.approved_issue_ids:
+            await self.poll_issues(result)
+            return
+        issue_id = self.approved_issue_ids.pop(self.rng.randrange(len(self.approved_issue_ids)))
+        await self._timed(
+            result,
+            "POST /issues/{issue_id}/vendor-response",
+            "POST",
+            f"/issues/{issue_id}/vendor-response",
+            json={
+                "accepted": True,
+                "appointment_at": "2030-01-01T10:00:00Z",
+                "notes": "Load test booking",
+            },
+        )
@@ -0,0 +1,88 @@
+"""Import-time profile and cold-start time-to-first-health for the API.
+
+Usage: python -m loadtest.startup [--top 15] [--budget-ms 1000]
+"""
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+import os
+from pathlib import Path
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_profile(module: str = "app.main") -> list[tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every module imported by `module`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def time_to_health(timeout_s: float = 30.0) -> float:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=os.environ.copy(),
+    )
+    try:
+        while time.perf_counter() - started < timeout_s:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=1).status_code == 200:
+                    return (time.perf_counter() - started) * 1000
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        raise RuntimeError("API did not report healthy in time")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.startup", description=__doc__)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    parser.add_argument("--skip-server", action="store_true")
+    args = parser.parse_args(argv)
+
+    rows = import_profile()
+    total_us = max(cumulative for _, _, cumulative in rows)
+    by_package: dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    print(f"import app.main: {total_us / 1000:.1f} ms")
+    print(f"{'package':<32} {'self ms':>9}")
+    for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{package:<32} {self_us / 1000:>9.1f}")
+
+    if args.skip_server:
+        return 0
+    health_ms = time_to_health()
+    print(f"process start -> first /api/health: {health_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    return 0 if health_ms <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+@dataclass
+class StepResult:
+    concurrency: int
+    duration_s: float
+    latencies_ms: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, route: str, latency_ms: float, ok: bool) -> None:
+        self.latencies_ms[route].append(latency_ms)
+        if not ok:
+            self.errors[route] += 1
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        routes = {}
+        for route, values in sorted(self.latencies_ms.items()):
+            ordered = sorted(values)
+            routes[route] = {
+                "requests": len(ordered),
+                "errors": self.errors.get(route, 0),
+                "rps": round(len(ordered) / self.duration_s, 2),
+                "p50_ms": round(percentile(ordered, 50), 2),
+                "p95_ms": round(percentile(ordered, 95), 2),
+                "p99_ms": round(percentile(ordered, 99), 2),
+            }
+        return routes
+
+
+def format_table(results: dict[int, dict[str, dict[str, float]]]) -> str:
+    lines = [
+        f"{'conc':>5} {'route':<42} {'reqs':>7} {'err':>5} {'rps':>8} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    ]
+    for concurrency, routes in results.items():
+        total = sum(route["requests"] for route in routes.values())
+        total_rps = round(sum(route["rps"] for route in routes.values()), 2)
+        for name, route in routes.items():
+            lines.append(
+                f"{concurrency:>5} {name:<42} {route['requests']:>7} {route['errors']:>5} "
+                f"{route['rps']:>8} {route['p50_ms']:>8} {route['p95_ms']:>8} {route['p99_ms']:>8}"
+            )
+        lines.append(f"{concurrency:>5} {'TOTAL':<42} {total:>7} {'':>5} {total_rps:>8}")
+    return "\n".join(lines)
+
+
+def compare(
+    results: dict[int, dict[str, dict[str, float]]],
+    baseline: dict,
+    slos: dict,
+    tolerance: float,
+) -> list[str]:
+    """Regressions against absolute SLO ceilings and against the stored baseline."""
+    failures: list[str] = []
+    for concurrency, routes in results.items():
+        for route, stats in routes.items():
+            if stats["errors"]:
+                failures.append(f"c={concurrency} {route}: {stats['errors']} errors")
+            ceiling = slos.get(route) or slos.get("*") or {}
+            for metric, limit in ceiling.items():
+                if stats.get(metric, 0) > limit:
+                    failures.append(
+                        f"c={concurrency} {route}: {metric}={stats[metric]} exceeds SLO {limit}"
+                    )
+            previous = baseline.get(str(concurrency), {}).get(route)
+            if not previous:
+                continue
+            for metric in ("p95_ms", "p99_ms"):
+                allowed = previous[metric] * (1 + tolerance)
+                if stats[metric] > allowed:
+                    failures.append(
+                        f"c={concurrency} {route}: {metric}={stats[metric]} regressed from "
+                        f"{previous[metric]} (allowed {allowed:.2f})"
+                    )
+    return failures
+
+
+def load_json(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
@@ -1,10 +1,10 @@
-from db import create_tables, seed_dummy_data
+from db import run_migrations, seed_dummy_data
 
 
 def main():
-    create_tables()
+    run_migrations()
     seed_dummy_data()
-    print("Supabase tables created via ORM.")
+    print("Supabase schema migrated to head.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+"""Fail if a hot-path query cannot be served by an index.
+
+Usage: DATABASE_URL=... python -m migrations.check_indexes
+"""
+from __future__ import annotations
+
+import sys
+import uuid
+
+from sqlalchemy import desc, select
+from sqlalchemy.engine import Connection
+
+from db import (
+    ChatMessage,
+    ChatMessageArchive,
+    DispatchStatus,
+    IdempotencyKey,
+    IssueAttachment,
+    Conversation,
+    Issue,
+    IssueStatus,
+    Property,
+    PropertyWallet,
+    SummaryStatus,
+    VendorDispatch,
+    get_engine,
+)
+
+_SAMPLE_ID = uuid.UUID(int=1)
+
+HOT_QUERIES = {
+    "chat history by conversation": select(ChatMessage)
+    .where(ChatMessage.conversation_id == _SAMPLE_ID)
+    .order_by(ChatMessage.created_at.asc()),
+    "open conversation for tenant": select(Conversation).where(
+        Conversation.tenant_id == _SAMPLE_ID,
+        Conversation.property_id == _SAMPLE_ID,
+        Conversation.closed_at.is_(None),
+    ),
+    "issues newest first": select(Issue).order_by(desc(Issue.created_at)).limit(50),
+    "issues by status": select(Issue).where(Issue.status == IssueStatus.PENDING),
+    "approved spend per property": select(Issue.estimated_cost).where(
+        Issue.property_id == _SAMPLE_ID, Issue.status == IssueStatus.APPROVED
+    ),
+    "properties by geohash prefix": select(Property).where(
+        Property.geohash >= "9v6k", Property.geohash < "9v6k{"
+    ),
+    "wallet by property": select(PropertyWallet).where(PropertyWallet.property_id == _SAMPLE_ID),
+    "pending issue summaries": select(Issue.id).where(
+        Issue.summary_status == SummaryStatus.PENDING
+    ),
+    "archived thread by conversation": select(ChatMessageArchive.payload).where(
+        ChatMessageArchive.conversation_id == _SAMPLE_ID
+    ),
+    "issues closed before cutoff": select(Issue.id).where(Issue.closed_at < "2026-01-01"),
+    "queued vendor dispatches": select(VendorDispatch)
+    .where(VendorDispatch.issue_id == _SAMPLE_ID, VendorDispatch.status == DispatchStatus.QUEUED)
+    .order_by(VendorDispatch.rank.asc()),
+    "attached conversations by issue": select(IssueAttachment.conversation_id).where(
+        IssueAttachment.issue_id == _SAMPLE_ID
+    ),
+    "expired idempotency keys": select(IdempotencyKey.key).where(
+        IdempotencyKey.expires_at < "2026-01-01"
+    ),
+    "vendor dispatch by token": select(VendorDispatch).where(VendorDispatch.token == "token"),
+}
+
+
+def explain(connection: Connection, statement) -> str:
+    sql = str(
+        statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    )
+    if connection.dialect.name == "postgresql":
+        rows = connection.exec_driver_sql(f"EXPLAIN {sql}").all()
+        return "\n".join(row[0] for row in rows)
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def uses_index(plan: str) -> bool:
+    return "Index" in plan or "USING INDEX" in plan or "USING COVERING INDEX" in plan
+
+
+def main() -> int:
+    failures = 0
+    with get_engine().connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Small or empty tables make a seq scan the cheapest plan; ask whether an
+            # index path exists at all.
+            connection.exec_driver_sql("SET enable_seqscan = off")
+        for name, statement in HOT_QUERIES.items():
+            plan = explain(connection, statement)
+            ok = uses_index(plan)
+            failures += not ok
+            print(f"[{'ok' if ok else 'SEQ SCAN'}] {name}")
+            if not ok:
+                print("    " + plan.replace("\n", "\n    "))
+        connection.rollback()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Baseline schema as previously created by db.create_tables
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False, unique=True),
+        sa.Column("role", sa.Enum("TENANT", "LANDLORD", name="user_role"), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("property_id", UUID(as_uuid=True), nullable=True),
+    )
+    op.create_table(
+        "properties",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("address", sa.String(), nullable=False),
+        sa.Column("latitude", sa.Numeric(9, 6), nullable=True),
+        sa.Column("longitude", sa.Numeric(9, 6), nullable=True),
+        sa.Column("landlord_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+    )
+    if op.get_bind().dialect.name != "sqlite":
+        op.create_foreign_key(
+            "users_property_id_fkey", "users", "properties", ["property_id"], ["id"]
+        )
+    op.create_table(
+        "vendors",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column(
+            "specialty",
+            sa.Enum("HEATING", "PLUMBING", "ELECTRICAL", "GENERAL", name="vendor_specialty"),
+            nullable=False,
+        ),
+        sa.Column("hourly_rate", sa.Numeric(10, 2), nullable=False),
+        sa.Column("rating", sa.Numeric(3, 2), nullable=True),
+    )
+    op.create_table(
+        "issues",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column(
+            "property_id", UUID(as_uuid=True), sa.ForeignKey("properties.id"), nullable=False
+        ),
+        sa.Column(
+            "category",
+            sa.Enum("HEATING", "PLUMBING", "ELECTRICAL", "OTHER", name="issue_category"),
+            nullable=False,
+        ),
+        sa.Column("summary", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum(
+                "PENDING", "APPROVED", "IN_PROGRESS", "COMPLETED", "REJECTED", name="issue_status"
+            ),
+            nullable=False,
+        ),
+        sa.Column("vendor_id", UUID(as_uuid=True), sa.ForeignKey("vendors.id"), nullable=True),
+        sa.Column("estimated_cost", sa.Numeric(10, 2), nullable=True),
+        sa.Column("appointment_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_table(
+        "chat_messages",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("issue_id", UUID(as_uuid=True), sa.ForeignKey("issues.id"), nullable=True),
+        sa.Column(
+            "property_id", UUID(as_uuid=True), sa.ForeignKey("properties.id"), nullable=True
+        ),
+        sa.Column("tenant_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column(
+            "role", sa.Enum("user", "assistant", "landlord", name="chat_role"), nullable=False
+        ),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("image_base64", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_table(
+        "property_wallets",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "property_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("properties.id"),
+            nullable=False,
+            unique=True,
+        ),
+        sa.Column("balance", sa.Numeric(12, 2), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_table(
+        "wallet_transactions",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "property_id", UUID(as_uuid=True), sa.ForeignKey("properties.id"), nullable=False
+        ),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("note", sa.String(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("wallet_transactions")
+    op.drop_table("property_wallets")
+    op.drop_table("chat_messages")
+    op.drop_table("issues")
+    op.drop_table("vendors")
+    if op.get_bind().dialect.name != "sqlite":
+        op.drop_constraint("users_property_id_fkey", "users", type_="foreignkey")
+    op.drop_table("properties")
+    op.drop_table("users")
+    bind = op.get_bind()
+    for enum_name in ("chat_role", "issue_status", "issue_category", "vendor_specialty", "user_role"):
+        sa.Enum(name=enum_name).drop(bind, checkfirst=True)
@@ -0,0 +1,58 @@
+"""Property geohash, vendor service areas and per-message LLM usage
+
+Revision ID: 0002_location_and_llm_usage
+Revises: 0001_baseline
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_location_and_llm_usage"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("properties", sa.Column("geohash", sa.String(12), nullable=True))
+    op.add_column("vendors", sa.Column("latitude", sa.Numeric(9, 6), nullable=True))
+    op.add_column("vendors", sa.Column("longitude", sa.Numeric(9, 6), nullable=True))
+    op.add_column("vendors", sa.Column("service_radius_km", sa.Numeric(6, 2), nullable=True))
+    op.add_column("chat_messages", sa.Column("llm_latency_ms", sa.Integer(), nullable=True))
+    op.add_column("chat_messages", sa.Column("llm_prompt_tokens", sa.Integer(), nullable=True))
+    op.add_column(
+        "chat_messages", sa.Column("llm_completion_tokens", sa.Integer(), nullable=True)
+    )
+    op.add_column("chat_messages", sa.Column("llm_usage", sa.JSON(), nullable=True))
+
+    # Backfill geohashes for existing properties through the ORM encoder.
+    from db import encode_geohash
+
+    bind = op.get_bind()
+    properties = sa.table(
+        "properties",
+        sa.column("id"),
+        sa.column("latitude"),
+        sa.column("longitude"),
+        sa.column("geohash"),
+    )
+    rows = bind.execute(
+        sa.select(properties.c.id, properties.c.latitude, properties.c.longitude).where(
+            properties.c.latitude.is_not(None), properties.c.longitude.is_not(None)
+        )
+    ).all()
+    for row in rows:
+        bind.execute(
+            properties.update()
+            .where(properties.c.id == row.id)
+            .values(geohash=encode_geohash(float(row.latitude), float(row.longitude)))
+        )
+
+
+def downgrade() -> None:
+    for column in ("llm_usage", "llm_completion_tokens", "llm_prompt_tokens", "llm_latency_ms"):
+        op.drop_column("chat_messages", column)
+    for column in ("service_radius_km", "longitude", "latitude"):
+        op.drop_column("vendors", column)
+    op.drop_column("properties", "geohash")
@@ -0,0 +1,45 @@
+"""Indexes for the chat, backfill, dashboard and map hot paths
+
+Revision ID: 0003_hot_path_indexes
+Revises: 0002_location_and_llm_usage
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0003_hot_path_indexes"
+down_revision = "0002_location_and_llm_usage"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_chat_messages_issue_id_created_at", "chat_messages", ["issue_id", "created_at"]),
+    (
+        "ix_chat_messages_tenant_property_issue",
+        "chat_messages",
+        ["tenant_id", "property_id", "issue_id"],
+    ),
+    ("ix_issues_created_at", "issues", ["created_at"]),
+    ("ix_issues_status", "issues", ["status"]),
+    ("ix_issues_property_id_status", "issues", ["property_id", "status"]),
+    ("ix_properties_geohash", "properties", ["geohash"]),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
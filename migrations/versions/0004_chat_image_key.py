@@ -0,0 +1,22 @@
+"""Chat message image stored as a file key instead of inline base64
+
+Revision ID: 0004_chat_image_key
+Revises: 0003_hot_path_indexes
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_chat_image_key"
+down_revision = "0003_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_messages", sa.Column("image_key", sa.String(80), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("chat_messages", "image_key")
@@ -0,0 +1,53 @@
+"""Deferred LLM issue summaries: status, attempt count and retry schedule
+
+Revision ID: 0005_deferred_issue_summary
+Revises: 0004_chat_image_key
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_deferred_issue_summary"
+down_revision = "0004_chat_image_key"
+branch_labels = None
+depends_on = None
+
+summary_status = sa.Enum("pending", "ready", "failed", name="summary_status")
+
+
+def upgrade() -> None:
+    summary_status.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        "issues",
+        sa.Column("summary_status", summary_status, nullable=False, server_default="ready"),
+    )
+    op.add_column(
+        "issues",
+        sa.Column("summary_attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "issues", sa.Column("summary_next_attempt_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_issues_summary_status_next_attempt",
+            "issues",
+            ["summary_status", "summary_next_attempt_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_issues_summary_status_next_attempt",
+            table_name="issues",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    for column in ("summary_next_attempt_at", "summary_attempts", "summary_status"):
+        op.drop_column("issues", column)
+    summary_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,204 @@
+"""Conversations: messages and issues reference their chat thread directly
+
+Revision ID: 0006_conversations
+Revises: 0005_deferred_issue_summary
+Create Date: 2026-10-19
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = "0006_conversations"
+down_revision = "0005_deferred_issue_summary"
+branch_labels = None
+depends_on = None
+
+
+# Rows updated per statement; each batch commits on its own so no lock is held for long.
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _backfill(bind, table: str, assignment: str, condition: str) -> None:
+    """Run UPDATE table SET assignment WHERE condition in primary-key order, one batch at a time."""
+    last_id = None
+    while True:
+        after = "" if last_id is None else "WHERE id > :last_id "
+        ids = bind.execute(
+            sa.text(f"SELECT id FROM {table} {after}ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE},
+        ).scalars().all()
+        if not ids:
+            return
+        bind.execute(
+            sa.text(f"UPDATE {table} SET {assignment} WHERE id IN :ids AND {condition}").bindparams(
+                sa.bindparam("ids", expanding=True)
+            ),
+            {"ids": ids},
+        )
+        last_id = ids[-1]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.create_table(
+        "conversations",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("tenant_id", UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column(
+            "property_id", UUID(as_uuid=True), sa.ForeignKey("properties.id"), nullable=False
+        ),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+        sa.Column("closed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_conversations_tenant_property_closed",
+        "conversations",
+        ["tenant_id", "property_id", "closed_at"],
+    )
+    op.add_column("issues", sa.Column("conversation_id", UUID(as_uuid=True), nullable=True))
+    op.add_column("chat_messages", sa.Column("conversation_id", UUID(as_uuid=True), nullable=True))
+    if bind.dialect.name != "sqlite":
+        # NOT VALID skips the full-table check while the ALTER holds its lock; the constraints
+        # are validated below without blocking writes.
+        op.create_foreign_key(
+            "issues_conversation_id_fkey",
+            "issues",
+            "conversations",
+            ["conversation_id"],
+            ["id"],
+            postgresql_not_valid=True,
+        )
+        op.create_foreign_key(
+            "chat_messages_conversation_id_fkey",
+            "chat_messages",
+            "conversations",
+            ["conversation_id"],
+            ["id"],
+            postgresql_not_valid=True,
+        )
+
+    # Every existing issue becomes a closed conversation with the same id, so issue messages
+    # map over with set-based statements.
+    bind.execute(
+        sa.text(
+            "INSERT INTO conversations (id, tenant_id, property_id, created_at, closed_at) "
+            "SELECT id, tenant_id, property_id, created_at, created_at FROM issues"
+        )
+    )
+
+    # The backfill and index builds run outside the migration transaction, in batches and
+    # concurrently, so chat_messages and issues stay writable throughout.
+    with op.get_context().autocommit_block():
+        _backfill(bind, "issues", "conversation_id = id", "conversation_id IS NULL")
+        _backfill(
+            bind,
+            "chat_messages",
+            "conversation_id = issue_id",
+            "conversation_id IS NULL AND issue_id IS NOT NULL",
+        )
+
+        # Messages sent before any issue existed form one open conversation per tenant/property.
+        conversations = sa.table(
+            "conversations",
+            sa.column("id", UUID(as_uuid=True)),
+            sa.column("tenant_id", UUID(as_uuid=True)),
+            sa.column("property_id", UUID(as_uuid=True)),
+        )
+        messages = sa.table(
+            "chat_messages",
+            sa.column("conversation_id", UUID(as_uuid=True)),
+            sa.column("tenant_id", UUID(as_uuid=True)),
+            sa.column("property_id", UUID(as_uuid=True)),
+            sa.column("issue_id", UUID(as_uuid=True)),
+        )
+        orphans = bind.execute(
+            sa.select(messages.c.tenant_id, messages.c.property_id)
+            .where(
+                messages.c.issue_id.is_(None),
+                messages.c.property_id.is_not(None),
+                messages.c.conversation_id.is_(None),
+            )
+            .distinct()
+        ).all()
+        for tenant_id, property_id in orphans:
+            conversation_id = uuid.uuid4()
+            bind.execute(
+                conversations.insert().values(
+                    id=conversation_id, tenant_id=tenant_id, property_id=property_id
+                )
+            )
+            # Served by ix_chat_messages_tenant_property_issue; one tenant's thread is small.
+            bind.execute(
+                messages.update()
+                .where(
+                    messages.c.tenant_id == tenant_id,
+                    messages.c.property_id == property_id,
+                    messages.c.issue_id.is_(None),
+                    messages.c.conversation_id.is_(None),
+                )
+                .values(conversation_id=conversation_id)
+            )
+
+        if bind.dialect.name != "sqlite":
+            op.execute("ALTER TABLE issues VALIDATE CONSTRAINT issues_conversation_id_fkey")
+            op.execute(
+                "ALTER TABLE chat_messages VALIDATE CONSTRAINT chat_messages_conversation_id_fkey"
+            )
+        op.create_index(
+            "ix_issues_conversation_id",
+            "issues",
+            ["conversation_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_chat_messages_conversation_id_created_at",
+            "chat_messages",
+            ["conversation_id", "created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Only the removed orphan-message backfill used this index.
+        op.drop_index(
+            "ix_chat_messages_tenant_property_issue",
+            table_name="chat_messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_chat_messages_tenant_property_issue",
+            "chat_messages",
+            ["tenant_id", "property_id", "issue_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_chat_messages_conversation_id_created_at",
+            table_name="chat_messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_issues_conversation_id",
+            table_name="issues",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    if op.get_bind().dialect.name != "sqlite":
+        op.drop_constraint(
+            "chat_messages_conversation_id_fkey", "chat_messages", type_="foreignkey"
+        )
+        op.drop_constraint("issues_conversation_id_fkey", "issues", type_="foreignkey")
+    op.drop_column("chat_messages", "conversation_id")
+    op.drop_column("issues", "conversation_id")
+    op.drop_index("ix_conversations_tenant_property_closed", table_name="conversations")
+    op.drop_table("conversations")
@@ -0,0 +1,64 @@
+"""Chat message archive: closed_at on issues and compressed threads of long-closed issues
+
+Revision ID: 0007_chat_message_archive
+Revises: 0006_conversations
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = "0007_chat_message_archive"
+down_revision = "0006_conversations"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("issues", sa.Column("closed_at", sa.DateTime(timezone=True), nullable=True))
+    # When existing issues closed is unknown; counting from now delays their archival by one
+    # retention period instead of archiving them all on the first run.
+    op.get_bind().execute(
+        sa.text(
+            "UPDATE issues SET closed_at = CURRENT_TIMESTAMP "
+            "WHERE status IN ('COMPLETED', 'REJECTED')"
+        )
+    )
+    op.create_table(
+        "chat_message_archive",
+        sa.Column(
+            "issue_id", UUID(as_uuid=True), sa.ForeignKey("issues.id"), primary_key=True
+        ),
+        sa.Column("conversation_id", UUID(as_uuid=True), nullable=True),
+        sa.Column("message_count", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("first_message_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "archived_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_index(
+        "ix_chat_message_archive_conversation_id", "chat_message_archive", ["conversation_id"]
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_issues_closed_at",
+            "issues",
+            ["closed_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_issues_closed_at", table_name="issues", postgresql_concurrently=True, if_exists=True
+        )
+    # Archived threads are dropped with the table; restore them before downgrading if needed.
+    op.drop_index("ix_chat_message_archive_conversation_id", table_name="chat_message_archive")
+    op.drop_table("chat_message_archive")
+    op.drop_column("issues", "closed_at")
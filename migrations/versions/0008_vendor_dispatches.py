@@ -0,0 +1,47 @@
+"""Vendor dispatches: concurrent vendor requests per issue, first acceptance wins
+
+Revision ID: 0008_vendor_dispatches
+Revises: 0007_chat_message_archive
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = "0008_vendor_dispatches"
+down_revision = "0007_chat_message_archive"
+branch_labels = None
+depends_on = None
+
+dispatch_status = sa.Enum(
+    "queued", "sent", "accepted", "declined", "cancelled", "failed", name="dispatch_status"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vendor_dispatches",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("issue_id", UUID(as_uuid=True), sa.ForeignKey("issues.id"), nullable=False),
+        sa.Column("vendor_id", UUID(as_uuid=True), sa.ForeignKey("vendors.id"), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("status", dispatch_status, nullable=False),
+        sa.Column("token", sa.String(64), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("responded_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_index(
+        "ix_vendor_dispatches_issue_id_status", "vendor_dispatches", ["issue_id", "status"]
+    )
+    op.create_index("ix_vendor_dispatches_token", "vendor_dispatches", ["token"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vendor_dispatches_token", table_name="vendor_dispatches")
+    op.drop_index("ix_vendor_dispatches_issue_id_status", table_name="vendor_dispatches")
+    op.drop_table("vendor_dispatches")
+    dispatch_status.drop(op.get_bind(), checkfirst=True)
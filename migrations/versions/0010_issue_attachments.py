@@ -0,0 +1,46 @@
+"""Issue attachments: conversations attached to another tenant's issue as duplicate reports
+
+Revision ID: 0010_issue_attachments
+Revises: 0009_idempotency_keys
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = "0010_issue_attachments"
+down_revision = "0009_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "issue_attachments",
+        sa.Column(
+            "conversation_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("conversations.id"),
+            primary_key=True,
+        ),
+        sa.Column("issue_id", UUID(as_uuid=True), sa.ForeignKey("issues.id"), primary_key=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False
+        ),
+    )
+    op.create_index("ix_issue_attachments_issue_id", "issue_attachments", ["issue_id"])
+    # Attached reports so far are recognisable by their messages: tagged with an issue that
+    # came from a different conversation. This only reads chat_messages.
+    op.execute(
+        "INSERT INTO issue_attachments (conversation_id, issue_id) "
+        "SELECT DISTINCT m.conversation_id, m.issue_id FROM chat_messages m "
+        "JOIN issues i ON i.id = m.issue_id "
+        "WHERE m.conversation_id IS NOT NULL AND i.conversation_id IS NOT NULL "
+        "AND m.conversation_id <> i.conversation_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_issue_attachments_issue_id", table_name="issue_attachments")
+    op.drop_table("issue_attachments")
@@ -0,0 +1,103 @@
+"""Shared fixtures: one migrated SQLite database per test session, seeded by datagen.
+
+The environment is set before any app module is imported, since they read their settings
+at import time.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import tempfile
+import uuid
+
+_DATA_DIR = Path(tempfile.mkdtemp(prefix="proco-tests-"))
+os.environ["DATABASE_URL"] = f"sqlite:///{_DATA_DIR / 'proco.db'}"
+os.environ["LLM_BACKEND"] = "offline"
+os.environ["EXPORT_LAG_SECONDS"] = "0"
+os.environ["CHAT_IMAGE_DIR"] = str(_DATA_DIR / "chat-images")
+os.environ.pop("DATABASE_REPLICA_URLS", None)
+
+from fastapi.testclient import TestClient  # noqa: E402
+import pytest  # noqa: E402
+
+from db import (  # noqa: E402
+    Issue,
+    IssueCategory,
+    IssueStatus,
+    Property,
+    User,
+    UserRole,
+    Vendor,
+    VendorSpecialty,
+    get_sessionmaker,
+)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database() -> None:
+    from datagen.__main__ import main as datagen
+
+    datagen(
+        [
+            "--migrate",
+            *("--landlords", "2", "--properties", "4", "--vendors", "8"),
+            *("--issues", "30", "--messages", "150", "--image-fraction", "0"),
+        ]
+    )
+
+
+@pytest.fixture
+def db():
+    session = get_sessionmaker()()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_issue(db):
+    """Create a pending issue at a fresh property, plus `vendors` vendors with an email."""
+
+    def make(vendors: int = 3) -> tuple[Issue, list[Vendor]]:
+        suffix = uuid.uuid4().hex[:8]
+        landlord = User(email=f"landlord-{suffix}@test", role=UserRole.LANDLORD, name="L")
+        property_ = Property(
+            address=f"{suffix} Test St", landlord=landlord, latitude=30.0, longitude=-97.0
+        )
+        tenant = User(
+            email=f"tenant-{suffix}@test", role=UserRole.TENANT, name="T", property=property_
+        )
+        issue = Issue(
+            tenant=tenant,
+            property=property_,
+            category=IssueCategory.PLUMBING,
+            summary="Sink leaking",
+            description="The kitchen sink is leaking under the cabinet.",
+            status=IssueStatus.PENDING,
+        )
+        created = [
+            Vendor(
+                name=f"Vendor {index} {suffix}",
+                email=f"vendor-{index}-{suffix}@test",
+                specialty=VendorSpecialty.PLUMBING,
+                hourly_rate=100,
+                rating=4.5,
+                latitude=30.0,
+                longitude=-97.0,
+                service_radius_km=25,
+            )
+            for index in range(vendors)
+        ]
+        db.add_all([issue, *created])
+        db.commit()
+        return issue, created
+
+    return make
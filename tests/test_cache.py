@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import uuid
+
+from app.services.cache import TTLCache, reference_cache
+from app.services.microcache import MicroCache, microcache
+from db import Vendor, VendorSpecialty
+
+
+def _vendor() -> Vendor:
+    suffix = uuid.uuid4().hex[:8]
+    return Vendor(
+        name=f"Cache vendor {suffix}",
+        email=f"cache-{suffix}@test",
+        specialty=VendorSpecialty.ELECTRICAL,
+        hourly_rate=80,
+        rating=4.0,
+    )
+
+
+def test_load_overlapping_a_clear_is_returned_but_not_stored():
+    cache = TTLCache(maxsize=8, ttl=60)
+
+    def load():
+        cache.clear()  # A write committed while this load was reading.
+        return "stale"
+
+    assert cache.get_or_load("key", load) == "stale"
+    assert cache.get_or_load("key", lambda: "fresh") == "fresh"
+    assert cache.get_or_load("key", lambda: "unused") == "fresh"
+
+
+def _vendor_hits() -> int:
+    return reference_cache.stats()["vendors"]["hits"]
+
+
+def test_reference_cache_is_cleared_on_commit_only(db):
+    vendors = reference_cache.list_vendors(db)
+
+    db.add(_vendor())
+    db.flush()
+    db.rollback()
+    hits = _vendor_hits()
+    assert reference_cache.list_vendors(db) == vendors
+    assert _vendor_hits() == hits + 1
+
+    db.add(_vendor())
+    db.commit()
+    assert len(reference_cache.list_vendors(db)) == len(vendors) + 1
+    assert _vendor_hits() == hits + 1
+
+
+def test_microcache_namespace_is_invalidated_on_commit(db):
+    key = uuid.uuid4().hex
+    renders = []
+
+    def render():
+        renders.append(1)
+        return b"body-%d" % len(renders)
+
+    assert microcache.get_or_render("vendors", key, render) == (b"body-1", "miss")
+    assert microcache.get_or_render("vendors", key, render) == (b"body-1", "hit")
+
+    db.add(_vendor())
+    db.flush()
+    db.rollback()
+    assert microcache.get_or_render("vendors", key, render) == (b"body-1", "hit")
+
+    db.add(_vendor())
+    db.commit()
+    assert microcache.get_or_render("vendors", key, render) == (b"body-2", "miss")
+
+
+def test_microcache_coalesces_concurrent_misses():
+    cache = MicroCache(ttl=60)
+    release, renders = threading.Event(), []
+
+    def render():
+        renders.append(1)
+        release.wait(5)
+        return b"body"
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(cache.get_or_render, "issues", "list", render) for _ in range(4)]
+        deadline = time.monotonic() + 5
+        while cache.stats()["coalesced"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        outcomes = sorted(future.result()[1] for future in futures)
+
+    assert outcomes == ["coalesced", "coalesced", "coalesced", "miss"]
+    assert len(renders) == 1
+
+
+def test_microcache_render_overlapping_a_write_is_not_stored():
+    cache = MicroCache(ttl=60)
+
+    def render():
+        cache.invalidate("issues")
+        return b"stale"
+
+    assert cache.get_or_render("issues", "list", render) == (b"stale", "miss")
+    assert cache.get_or_render("issues", "list", lambda: b"fresh") == (b"fresh", "miss")
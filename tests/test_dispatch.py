@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import select
+
+import app.services.dispatch as dispatch
+from db import DispatchStatus, Issue, IssueStatus, VendorDispatch
+
+APPOINTMENT = "2026-11-01T10:00:00Z"
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    """Record webhook payloads instead of posting them; emails in `failing` are refused."""
+    calls = {"sent": [], "failing": set()}
+
+    async def post_webhook(client, payload):
+        calls["sent"].append(payload)
+        if payload["vendor_email"] in calls["failing"]:
+            raise dispatch.VendorWebhookError("refused")
+
+    monkeypatch.setattr(dispatch, "post_webhook", post_webhook)
+    return calls
+
+
+def _dispatch(client, issue, vendors):
+    return client.post(
+        f"/api/issues/{issue.id}/dispatch",
+        json={"vendor_ids": [str(vendor.id) for vendor in vendors]},
+    )
+
+
+def _statuses(db, issue) -> list[DispatchStatus]:
+    db.expire_all()
+    return list(
+        db.scalars(
+            select(VendorDispatch.status)
+            .where(VendorDispatch.issue_id == issue.id)
+            .order_by(VendorDispatch.rank)
+        )
+    )
+
+
+def test_concurrent_acceptances_have_one_winner(client, db, make_issue, webhook):
+    issue, vendors = make_issue(vendors=3)
+    response = _dispatch(client, issue, vendors)
+    assert response.status_code == 200
+    tokens = [
+        token
+        for token, in db.execute(
+            select(VendorDispatch.token).where(VendorDispatch.issue_id == issue.id)
+        )
+    ]
+
+    def accept(token):
+        return client.post(
+            f"/api/issues/{issue.id}/vendor-response",
+            json={"accepted": True, "appointment_at": APPOINTMENT, "dispatch_token": token},
+        ).status_code
+
+    with ThreadPoolExecutor(len(tokens)) as pool:
+        codes = sorted(pool.map(accept, tokens))
+
+    assert codes == [200, 409, 409]
+    assert sorted(status.value for status in _statuses(db, issue)) == [
+        "accepted",
+        "cancelled",
+        "cancelled",
+    ]
+    db.refresh(issue)
+    assert issue.status == IssueStatus.IN_PROGRESS
+    cancellations = [p for p in webhook["sent"] if p["event"] == "vendor_request_cancelled"]
+    assert len(cancellations) == 2
+
+
+def test_decline_cascades_and_all_declines_reject(client, db, make_issue, webhook, monkeypatch):
+    monkeypatch.setattr(dispatch, "DISPATCH_FANOUT", 1)
+    issue, vendors = make_issue(vendors=2)
+    assert _dispatch(client, issue, vendors).status_code == 200
+    assert _statuses(db, issue) == [DispatchStatus.SENT, DispatchStatus.QUEUED]
+
+    for _ in vendors:
+        sent = db.scalars(
+            select(VendorDispatch).where(
+                VendorDispatch.issue_id == issue.id,
+                VendorDispatch.status == DispatchStatus.SENT,
+            )
+        ).one()
+        response = client.post(
+            f"/api/issues/{issue.id}/vendor-response",
+            json={"accepted": False, "dispatch_token": sent.token},
+        )
+        assert response.status_code == 200
+
+    assert _statuses(db, issue) == [DispatchStatus.DECLINED, DispatchStatus.DECLINED]
+    db.refresh(issue)
+    assert issue.status == IssueStatus.REJECTED
+
+
+def test_failed_sends_keep_the_issue_open_and_can_be_retried(client, db, make_issue, webhook):
+    issue, vendors = make_issue(vendors=2)
+    webhook["failing"].update(vendor.email for vendor in vendors)
+
+    response = _dispatch(client, issue, vendors)
+
+    assert response.status_code == 502
+    assert _statuses(db, issue) == [DispatchStatus.FAILED, DispatchStatus.FAILED]
+    assert db.get(Issue, issue.id).status == IssueStatus.PENDING
+
+    webhook["failing"].clear()
+    response = _dispatch(client, issue, vendors)
+    assert response.status_code == 200
+    assert [d["status"] for d in response.json()] == ["failed", "failed", "sent", "sent"]
+
+
+def test_tokenless_response_is_refused_once_dispatched(client, db, make_issue, webhook):
+    issue, vendors = make_issue(vendors=1)
+    assert _dispatch(client, issue, vendors).status_code == 200
+
+    response = client.post(
+        f"/api/issues/{issue.id}/vendor-response",
+        json={"accepted": True, "appointment_at": APPOINTMENT},
+    )
+
+    assert response.status_code == 409
+    db.refresh(issue)
+    assert issue.status == IssueStatus.PENDING
+
+
+def test_second_dispatch_while_outstanding_conflicts(client, make_issue, webhook):
+    issue, vendors = make_issue(vendors=2)
+    assert _dispatch(client, issue, vendors).status_code == 200
+    assert _dispatch(client, issue, vendors).status_code == 409
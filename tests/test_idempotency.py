@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import uuid
+
+from pydantic import BaseModel
+import pytest
+from sqlalchemy import select
+
+from app.services.idempotency import (
+    IdempotencyConflictError,
+    IdempotencyInProgressError,
+    IdempotencyStore,
+)
+from db import IdempotencyKey, User, UserRole
+
+
+class Result(BaseModel):
+    value: int
+
+
+def _key() -> str:
+    return f"test:{uuid.uuid4()}"
+
+
+def test_replays_the_stored_response():
+    store, key, calls = IdempotencyStore(), _key(), []
+
+    def work():
+        calls.append(1)
+        return Result(value=len(calls))
+
+    assert store.run(key, "a", work, Result) == (Result(value=1), False)
+    assert store.run(key, "a", work, Result) == (Result(value=1), True)
+    assert len(calls) == 1
+    assert store.stats()["replays"] == 1
+
+
+def test_different_payload_conflicts():
+    store, key = IdempotencyStore(), _key()
+    store.run(key, "a", lambda: Result(value=1), Result)
+
+    with pytest.raises(IdempotencyConflictError):
+        store.run(key, "b", lambda: Result(value=2), Result)
+    assert store.stats()["conflicts"] == 1
+
+
+def test_failed_work_releases_the_key(db):
+    store, key = IdempotencyStore(), _key()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        store.run(key, "a", fail, Result)
+    assert db.get(IdempotencyKey, key) is None
+    assert store.run(key, "a", lambda: Result(value=2), Result) == (Result(value=2), False)
+
+
+def test_concurrent_retry_waits_and_replays():
+    store, key = IdempotencyStore(wait=10), _key()
+    started, calls = threading.Event(), []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.5)
+        return Result(value=7)
+
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(store.run, key, "a", slow, Result)
+        started.wait(5)
+        second = pool.submit(store.run, key, "a", slow, Result)
+        results = [first.result(), second.result()]
+
+    assert results == [(Result(value=7), False), (Result(value=7), True)]
+    assert len(calls) == 1
+    assert store.stats()["waits"] == 1
+
+
+def test_retry_gives_up_while_still_running():
+    store, key = IdempotencyStore(wait=0.2), _key()
+    release = threading.Event()
+
+    def blocked():
+        release.wait(5)
+        return Result(value=1)
+
+    with ThreadPoolExecutor(1) as pool:
+        first = pool.submit(store.run, key, "a", blocked, Result)
+        deadline = time.monotonic() + 5
+        while store.stats()["executions"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with pytest.raises(IdempotencyInProgressError) as excinfo:
+            store.run(key, "a", blocked, Result)
+        release.set()
+        first.result()
+
+    assert 1 <= excinfo.value.retry_after <= 5
+    assert store.stats()["in_progress"] == 1
+
+
+def test_abandoned_lease_is_taken_over():
+    store, key = IdempotencyStore(lease=0), _key()
+    # A claim whose request died before it stored a response.
+    assert store._claim(key, "a") is None
+
+    assert store.run(key, "b", lambda: Result(value=3), Result) == (Result(value=3), False)
+
+
+def test_chat_replays_with_the_same_key(client, db):
+    tenant = db.scalars(select(User).where(User.role == UserRole.TENANT).limit(1)).one()
+    body = {"tenant_id": str(tenant.id), "message": "Hello there"}
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = client.post("/api/chat", json=body, headers=headers)
+    second = client.post("/api/chat", json=body, headers=headers)
+    changed = client.post("/api/chat", json={**body, "message": "Bye"}, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert changed.status_code == 422